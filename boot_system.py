@@ -2,8 +2,8 @@
 import subprocess
 import os
 import sys
-import time
-from manager_utils import get_venv_python
+from concurrent.futures import ThreadPoolExecutor
+from manager_utils import get_venv_python, open_append_fd
 
 # --- Configuration ---
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__)) # Assumes boot_system.py is in n0m1_agi
@@ -43,13 +43,20 @@ def launch_manager(manager_script_name):
         manager_log_file = os.path.join(LOGS_DIR, f"{manager_script_name.replace('.py', '')}.log")
         manager_err_file = os.path.join(LOGS_DIR, f"{manager_script_name.replace('.py', '')}.err")
 
-        with open(manager_log_file, 'a') as flog, open(manager_err_file, 'a') as ferr:
-            process = subprocess.Popen(
-                [VENV_PYTHON_PATH, script_path],
-                cwd=PROJECT_DIR,
-                stdout=flog,
-                stderr=ferr
-            )
+        log_fd = open_append_fd(manager_log_file)
+        try:
+            err_fd = open_append_fd(manager_err_file)
+            try:
+                process = subprocess.Popen(
+                    [VENV_PYTHON_PATH, script_path],
+                    cwd=PROJECT_DIR,
+                    stdout=log_fd,
+                    stderr=err_fd
+                )
+            finally:
+                os.close(err_fd)
+        finally:
+            os.close(log_fd)
         print(f"Launched '{manager_script_name}' with PID: {process.pid}. Output logged to '{LOGS_DIR}'.")
         return process
     except Exception as e:
@@ -68,12 +75,10 @@ if __name__ == "__main__":
             print(f"Error creating manager logs directory '{LOGS_DIR}': {e}. Please create it manually.")
             sys.exit(1)
             
-    launched_managers = {}
-    for script_name in MANAGER_SCRIPTS:
-        p = launch_manager(script_name)
-        if p:
-            launched_managers[script_name] = p
-        time.sleep(1) # Small delay between launching managers
+    # Launch all managers at once; each one handles its own startup ordering
+    with ThreadPoolExecutor(max_workers=len(MANAGER_SCRIPTS)) as ex:
+        results = dict(zip(MANAGER_SCRIPTS, ex.map(launch_manager, MANAGER_SCRIPTS)))
+    launched_managers = {name: p for name, p in results.items() if p}
 
     if launched_managers:
         print("\n--- All configured managers launched. ---")
@@ -8,40 +8,45 @@ import sys
 import time
 import signal
 import json
+import selectors
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from typing import Dict, List, Optional
 from manager_utils import (
     get_venv_python,
     log_db_access,
     launch_subprocess,
+    list_python_scripts,
+    open_append_fd,
+    get_connection,
+    discard_connection,
     terminate_process,
+    writer_lock,
+    write_pid_file,
+    DB_FULL_PATH,
 )
 
 # --- Configuration ---
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 VENV_PYTHON_PATH = get_venv_python(PROJECT_DIR)
 CONFIG_FILE = os.path.join(PROJECT_DIR, 'config.json')
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 
 # Manager configuration with health check intervals
 MANAGER_CONFIG = {
     'daemon_manager.py': {
         'name': 'Daemon Manager',
-        'startup_delay': 1,
         'health_check_interval': 30,
         'critical': True
     },
     'nano_manager.py': {
         'name': 'Nano Manager', 
-        'startup_delay': 1,
         'health_check_interval': 30,
         'critical': True
     },
     'main_llm_manager.py': {
         'name': 'Main LLM Manager',
-        'startup_delay': 2,
         'health_check_interval': 60,
         'critical': False
     }
@@ -49,33 +54,92 @@ MANAGER_CONFIG = {
 
 LOGS_DIR = os.path.join(PROJECT_DIR, "logs_managers")
 PID_FILE = os.path.join(PROJECT_DIR, "pids", "boot_system.pid")
+# Fallback polling interval where SIGCHLD is unavailable (Windows)
+MONITOR_POLL_INTERVAL = 5
+# How long boot waits for critical managers to report MANAGER_READY
+READY_TIMEOUT = 30
+READY_POLL_INTERVAL = 0.2
+READY_SQL = """
+    SELECT process_pid FROM component_lifecycle_log
+    WHERE event_type = 'MANAGER_READY' AND event_timestamp >= ?
+"""
+LIFECYCLE_INSERT_SQL = """
+    INSERT INTO component_lifecycle_log
+    (event_timestamp, component_id, process_pid, event_type, message, manager_script)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
 # --- End Configuration ---
 
+# Signal names resolved once instead of building a Signals enum per delivery
+_SIG_NAMES = {int(getattr(signal, name)): name
+              for name in ('SIGTERM', 'SIGINT', 'SIGHUP') if hasattr(signal, name)}
+
+@dataclass
+class ManagerSlot:
+    """Monitor-side view of one launched manager."""
+    __slots__ = ('script', 'process', 'config', 'last_check')
+    script: str
+    process: subprocess.Popen
+    config: dict
+    last_check: Optional[float]
+
 class BootSystem:
     def __init__(self):
         self.launched_managers: Dict[str, subprocess.Popen] = {}
+        # Iterated by the monitor each tick; only rebuilt when managers change
+        self._managers_snapshot: List[ManagerSlot] = []
         self.shutdown_requested = False
+        self.reload_requested = False
+        # Number of the signal that requested shutdown, reported by run()
+        self._shutdown_signal: Optional[int] = None
         self.start_time = datetime.now()
+        # Manager scripts are listed once per boot rather than stat'ed per launch
+        self._valid_scripts = list_python_scripts(PROJECT_DIR)
+        # Dedicated read-write connection for lifecycle events, opened lazily
+        self._log_conn: Optional[sqlite3.Connection] = None
+        # Lifecycle rows waiting to be written in one transaction
+        self._evt_buf: List[tuple] = []
+        # Read end of the signal wakeup pipe; None when SIGCHLD is unsupported
+        self._wakeup_fd: Optional[int] = None
+        # Watches the wakeup pipe; every monitor wait blocks here
+        self._selector: Optional[selectors.BaseSelector] = None
+        # Set by a launch worker when a critical manager fails to start
+        self._abort_boot = False
         
     def setup_signal_handlers(self):
         """Setup signal handlers for graceful shutdown."""
         signal.signal(signal.SIGTERM, self._signal_handler)
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGHUP, self._reload_handler)
+        if hasattr(signal, 'SIGCHLD'):
+            # The interpreter writes the signal number to the wakeup pipe for
+            # every signal, so one selector covers child exits, shutdown and
+            # reload requests; the select timeout is the next health check.
+            read_fd, write_fd = os.pipe()
+            os.set_blocking(read_fd, False)
+            os.set_blocking(write_fd, False)
+            signal.set_wakeup_fd(write_fd)
+            signal.signal(signal.SIGCHLD, self._child_handler)
+            self._wakeup_fd = read_fd
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(read_fd, selectors.EVENT_READ)
+
+    def _child_handler(self, signum, frame):
+        """Handle SIGCHLD. The wakeup pipe already woke the monitor."""
+        pass
         
     def _signal_handler(self, signum, frame):
-        """Handle shutdown signals."""
-        sig_name = signal.Signals(signum).name
-        print(f"\n[BOOT] Received {sig_name}. Starting graceful shutdown...")
+        """Handle shutdown signals.
+
+        Only records the request; the main loop notices the flag (the wakeup
+        pipe interrupts its wait) and performs the shutdown itself.
+        """
+        self._shutdown_signal = signum
         self.shutdown_requested = True
-        self.shutdown_all_managers()
-        self.cleanup()
-        sys.exit(0)
         
     def _reload_handler(self, signum, frame):
-        """Handle reload signal (SIGHUP)."""
-        print(f"\n[BOOT] Received SIGHUP. Reloading configuration...")
-        self.reload_configuration()
+        """Handle reload signal (SIGHUP) by flagging it for the main loop."""
+        self.reload_requested = True
         
     def check_prerequisites(self):
         """Check all prerequisites before starting."""
@@ -95,14 +159,13 @@ class BootSystem:
             
         # Check database tables
         try:
-            conn = sqlite3.connect(DB_FULL_PATH)
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM autorun_components LIMIT 1")
+            conn = get_connection(DB_FULL_PATH, "reader")
+            conn.execute("SELECT 1 FROM autorun_components LIMIT 1").fetchall()
             log_db_access(DB_FULL_PATH, "boot_system", "autorun_components", "READ")
-            cursor.execute("SELECT 1 FROM component_lifecycle_log LIMIT 1")
+            conn.execute("SELECT 1 FROM component_lifecycle_log LIMIT 1").fetchall()
             log_db_access(DB_FULL_PATH, "boot_system", "component_lifecycle_log", "READ")
-            conn.close()
         except sqlite3.Error as e:
+            discard_connection(DB_FULL_PATH, "reader")
             print(f"ERROR: Database tables not properly initialized: {e}")
             print("Please run init_database.py")
             return False
@@ -120,12 +183,8 @@ class BootSystem:
         
     def write_pid_file(self):
         """Write boot system PID to file."""
-        try:
-            with open(PID_FILE, 'w') as f:
-                f.write(str(os.getpid()))
+        if write_pid_file(PID_FILE, os.getpid()):
             print(f"[BOOT] Boot system PID written to {PID_FILE}")
-        except IOError as e:
-            print(f"[BOOT] Warning: Could not write PID file: {e}")
             
     def load_configuration(self):
         """Load configuration from file if it exists."""
@@ -144,28 +203,30 @@ class BootSystem:
         """Launch a single manager process."""
         script_path = os.path.join(PROJECT_DIR, manager_script)
         
-        if not os.path.exists(script_path):
+        if manager_script not in self._valid_scripts:
             print(f"ERROR: Manager script '{manager_script}' not found at '{script_path}'.")
             return None
             
         print(f"[BOOT] Launching {config['name']}...")
         
+        log_fd = err_fd = None
         try:
             # Create dedicated log files
             log_base = manager_script.replace('.py', '')
             log_file = os.path.join(LOGS_DIR, f"{log_base}.log")
             err_file = os.path.join(LOGS_DIR, f"{log_base}.err")
+            log_fd = open_append_fd(log_file)
+            err_fd = open_append_fd(err_file)
             
             # Add timestamp to log files
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            with open(log_file, 'a') as f:
-                f.write(f"\n\n=== {config['name']} started at {timestamp} ===\n")
+            os.write(log_fd, f"\n\n=== {config['name']} started at {timestamp} ===\n".encode())
                 
             process = launch_subprocess(
                 [VENV_PYTHON_PATH, script_path, 'autorun'],
                 cwd=PROJECT_DIR,
-                stdout=open(log_file, 'a'),
-                stderr=open(err_file, 'a'),
+                stdout=log_fd,
+                stderr=err_fd,
             )
             
             print(f"[BOOT] {config['name']} launched with PID: {process.pid}")
@@ -179,25 +240,94 @@ class BootSystem:
             print(f"ERROR launching {config['name']}: {e}")
             if config.get('critical', True):
                 print(f"[BOOT] {config['name']} is critical. Aborting boot.")
-                self.shutdown_all_managers()
-                sys.exit(1)
+                self._abort_boot = True
             return None
+        finally:
+            # The child holds its own copies; the parent's are no longer needed
+            for fd in (log_fd, err_fd):
+                if fd is not None:
+                    os.close(fd)
             
+    def launch_all_managers(self):
+        """Launch every configured manager concurrently.
+
+        Launches run on a thread pool so boot time no longer grows with the
+        number of managers; readiness is awaited afterwards by
+        ``wait_for_managers_ready``.
+        """
+        with ThreadPoolExecutor(max_workers=max(len(MANAGER_CONFIG), 1)) as ex:
+            futures = {script: ex.submit(self.launch_manager, script, config)
+                       for script, config in MANAGER_CONFIG.items()}
+        for manager_script, future in futures.items():
+            process = future.result()
+            if process:
+                self.launched_managers[manager_script] = process
+        if self._abort_boot:
+            self.shutdown_all_managers()
+            sys.exit(1)
+
+    def wait_for_managers_ready(self, timeout: float = READY_TIMEOUT) -> bool:
+        """Wait until each critical manager has logged MANAGER_READY.
+
+        A manager that has already exited is not waited on; the monitor
+        loop deals with it. Returns False if the timeout expired first.
+        """
+        since = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(self.start_time.timestamp()))
+        pending = {process.pid: script for script, process in self.launched_managers.items()
+                   if MANAGER_CONFIG[script].get('critical', True)}
+        deadline = time.monotonic() + timeout
+        self._flush_events()
+        while pending and not self.shutdown_requested:
+            for pid, script in list(pending.items()):
+                if self.launched_managers[script].poll() is not None:
+                    del pending[pid]
+            try:
+                conn = get_connection(DB_FULL_PATH, "reader")
+                for (pid,) in conn.execute(READY_SQL, (since,)):
+                    pending.pop(pid, None)
+            except sqlite3.Error as e:
+                print(f"[BOOT] Database error waiting for managers: {e}")
+                discard_connection(DB_FULL_PATH, "reader")
+            if not pending:
+                break
+            if time.monotonic() >= deadline:
+                names = ", ".join(MANAGER_CONFIG[s]['name'] for s in pending.values())
+                print(f"[BOOT] WARNING: Timed out waiting for {names} to report ready.")
+                return False
+            time.sleep(READY_POLL_INTERVAL)
+        print("[BOOT] All critical managers reported ready.")
+        return True
+
+    def _get_log_conn(self) -> sqlite3.Connection:
+        """Return the pooled writer used for lifecycle log rows."""
+        if self._log_conn is None:
+            self._log_conn = get_connection(DB_FULL_PATH, "writer")
+        return self._log_conn
+
+    def _close_log_conn(self):
+        """Return the lifecycle log connection to the pool and close it."""
+        if self._log_conn is not None:
+            discard_connection(DB_FULL_PATH, "writer")
+            self._log_conn = None
+
     def log_manager_event(self, manager_script: str, pid: int, event_type: str):
-        """Log manager events to database."""
+        """Queue a manager event for the next lifecycle log flush."""
+        timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        self._evt_buf.append((timestamp, f"boot_{manager_script}", pid, event_type,
+                              f"Boot system event for {manager_script}", "boot_system.py"))
+
+    def _flush_events(self):
+        """Write all queued manager events in a single transaction."""
+        if not self._evt_buf:
+            return
         try:
-            conn = sqlite3.connect(DB_FULL_PATH)
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO component_lifecycle_log
-                (component_id, process_pid, event_type, message, manager_script)
-                VALUES (?, ?, ?, ?, ?)
-            """, (f"boot_{manager_script}", pid, event_type, 
-                  f"Boot system event for {manager_script}", "boot_system.py"))
-            conn.commit()
-            conn.close()
+            conn = self._get_log_conn()
+            with writer_lock(DB_FULL_PATH), conn:
+                conn.executemany(LIFECYCLE_INSERT_SQL, self._evt_buf)
+            self._evt_buf.clear()
         except sqlite3.Error as e:
             print(f"[BOOT] Warning: Could not log to database: {e}")
+            self._close_log_conn()
             
     def check_manager_health(self, manager_script: str, process: subprocess.Popen) -> bool:
         """Check if a manager process is healthy."""
@@ -213,22 +343,94 @@ class BootSystem:
         
         return True
         
+    def _wait_for_child_exit(self, timeout: float) -> bool:
+        """Block until a signal arrives or ``timeout`` elapses.
+
+        Returns True if SIGCHLD was among the signals received, i.e. exited
+        children should be reaped. Other signals only wake the loop so it
+        sees the flags their handlers set. Without SIGCHLD support this
+        sleeps for at most MONITOR_POLL_INTERVAL and reports True so all
+        managers are checked.
+        """
+        if self._selector is None:
+            time.sleep(min(timeout, MONITOR_POLL_INTERVAL))
+            return True
+        if not self._selector.select(timeout):
+            return False
+        received = bytearray()
+        try:
+            while True:
+                chunk = os.read(self._wakeup_fd, 512)
+                if not chunk:
+                    break
+                received += chunk
+        except BlockingIOError:
+            pass
+        return int(signal.SIGCHLD) in received
+
+    def _reap_exited_managers(self) -> Optional[set]:
+        """Return the managers that have exited since the last call.
+
+        Uses ``waitid(P_ALL, WNOWAIT)`` to learn which children exited, then
+        reaps each one through its Popen object so its return code is
+        recorded. Returns None where ``waitid`` is unavailable (Windows).
+        """
+        if not hasattr(os, 'waitid'):
+            return None
+        pid_to_script = {p.pid: script for script, p in self.launched_managers.items()}
+        exited = set()
+        while True:
+            try:
+                res = os.waitid(os.P_ALL, 0, os.WEXITED | os.WNOHANG | os.WNOWAIT)
+            except ChildProcessError:
+                break
+            if res is None:
+                break
+            script = pid_to_script.get(res.si_pid)
+            if script is None:
+                # Not a manager we track; reap it so it is not reported again
+                try:
+                    os.waitpid(res.si_pid, os.WNOHANG)
+                except ChildProcessError:
+                    pass
+                continue
+            self.launched_managers[script].poll()
+            exited.add(script)
+        return exited
+
+    def _rebuild_managers_snapshot(self):
+        """Rebuild the monitor snapshot, keeping known last-check times."""
+        last_check = {slot.script: slot.last_check for slot in self._managers_snapshot}
+        self._managers_snapshot = [
+            ManagerSlot(script, process, MANAGER_CONFIG[script], last_check.get(script))
+            for script, process in self.launched_managers.items()
+        ]
+
     def monitor_managers(self):
         """Monitor manager health and restart if needed."""
         print("\n[BOOT] Entering monitoring mode. Press Ctrl+C to shutdown.")
         
-        last_check = {}
+        self._rebuild_managers_snapshot()
+        child_exited = True
         
         while not self.shutdown_requested:
             try:
+                if self.reload_requested:
+                    self.reload_requested = False
+                    print("\n[BOOT] Received SIGHUP. Reloading configuration...")
+                    self.reload_configuration()
+                    self._rebuild_managers_snapshot()
+
                 current_time = time.time()
+                # One waitid per wakeup instead of a poll() per manager
+                exited = self._reap_exited_managers() if child_exited else set()
                 
-                for manager_script, process in list(self.launched_managers.items()):
-                    config = MANAGER_CONFIG[manager_script]
+                for slot in self._managers_snapshot:
+                    manager_script, process, config = slot.script, slot.process, slot.config
                     
-                    # Check health at configured interval
-                    if manager_script not in last_check or \
-                       current_time - last_check[manager_script] > config['health_check_interval']:
+                    # Check health when this child exited or at the configured interval
+                    if exited is None or manager_script in exited or slot.last_check is None or \
+                       current_time - slot.last_check >= config['health_check_interval']:
                         
                         if not self.check_manager_health(manager_script, process):
                             print(f"\n[BOOT] {config['name']} appears to have crashed!")
@@ -243,16 +445,27 @@ class BootSystem:
                                 
                                 if new_process:
                                     self.launched_managers[manager_script] = new_process
+                                    slot.process = new_process
                                     print(f"[BOOT] {config['name']} restarted successfully.")
                                 else:
                                     print(f"[BOOT] Failed to restart {config['name']}. System may be unstable.")
+                                    self._rebuild_managers_snapshot()
                             else:
                                 print(f"[BOOT] {config['name']} is non-critical. Not restarting.")
                                 del self.launched_managers[manager_script]
+                                self._rebuild_managers_snapshot()
                                 
-                        last_check[manager_script] = current_time
+                        slot.last_check = current_time
                         
-                time.sleep(5)  # Main monitoring loop interval
+                self._flush_events()
+                
+                # Sleep until the next health check is due or a child exits
+                next_check = min(
+                    ((slot.last_check or current_time) + slot.config['health_check_interval']
+                     for slot in self._managers_snapshot),
+                    default=current_time + MONITOR_POLL_INTERVAL,
+                )
+                child_exited = self._wait_for_child_exit(max(0.0, next_check - time.time()))
                 
             except KeyboardInterrupt:
                 print("\n[BOOT] Keyboard interrupt received.")
@@ -301,8 +514,18 @@ class BootSystem:
                 except Exception:
                     pass
                     
+        self._flush_events()
+                    
     def cleanup(self):
         """Cleanup before exit."""
+        self._flush_events()
+        self._close_log_conn()
+        if self._selector is not None:
+            os.close(signal.set_wakeup_fd(-1))
+            self._selector.close()
+            os.close(self._wakeup_fd)
+            self._selector = None
+            self._wakeup_fd = None
         if os.path.exists(PID_FILE):
             try:
                 os.remove(PID_FILE)
@@ -341,18 +564,13 @@ class BootSystem:
         
         # Launch managers
         print("\n[BOOT] Launching managers...")
-        for manager_script, config in MANAGER_CONFIG.items():
-            process = self.launch_manager(manager_script, config)
-            if process:
-                self.launched_managers[manager_script] = process
-                
-            # Startup delay
-            if config.get('startup_delay', 0) > 0:
-                time.sleep(config['startup_delay'])
+        self.launch_all_managers()
                 
         if not self.launched_managers:
             print("\n[BOOT] ERROR: No managers were successfully launched.")
             sys.exit(1)
+
+        self.wait_for_managers_ready()
             
         print(f"\n[BOOT] Successfully launched {len(self.launched_managers)} managers.")
         print("[BOOT] System components should now be starting via their managers.")
@@ -362,6 +580,11 @@ class BootSystem:
         
         # Enter monitoring mode
         self.monitor_managers()
+
+        if self._shutdown_signal is not None:
+            sig_name = _SIG_NAMES.get(self._shutdown_signal, str(self._shutdown_signal))
+            print(f"\n[BOOT] Received {sig_name}. Starting graceful shutdown...")
+        self.shutdown_all_managers()
         
         # Cleanup on exit
         self.cleanup()
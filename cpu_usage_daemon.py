@@ -4,20 +4,25 @@ import time
 import os
 import sqlite3
 import argparse
+import signal
 
 try:
     import psutil
 except ImportError:
     psutil = None
 
-from manager_utils import log_lifecycle_event
+from manager_utils import enqueue_lifecycle_event, get_connection, discard_connection, DB_FULL_PATH
 
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 TABLE_NAME = 'cpu_usage_log'
+CORE_TABLE_NAME = 'cpu_core_usage_log'
 LIFECYCLE_TABLE_NAME = 'component_lifecycle_log'
 COMPONENT_ID = 'cpu_usage_daemon'
 POLLING_INTERVAL_SECONDS = 10
+# Samples are buffered and written in one transaction to avoid an fsync per row.
+BATCH_SIZE = 30
+FLUSH_INTERVAL_SECONDS = 300
+INSERT_SQL = f"INSERT INTO {TABLE_NAME} (cpu_usage, timestamp) VALUES (?, ?)"
+CORE_INSERT_SQL = f"INSERT INTO {CORE_TABLE_NAME} (core, cpu_usage, timestamp) VALUES (?, ?, ?)"
 
 
 def read_cpu_usage():
@@ -29,8 +34,18 @@ def read_cpu_usage():
     return None
 
 
+def read_cpu_core_usage():
+    """Return a list of per-core usage percentages from a single sample."""
+    if psutil:
+        try:
+            return psutil.cpu_percent(interval=None, percpu=True)
+        except Exception:
+            return None
+    return None
+
+
 def log_start(run_type):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE_NAME,
         COMPONENT_ID,
@@ -44,7 +59,7 @@ def log_start(run_type):
 
 
 def log_stop(run_type, message):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE_NAME,
         COMPONENT_ID,
@@ -57,34 +72,76 @@ def log_stop(run_type, message):
     )
 
 
-def main_loop(run_type):
-    conn = sqlite3.connect(DB_FULL_PATH)
-    cursor = conn.cursor()
-    while True:
-        usage = read_cpu_usage()
-        cursor.execute(
-            f"INSERT INTO {TABLE_NAME} (cpu_usage) VALUES (?)",
-            (usage,),
-        )
-        conn.commit()
-        print(f"[{COMPONENT_ID}] CPU usage {usage}%")
-        time.sleep(POLLING_INTERVAL_SECONDS)
+def flush_samples(conn, buf, core_buf=None):
+    """Write all buffered samples in a single transaction."""
+    if not buf and not core_buf:
+        return
+    with conn:
+        conn.executemany(INSERT_SQL, buf)
+        if core_buf:
+            conn.executemany(CORE_INSERT_SQL, core_buf)
+    buf.clear()
+    if core_buf:
+        core_buf.clear()
+
+
+def main_loop(run_type, percpu=False):
+    conn = get_connection(DB_FULL_PATH, "writer")
+    buf = []
+    core_buf = []
+    last_flush = time.monotonic()
+    try:
+        while True:
+            # Match the CURRENT_TIMESTAMP format so deferred rows sort correctly.
+            ts = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+            if percpu:
+                # One per-core sample also yields the aggregate, so psutil is read once.
+                cores = read_cpu_core_usage()
+                usage = sum(cores) / len(cores) if cores else None
+                core_buf.extend((core, value, ts) for core, value in enumerate(cores or ()))
+            else:
+                usage = read_cpu_usage()
+            buf.append((usage, ts))
+            if len(buf) >= BATCH_SIZE or time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS:
+                try:
+                    flush_samples(conn, buf, core_buf)
+                    last_flush = time.monotonic()
+                except sqlite3.Error as e:
+                    # The rolled-back samples stay buffered for the next tick
+                    print(f"[{COMPONENT_ID}] Could not write {len(buf)} samples, will retry: {e}")
+            print(f"[{COMPONENT_ID}] CPU usage {usage}%")
+            time.sleep(POLLING_INTERVAL_SECONDS)
+    finally:
+        try:
+            flush_samples(conn, buf, core_buf)
+        except sqlite3.Error as e:
+            print(f"[{COMPONENT_ID}] Dropped {len(buf)} buffered samples: {e}")
+        discard_connection(DB_FULL_PATH, "writer")
+
+
+def _handle_sigterm(signum, frame):
+    raise SystemExit(0)
 
 
 def main():
     parser = argparse.ArgumentParser(description='CPU usage daemon')
     parser.add_argument('--run_type', type=str, default='MANUAL_RUN')
+    parser.add_argument('--percpu', action='store_true',
+                        help=f'Also record per-core usage in {CORE_TABLE_NAME}')
     args = parser.parse_args()
 
+    # Turn SIGTERM into SystemExit so main_loop flushes buffered samples.
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+
     log_start(args.run_type)
     try:
-        main_loop(args.run_type)
+        main_loop(args.run_type, args.percpu)
     except KeyboardInterrupt:
         log_stop(args.run_type, 'Stopped via KeyboardInterrupt')
+    except SystemExit:
+        log_stop(args.run_type, 'Stopped via SIGTERM')
     except Exception as e:
         log_stop(args.run_type, f'Unexpected error: {e}')
-    finally:
-        pass
 
 
 if __name__ == '__main__':
@@ -13,6 +13,8 @@ import argparse
 import signal
 import sqlite3
 import json
+from collections import namedtuple
+from typing import List, Optional, Tuple
 from manager_utils import (
     get_venv_python,
     get_pid_file_path,
@@ -24,6 +26,18 @@ from manager_utils import (
     log_db_access,
     create_required_directories,
     launch_subprocess,
+    open_append_fd,
+    list_python_scripts,
+    get_connection,
+    discard_connection,
+    close_all_connections,
+    write_batch,
+    snapshot_pid_files,
+    live_pids,
+    parse_launch_args,
+    ensure_autorun_index,
+    PID_CACHE_FILE,
+    DB_FULL_PATH,
 )
 
 # --- Configuration ---
@@ -32,13 +46,36 @@ VENV_PYTHON_PATH = get_venv_python(PROJECT_DIR)
 PID_DIR = os.path.join(PROJECT_DIR, 'pids')
 LOGS_DIR = os.path.join(PROJECT_DIR, 'logs')
 
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 AUTORUN_TABLE_NAME = 'autorun_components'
 LIFECYCLE_TABLE_NAME = 'component_lifecycle_log'
 MANAGER_ID = 'daemon_manager'  # This manager's identifier for affinity
 # --- End Configuration ---
 
+# Scripts present at startup; anything else falls back to a filesystem check.
+VALID_SCRIPTS = list_python_scripts(PROJECT_DIR)
+
+COMPONENTS_SQL = f"""
+    SELECT component_id, base_script_name, launch_args_json, run_type_on_boot, desired_state
+    FROM {AUTORUN_TABLE_NAME}
+    WHERE manager_affinity = ?
+"""
+
+# Cheap aggregate used to detect configuration changes between polls. The
+# desired_state sum catches state flips made within the same second.
+CHANGE_TOKEN_SQL = f"""
+    SELECT COALESCE(MAX(modified_timestamp), ''), COUNT(*), SUM(desired_state = 'active')
+    FROM {AUTORUN_TABLE_NAME}
+    WHERE manager_affinity = ?
+"""
+
+AutorunComponent = namedtuple(
+    'AutorunComponent',
+    ['component_id', 'base_script_name', 'launch_args_json', 'run_type_on_boot', 'desired_state'],
+)
+
+# (change token, rows) from the last full SELECT
+_components_cache: Optional[Tuple[tuple, List[AutorunComponent]]] = None
+
 def start_component(component_id: str, base_script_name: str, launch_args_list: list, run_type: str):
     """
     Starts a single component using a subprocess, logs the attempt,
@@ -48,7 +85,7 @@ def start_component(component_id: str, base_script_name: str, launch_args_list:
     pid_file = get_pid_file_path(PID_DIR, component_id)
 
     # Check if script exists before attempting to run
-    if not os.path.exists(script_path):
+    if base_script_name not in VALID_SCRIPTS and not os.path.exists(script_path):
         log_lifecycle_event(
             DB_FULL_PATH, LIFECYCLE_TABLE_NAME, component_id, None,
             'START_FAILED', run_type, f"Script not found at {script_path}", MANAGER_ID, script_path
@@ -69,13 +106,16 @@ def start_component(component_id: str, base_script_name: str, launch_args_list:
     log_file = os.path.join(LOGS_DIR, f"{component_id}.log")
     err_file = os.path.join(LOGS_DIR, f"{component_id}.err")
 
+    log_fd = err_fd = None
     try:
+        log_fd = open_append_fd(log_file)
+        err_fd = open_append_fd(err_file)
         # Launch the component as a new background process
         process = launch_subprocess(
             full_command,
             cwd=PROJECT_DIR,
-            stdout=open(log_file, 'a'),
-            stderr=open(err_file, 'a'),
+            stdout=log_fd,
+            stderr=err_fd,
         )
         # Write the new PID to file
         write_pid_file(pid_file, process.pid)
@@ -88,6 +128,11 @@ def start_component(component_id: str, base_script_name: str, launch_args_list:
         )
         print(f"[{MANAGER_ID}] ERROR starting component '{component_id}': {e}")
         return False
+    finally:
+        # The child holds its own copies; drop the parent's descriptors
+        for fd in (log_fd, err_fd):
+            if fd is not None:
+                os.close(fd)
 
 def stop_component(component_id: str):
     """
@@ -109,61 +154,75 @@ def stop_component(component_id: str):
     os.kill(pid, signal.SIGTERM)
     # The boot system or a monitor would handle cleanup if it doesn't terminate.
 
-def get_components_from_db():
-    """Fetch all components this manager is responsible for."""
-    conn = None
+def get_launch_args(component_id: str, args_json: Optional[str]) -> List[str]:
+    """Return the flattened launch arguments; parsing is cached by JSON text."""
     try:
-        conn = sqlite3.connect(DB_FULL_PATH)
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            SELECT component_id, base_script_name, launch_args_json, run_type_on_boot, desired_state
-            FROM {AUTORUN_TABLE_NAME}
-            WHERE manager_affinity = ?
-        """, (MANAGER_ID,))
+        return list(parse_launch_args(args_json))
+    except json.JSONDecodeError:
+        print(f"[{MANAGER_ID}] WARNING: Could not parse launch_args_json for '{component_id}': {args_json}")
+        return []
+
+def get_components_from_db() -> List[AutorunComponent]:
+    """Fetch all components this manager is responsible for.
+
+    The full SELECT only runs when the change token differs from the one
+    seen on the previous poll; otherwise the cached rows are returned.
+    """
+    global _components_cache
+    try:
+        conn = get_connection(DB_FULL_PATH, "reader")
+        token = tuple(conn.execute(CHANGE_TOKEN_SQL, (MANAGER_ID,)).fetchone())
+        if _components_cache is None or _components_cache[0] != token:
+            rows = [AutorunComponent(*row) for row in conn.execute(COMPONENTS_SQL, (MANAGER_ID,))]
+            _components_cache = (token, rows)
         log_db_access(DB_FULL_PATH, MANAGER_ID, AUTORUN_TABLE_NAME, "READ")
-        return cursor.fetchall()
+        return _components_cache[1]
     except sqlite3.Error as e:
         print(f"[{MANAGER_ID}] FATAL: Database Error fetching component list: {e}")
+        discard_connection(DB_FULL_PATH, "reader")
+        _components_cache = None
         return []
-    finally:
-        if conn:
-            conn.close()
 
 def main():
     """Main operational loop for the Daemon Manager."""
+    if not os.path.exists(VENV_PYTHON_PATH):
+        print(f"ERROR: Python interpreter not found at '{VENV_PYTHON_PATH}'. Exiting.")
+        sys.exit(1)
+
     print(f"--- Starting {MANAGER_ID} ---")
     
     # Create required directories on startup
     create_required_directories(PID_DIR, LOGS_DIR)
+    ensure_autorun_index(DB_FULL_PATH, MANAGER_ID)
+    log_lifecycle_event(DB_FULL_PATH, LIFECYCLE_TABLE_NAME, MANAGER_ID, os.getpid(), 'MANAGER_READY',
+                        'autorun', f"{MANAGER_ID} initialized", MANAGER_ID)
 
     # Main loop to ensure desired state
     while True:
         try:
-            components = get_components_from_db()
-            if not components:
-                print(f"[{MANAGER_ID}] No components configured for this manager. Sleeping...")
-            
-            for comp_id, base_script, args_json, run_type, desired_state in components:
-                pid_file = get_pid_file_path(PID_DIR, comp_id)
-                pid = read_pid_file(pid_file)
-                running = is_process_running(pid)
+            # Every log row written during this pass shares one commit
+            with write_batch(DB_FULL_PATH):
+                components = get_components_from_db()
+                if not components:
+                    print(f"[{MANAGER_ID}] No components configured for this manager. Sleeping...")
                 
-                if desired_state == 'active' and not running:
-                    print(f"[{MANAGER_ID}] Found stopped component that should be active: '{comp_id}'. Starting...")
-                    launch_args = []
-                    if args_json and args_json.strip() != '{}':
-                        try:
-                            args_dict = json.loads(args_json)
-                            for key, value in args_dict.items():
-                                launch_args.extend([key, str(value)])
-                        except json.JSONDecodeError:
-                            print(f"[{MANAGER_ID}] WARNING: Could not parse launch_args_json for '{comp_id}': {args_json}")
+                # One directory scan instead of a PID file read per component
+                pids = snapshot_pid_files(PID_DIR, PID_CACHE_FILE)
+                live = live_pids()
+                for comp in components:
+                    comp_id = comp.component_id
+                    desired_state = comp.desired_state
+                    pid = pids.get(comp_id)
+                    running = is_process_running(pid, live)
                     
-                    start_component(comp_id, base_script, launch_args, run_type)
+                    if desired_state == 'active' and not running:
+                        print(f"[{MANAGER_ID}] Found stopped component that should be active: '{comp_id}'. Starting...")
+                        launch_args = get_launch_args(comp_id, comp.launch_args_json)
+                        start_component(comp_id, comp.base_script_name, launch_args, comp.run_type_on_boot)
 
-                elif desired_state == 'inactive' and running:
-                    print(f"[{MANAGER_ID}] Found running component that should be inactive: '{comp_id}'. Stopping...")
-                    stop_component(comp_id)
+                    elif desired_state == 'inactive' and running:
+                        print(f"[{MANAGER_ID}] Found running component that should be inactive: '{comp_id}'. Stopping...")
+                        stop_component(comp_id)
 
             # This manager will periodically check and enforce the desired state
             time.sleep(30) # Check every 30 seconds
@@ -175,11 +234,8 @@ def main():
             print(f"[{MANAGER_ID}] An unexpected error occurred in the main loop: {e}")
             time.sleep(60) # Wait longer on error to prevent fast error loops
 
+    close_all_connections()
     print(f"--- {MANAGER_ID} shutting down. ---")
 
 if __name__ == "__main__":
-    if not os.path.exists(VENV_PYTHON_PATH):
-        print(f"ERROR: Python interpreter not found at '{VENV_PYTHON_PATH}'. Exiting.")
-        sys.exit(1)
-    
     main()
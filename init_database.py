@@ -7,11 +7,18 @@ import sqlite3
 import os
 import json
 from datetime import datetime
-
-# --- Configuration ---
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
-# --- End Configuration ---
+from manager_utils import (
+    DB_FULL_PATH,
+    init_connection,
+    AUTORUN_INDEX_SQL,
+    LIFECYCLE_COMPONENT_INDEX_SQL,
+    LIFECYCLE_EVENT_TYPE_INDEX_SQL,
+    LIFECYCLE_TABLE_SQL,
+    METRICS_INDEX_SQL,
+    NOTIFY_PENDING_INDEX_SQL,
+    TEMPERATURE_INDEX_SQL,
+    TABLE_OPTIONS,
+)
 
 def create_database_schema():
     """Create all required tables for the n0m1_agi system."""
@@ -21,215 +28,240 @@ def create_database_schema():
         db_dir = os.path.dirname(DB_FULL_PATH)
         os.makedirs(db_dir, exist_ok=True)
         
-        conn = sqlite3.connect(DB_FULL_PATH)
+        # WAL is persistent, so setting it here covers every later connection
+        conn = init_connection(sqlite3.connect(DB_FULL_PATH))
         cursor = conn.cursor()
         
         # Enable foreign keys
         cursor.execute("PRAGMA foreign_keys = ON;")
         
         print("Creating database schema...")
+        # sqlite3 autocommits DDL by default; build the whole schema in one
+        # explicit transaction so first boot pays for a single commit
+        conn.isolation_level = None
+        cursor.execute("BEGIN")
         
         # 1. autorun_components table - Configuration for all managed components
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS autorun_components (
                 component_id TEXT PRIMARY KEY,
                 base_script_name TEXT NOT NULL,
                 manager_affinity TEXT NOT NULL,
                 desired_state TEXT NOT NULL DEFAULT 'active' CHECK (desired_state IN ('active', 'inactive')),
-                launch_args_json TEXT DEFAULT '{}',
+                launch_args_json TEXT DEFAULT '{{}}',
                 run_type_on_boot TEXT DEFAULT 'PRIMARY_RUN',
                 description TEXT,
-                created_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                modified_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
+                created_timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+                modified_timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            ){TABLE_OPTIONS};
         """)
         
         # 2. component_lifecycle_log table - Lifecycle events for all components
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS component_lifecycle_log (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                event_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
-                component_id TEXT NOT NULL,
-                process_pid INTEGER,
-                event_type TEXT NOT NULL,
-                run_type TEXT,
-                message TEXT,
-                manager_script TEXT,
-                script_path TEXT
-            );
-        """)
+        cursor.execute(LIFECYCLE_TABLE_SQL)
         
         # 3. cpu_temperature_log table - For temp_main_daemon data
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS cpu_temperature_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL,
                 temperature_celsius REAL NOT NULL
-            );
+            ){TABLE_OPTIONS};
         """)
 
         # 4. cpu_usage_log table
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS cpu_usage_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL,
                 cpu_usage REAL
-            );
+            ){TABLE_OPTIONS};
+        """)
+
+        # 4b. cpu_core_usage_log table - optional per-core samples (cpu_usage_daemon --percpu)
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS cpu_core_usage_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                core INTEGER NOT NULL,
+                cpu_usage REAL
+            ){TABLE_OPTIONS};
         """)
 
         # 5. memory_usage_log table
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS memory_usage_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL,
                 mem_usage REAL
-            );
+            ){TABLE_OPTIONS};
         """)
 
         # 6. system_metrics_log table - retained for backward compatibility
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS system_metrics_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL,
                 cpu_temp REAL,
                 cpu_usage REAL,
                 mem_usage REAL
-            );
+            ){TABLE_OPTIONS};
         """)
 
         # 7. nano_outputs table - Stores nano instance generated summaries
         cursor.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS nano_outputs (
                 id INTEGER PRIMARY KEY,
                 nano_id TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
                 content TEXT
-            );
+            ){TABLE_OPTIONS};
             """
         )
 
         # 8. cpu_temp_summary table
         cursor.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS cpu_temp_summary (
                 id INTEGER PRIMARY KEY,
                 nano_id TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
                 content TEXT
-            );
+            ){TABLE_OPTIONS};
             """
         )
 
         # 9. cpu_usage_summary table
         cursor.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS cpu_usage_summary (
                 id INTEGER PRIMARY KEY,
                 nano_id TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
                 content TEXT
-            );
+            ){TABLE_OPTIONS};
             """
         )
 
         # 10. memory_usage_summary table
         cursor.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS memory_usage_summary (
                 id INTEGER PRIMARY KEY,
                 nano_id TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
                 content TEXT
-            );
+            ){TABLE_OPTIONS};
             """
         )
 
         # 11. nano_prompts table - persistent prompts for nano instances
         cursor.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS nano_prompts (
                 nano_id TEXT PRIMARY KEY,
                 prompt TEXT NOT NULL,
-                modified_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                needs_reload INTEGER DEFAULT 0
-            );
+                modified_timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+                needs_reload INTEGER DEFAULT 0 CHECK (needs_reload IN (0, 1))
+            ){TABLE_OPTIONS};
             """
         )
 
         # 12. llm_outputs table - Stores LLM processor generated outputs
         cursor.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS llm_outputs (
                 id INTEGER PRIMARY KEY,
                 llm_id TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
                 content TEXT
-            );
+            ){TABLE_OPTIONS};
             """
         )
         
         # Create indexes for better performance
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_ac_manager ON autorun_components (manager_affinity);")
+        # The covering autorun index supersedes the old single-column idx_ac_manager.
+        cursor.execute(AUTORUN_INDEX_SQL)
+        cursor.execute("DROP INDEX IF EXISTS idx_ac_manager;")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_ac_state ON autorun_components (desired_state);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_cll_component_id ON component_lifecycle_log (component_id);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_cll_event_type ON component_lifecycle_log (event_type);")
+        # The timestamped lifecycle indexes supersede the single-column ones.
+        cursor.execute(LIFECYCLE_COMPONENT_INDEX_SQL)
+        cursor.execute(LIFECYCLE_EVENT_TYPE_INDEX_SQL)
+        cursor.execute("DROP INDEX IF EXISTS idx_cll_component_id;")
+        cursor.execute("DROP INDEX IF EXISTS idx_cll_event_type;")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_cll_timestamp ON component_lifecycle_log (event_timestamp);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_temp_timestamp ON cpu_temperature_log (timestamp);")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_metrics_timestamp ON system_metrics_log (timestamp);")
+        cursor.execute(TEMPERATURE_INDEX_SQL)
+        # The covering metrics index supersedes the old single-column one.
+        cursor.execute(METRICS_INDEX_SQL)
+        cursor.execute("DROP INDEX IF EXISTS idx_metrics_timestamp;")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_llm_out_timestamp ON llm_outputs (timestamp);")
 
         # 7. llm_io_config table - runtime configuration for LLM processors
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS llm_io_config (
                 llm_id TEXT PRIMARY KEY,
                 read_tables TEXT NOT NULL,
                 output_table TEXT NOT NULL,
-                needs_reload INTEGER DEFAULT 0
-            );
+                needs_reload INTEGER DEFAULT 0 CHECK (needs_reload IN (0, 1))
+            ){TABLE_OPTIONS};
         """)
 
         # 8. llm_notifications table - push style notifications for LLMs
-        cursor.execute("""
+        cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS llm_notifications (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 llm_id TEXT NOT NULL,
                 notification_type TEXT NOT NULL,
                 payload TEXT,
-                processed INTEGER DEFAULT 0,
-                created_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            );
+                processed INTEGER DEFAULT 0 CHECK (processed IN (0, 1)),
+                created_timestamp TEXT DEFAULT CURRENT_TIMESTAMP
+            ){TABLE_OPTIONS};
         """)
+        cursor.execute(NOTIFY_PENDING_INDEX_SQL)
 
         # 8. db_access_log table - tracks table read/write events
         cursor.execute(
-            """
+            f"""
             CREATE TABLE IF NOT EXISTS db_access_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL,
                 component_id TEXT NOT NULL,
                 table_name TEXT NOT NULL,
                 access_type TEXT NOT NULL
-            );
+            ){TABLE_OPTIONS};
             """
         )
         
-        # Create trigger to update modified_timestamp
+        # Create trigger to update modified_timestamp. It only fires when a
+        # column actually changed and the UPDATE did not set the timestamp
+        # itself, so no-op updates leave the row untouched. Recreated rather
+        # than IF NOT EXISTS so older databases pick up the WHEN clause.
+        cursor.execute("DROP TRIGGER IF EXISTS update_autorun_timestamp")
         cursor.execute("""
-            CREATE TRIGGER IF NOT EXISTS update_autorun_timestamp 
+            CREATE TRIGGER update_autorun_timestamp
             AFTER UPDATE ON autorun_components
             FOR EACH ROW
+            WHEN OLD.modified_timestamp IS NEW.modified_timestamp AND (
+                OLD.base_script_name IS NOT NEW.base_script_name OR
+                OLD.manager_affinity IS NOT NEW.manager_affinity OR
+                OLD.desired_state IS NOT NEW.desired_state OR
+                OLD.launch_args_json IS NOT NEW.launch_args_json OR
+                OLD.run_type_on_boot IS NOT NEW.run_type_on_boot OR
+                OLD.description IS NOT NEW.description
+            )
             BEGIN
                 UPDATE autorun_components SET modified_timestamp = CURRENT_TIMESTAMP 
                 WHERE component_id = NEW.component_id;
             END;
         """)
         
-        conn.commit()
+        cursor.execute("COMMIT")
         print("Database schema created successfully.")
         
     except sqlite3.Error as e:
         print(f"Database error: {e}")
+        if conn and conn.in_transaction:
+            conn.rollback()
         raise
     finally:
         if conn:
@@ -239,7 +271,7 @@ def populate_default_components():
     """Populate the autorun_components table with default component configurations."""
     conn = None
     try:
-        conn = sqlite3.connect(DB_FULL_PATH)
+        conn = init_connection(sqlite3.connect(DB_FULL_PATH))
         cursor = conn.cursor()
         
         print("\nPopulating default component configurations...")
@@ -339,14 +371,17 @@ def populate_default_components():
             }
         ]
         
-        for component in default_components:
-            # Use INSERT OR IGNORE to avoid duplicates
-            cursor.execute("""
-                INSERT OR IGNORE INTO autorun_components
-                (component_id, base_script_name, manager_affinity, desired_state,
-                 launch_args_json, run_type_on_boot, description)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """, (
+        # Note which components exist beforehand so one executemany can
+        # replace the per-row INSERT + rowcount check
+        existing = {row[0] for row in cursor.execute("SELECT component_id FROM autorun_components")}
+        # Use INSERT OR IGNORE to avoid duplicates
+        cursor.executemany("""
+            INSERT OR IGNORE INTO autorun_components
+            (component_id, base_script_name, manager_affinity, desired_state,
+             launch_args_json, run_type_on_boot, description)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (
                 component['component_id'],
                 component['base_script_name'],
                 component['manager_affinity'],
@@ -354,9 +389,12 @@ def populate_default_components():
                 component['launch_args_json'],
                 component['run_type_on_boot'],
                 component['description']
-            ))
-            
-            if cursor.rowcount > 0:
+            )
+            for component in default_components
+        ])
+
+        for component in default_components:
+            if component['component_id'] not in existing:
                 print(f"  Added component: {component['component_id']} ({component['desired_state']})")
             else:
                 print(f"  Component already exists: {component['component_id']}")
@@ -369,11 +407,10 @@ def populate_default_components():
             'cpu_usage',
             'mem_usage',
         ]
-        for nano_id in default_nano_ids:
-            cursor.execute(
-                "INSERT OR IGNORE INTO nano_prompts (nano_id, prompt) VALUES (?, '')",
-                (nano_id,)
-            )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO nano_prompts (nano_id, prompt) VALUES (?, '')",
+            [(nano_id,) for nano_id in default_nano_ids]
+        )
 
         # Insert default LLM IO configuration
         cursor.execute(
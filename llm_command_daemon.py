@@ -3,63 +3,94 @@
 import argparse
 import os
 import sqlite3
-import time
 
-from manager_utils import log_db_access
+from manager_utils import (
+    enqueue_db_access,
+    connect_sqlite,
+    retry_if_locked,
+    DB_FULL_PATH,
+    notify_socket_path,
+    open_wake_socket,
+    close_wake_socket,
+    wait_for_wake,
+    wake_on_signal,
+)
 
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 OUTPUT_TABLE = 'llm_outputs'
 AUTORUN_TABLE = 'autorun_components'
 COMPONENT_ID = 'llm_command_daemon'
+# Fallback poll; llm_processor wakes this daemon after writing outputs
 POLL_INTERVAL = 5
 
+# Table names are fixed, so the statements are built once at import
+COMPONENT_EXISTS_SQL = f"SELECT 1 FROM {AUTORUN_TABLE} WHERE component_id=?"
+ACTIVATE_COMPONENT_SQL = f"UPDATE {AUTORUN_TABLE} SET desired_state='active' WHERE component_id=?"
+INSERT_COMPONENT_SQL = f"""INSERT INTO {AUTORUN_TABLE} (
+    component_id, base_script_name, manager_affinity, desired_state
+) VALUES (?, ?, ?, 'active')"""
+NEW_OUTPUTS_SQL = f"SELECT id, content FROM {OUTPUT_TABLE} WHERE id>? ORDER BY id"
+DELETE_OUTPUT_SQL = f"DELETE FROM {OUTPUT_TABLE} WHERE id=?"
 
-def handle_command(conn: sqlite3.Connection, command: str) -> None:
-    """Process a single command string."""
+
+def handle_command(conn: sqlite3.Connection, command: str) -> bool:
+    """Process a single command string inside the caller's transaction.
+
+    Returns True if the autorun table was touched.
+    """
     if command.startswith('CMD:START '):
         comp_id = command[len('CMD:START '):].strip()
         cur = conn.cursor()
-        cur.execute(
-            f"SELECT 1 FROM {AUTORUN_TABLE} WHERE component_id=?",
-            (comp_id,)
-        )
-        log_db_access(DB_FULL_PATH, COMPONENT_ID, AUTORUN_TABLE, 'READ')
+        cur.execute(COMPONENT_EXISTS_SQL, (comp_id,))
         if cur.fetchone():
-            cur.execute(
-                f"UPDATE {AUTORUN_TABLE} SET desired_state='active' WHERE component_id=?",
-                (comp_id,),
-            )
+            cur.execute(ACTIVATE_COMPONENT_SQL, (comp_id,))
         else:
-            cur.execute(
-                f"""INSERT INTO {AUTORUN_TABLE} (
-                    component_id, base_script_name, manager_affinity, desired_state
-                ) VALUES (?, ?, ?, 'active')""",
-                (comp_id, f'{comp_id}.py', 'daemon_manager'),
-            )
-        log_db_access(DB_FULL_PATH, COMPONENT_ID, AUTORUN_TABLE, 'WRITE')
-        conn.commit()
+            cur.execute(INSERT_COMPONENT_SQL, (comp_id, f'{comp_id}.py', 'daemon_manager'))
+        return True
+    return False
+
+
+@retry_if_locked
+def apply_commands(conn: sqlite3.Connection, commands) -> bool:
+    """Apply ``(row_id, content)`` commands and delete their rows in one
+    transaction. Returns True if the autorun table was touched."""
+    touched_autorun = False
+    # IMMEDIATE takes the write lock before the first read, so the
+    # transaction never has to upgrade its lock halfway through
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        for _, content in commands:
+            touched_autorun |= handle_command(conn, content)
+        conn.executemany(DELETE_OUTPUT_SQL, [(row_id,) for row_id, _ in commands])
+    return touched_autorun
 
 
 def main_loop(run_type: str) -> None:
-    conn = sqlite3.connect(DB_FULL_PATH)
+    conn = connect_sqlite(DB_FULL_PATH)
     cur = conn.cursor()
+    wake_path = notify_socket_path(DB_FULL_PATH, COMPONENT_ID)
+    wake_sock = open_wake_socket(wake_path)
+    wake_on_signal(wake_path)
     last_id = 0
-    while True:
-        cur.execute(
-            f"SELECT id, content FROM {OUTPUT_TABLE} WHERE id>? ORDER BY id",
-            (last_id,),
-        )
-        rows = cur.fetchall()
-        log_db_access(DB_FULL_PATH, COMPONENT_ID, OUTPUT_TABLE, 'READ')
-        for row_id, content in rows:
-            last_id = row_id
-            if content and content.startswith('CMD:'):
-                handle_command(conn, content)
-                cur.execute(f"DELETE FROM {OUTPUT_TABLE} WHERE id=?", (row_id,))
-                log_db_access(DB_FULL_PATH, COMPONENT_ID, OUTPUT_TABLE, 'WRITE')
-                conn.commit()
-        time.sleep(POLL_INTERVAL)
+    try:
+        while True:
+            cur.execute(NEW_OUTPUTS_SQL, (last_id,))
+            rows = cur.fetchall()
+            enqueue_db_access(DB_FULL_PATH, COMPONENT_ID, OUTPUT_TABLE, 'READ')
+            if rows:
+                last_id = rows[-1][0]
+            commands = [(row_id, content) for row_id, content in rows
+                        if content and content.startswith('CMD:')]
+            if commands:
+                # Every command of this pass and the cleanup share one commit
+                touched_autorun = apply_commands(conn, commands)
+                # Recorded once the work is committed
+                if touched_autorun:
+                    enqueue_db_access(DB_FULL_PATH, COMPONENT_ID, AUTORUN_TABLE, 'READ')
+                    enqueue_db_access(DB_FULL_PATH, COMPONENT_ID, AUTORUN_TABLE, 'WRITE')
+                enqueue_db_access(DB_FULL_PATH, COMPONENT_ID, OUTPUT_TABLE, 'WRITE')
+            wait_for_wake(wake_sock, POLL_INTERVAL)
+    finally:
+        close_wake_socket(wake_sock, wake_path)
 
 
 def main() -> None:
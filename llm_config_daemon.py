@@ -7,68 +7,103 @@ rows to ``llm_notifications`` when a reload is requested.
 import argparse
 import os
 import sqlite3
-import time
 
-from manager_utils import log_lifecycle_event, log_db_access
+from manager_utils import (
+    enqueue_lifecycle_event,
+    enqueue_db_access,
+    connect_sqlite,
+    retry_if_locked,
+    DB_FULL_PATH,
+    notify_socket_path,
+    open_wake_socket,
+    close_wake_socket,
+    send_wake,
+    wait_for_wake,
+    wake_on_signal,
+)
 
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 CONFIG_TABLE = 'llm_io_config'
 NOTIFY_TABLE = 'llm_notifications'
 LIFECYCLE_TABLE = 'component_lifecycle_log'
 COMPONENT_ID = 'llm_config_daemon'
+# Fixed for the life of the process; resolved once for the lifecycle rows
+_PID = os.getpid()
+_SCRIPT_PATH = os.path.abspath(__file__)
+# Fallback poll; writers that set needs_reload can wake this daemon instead
 POLL_INTERVAL = 5
 
+# Table names are fixed, so the statements are built once at import
+RELOAD_FLAG_SQL = f"SELECT needs_reload FROM {CONFIG_TABLE} WHERE llm_id=?"
+NOTIFY_INSERT_SQL = f"INSERT INTO {NOTIFY_TABLE} (llm_id, notification_type, payload) VALUES (?, ?, ?)"
+CLEAR_RELOAD_SQL = f"UPDATE {CONFIG_TABLE} SET needs_reload=0 WHERE llm_id=?"
+# Test-and-clear in one statement (RETURNING needs SQLite 3.35+)
+CLAIM_RELOAD_SQL = f"UPDATE {CONFIG_TABLE} SET needs_reload=0 WHERE llm_id=? AND needs_reload=1 RETURNING llm_id"
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
 
 def log_start(run_type: str):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE,
         COMPONENT_ID,
-        os.getpid(),
+        _PID,
         'STARTED_SUCCESSFULLY',
         run_type,
         'LLM config daemon started',
         COMPONENT_ID,
-        os.path.abspath(__file__),
+        _SCRIPT_PATH,
     )
 
 
 def log_stop(run_type: str, message: str):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE,
         COMPONENT_ID,
-        os.getpid(),
+        _PID,
         'STOPPED',
         run_type,
         message,
         COMPONENT_ID,
-        os.path.abspath(__file__),
+        _SCRIPT_PATH,
     )
 
 
+@retry_if_locked
+def queue_config_reload(conn) -> bool:
+    """Turn a pending needs_reload flag into a CONFIG_RELOAD notification.
+
+    Check and clear happen under one IMMEDIATE transaction, so a flag set
+    concurrently is never lost. Returns True if a notification was queued.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if HAS_RETURNING:
+            if not conn.execute(CLAIM_RELOAD_SQL, ('main_llm_processor',)).fetchall():
+                return False
+        else:
+            row = conn.execute(RELOAD_FLAG_SQL, ('main_llm_processor',)).fetchone()
+            if not (row and row[0]):
+                return False
+            conn.execute(CLEAR_RELOAD_SQL, ('main_llm_processor',))
+        conn.execute(NOTIFY_INSERT_SQL, ('main_llm_processor', 'CONFIG_RELOAD', None))
+    return True
+
+
 def main_loop(run_type: str):
-    conn = sqlite3.connect(DB_FULL_PATH)
-    cur = conn.cursor()
-    while True:
-        cur.execute(
-            f"SELECT needs_reload FROM {CONFIG_TABLE} WHERE llm_id=?",
-            ('main_llm_processor',),
-        )
-        row = cur.fetchone()
-        log_db_access(DB_FULL_PATH, COMPONENT_ID, CONFIG_TABLE, "READ")
-        if row and row[0]:
-            cur.execute(
-                f"INSERT INTO {NOTIFY_TABLE} (llm_id, notification_type, payload) VALUES (?, ?, ?)",
-                ('main_llm_processor', 'CONFIG_RELOAD', None),
-            )
-            cur.execute(
-                f"UPDATE {CONFIG_TABLE} SET needs_reload=0 WHERE llm_id=?",
-                ('main_llm_processor',),
-            )
-            conn.commit()
-        time.sleep(POLL_INTERVAL)
+    conn = connect_sqlite(DB_FULL_PATH)
+    wake_path = notify_socket_path(DB_FULL_PATH, COMPONENT_ID)
+    wake_sock = open_wake_socket(wake_path)
+    wake_on_signal(wake_path)
+    try:
+        while True:
+            reloaded = queue_config_reload(conn)
+            enqueue_db_access(DB_FULL_PATH, COMPONENT_ID, CONFIG_TABLE, "READ")
+            if reloaded:
+                send_wake(notify_socket_path(DB_FULL_PATH, 'main_llm_processor'))
+            wait_for_wake(wake_sock, POLL_INTERVAL)
+    finally:
+        close_wake_socket(wake_sock, wake_path)
 
 
 def main() -> None:
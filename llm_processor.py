@@ -6,9 +6,10 @@ and idles waiting for tasks. It records lifecycle events in the SQLite database
 so managers can monitor its status.
 """
 import argparse
+import functools
 import os
-import time
 import sqlite3
+from typing import Tuple
 
 try:
     from transformers import AutoModelForCausalLM, AutoTokenizer
@@ -16,16 +17,42 @@ except ImportError:
     AutoModelForCausalLM = None
     AutoTokenizer = None
 
-from manager_utils import log_lifecycle_event, log_db_access
+from manager_utils import (
+    enqueue_lifecycle_event,
+    enqueue_db_access,
+    connect_sqlite,
+    retry_if_locked,
+    DB_FULL_PATH,
+    NOTIFY_PENDING_INDEX_SQL,
+    notify_socket_path,
+    open_wake_socket,
+    close_wake_socket,
+    send_wake,
+    wait_for_wake,
+    wake_on_signal,
+)
 
 # --- Configuration ---
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 LIFECYCLE_TABLE_NAME = 'component_lifecycle_log'
 COMPONENT_ID = 'main_llm_processor'
+# Fixed for the life of the process; resolved once for the lifecycle rows
+_PID = os.getpid()
+_SCRIPT_PATH = os.path.abspath(__file__)
 CONFIG_TABLE = 'llm_io_config'
 NOTIFY_TABLE = 'llm_notifications'
+# Fallback poll when no wake-up arrives (or the socket is unavailable)
 POLL_INTERVAL = 5
+
+# Table names are fixed, so the statements are built once at import
+CONFIG_SELECT_SQL = f"SELECT read_tables, output_table FROM {CONFIG_TABLE} WHERE llm_id=?"
+PENDING_NOTIFY_SQL = (
+    f"SELECT id, notification_type, payload FROM {NOTIFY_TABLE} "
+    "WHERE llm_id=? AND processed=0 ORDER BY id LIMIT 1"
+)
+MARK_PROCESSED_SQL = f"UPDATE {NOTIFY_TABLE} SET processed=1 WHERE id=?"
+KNOWN_TABLES_SQL = "SELECT name FROM sqlite_master WHERE type IN ('table', 'view')"
+# The output table is configurable, so its INSERT is rebuilt on each reload
+OUTPUT_INSERT_SQL = "INSERT INTO {table} (llm_id, content) VALUES (?, ?)"
 # --- End Configuration ---
 
 
@@ -43,35 +70,90 @@ def load_model(model_name: str):
 
 def announce_startup(run_type: str):
     """Record startup event in lifecycle log."""
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE_NAME,
         COMPONENT_ID,
-        os.getpid(),
+        _PID,
         'STARTED_SUCCESSFULLY',
         run_type,
         'LLM processor started',
-        os.path.basename(__file__),
-        os.path.abspath(__file__),
+        os.path.basename(_SCRIPT_PATH),
+        _SCRIPT_PATH,
+    )
+
+def quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+@functools.lru_cache(maxsize=64)
+def parse_tables(csv: str) -> Tuple[str, ...]:
+    """Split a comma-separated table list, cached by the raw string.
+
+    Returns a tuple so repeated RUN/PUSH payloads hand the same hashable
+    value to :func:`count_tables_sql`.
+    """
+    return tuple(t.strip() for t in csv.split(',') if t.strip())
+
+
+@functools.lru_cache(maxsize=64)
+def count_tables_sql(tables: Tuple[str, ...]) -> str:
+    """Build the UNION ALL query counting the rows of each of ``tables``."""
+    return " UNION ALL ".join(
+        f"SELECT ? AS t, COUNT(*) AS n FROM {quote_identifier(t)}" for t in tables
     )
 
+
 def load_config(conn: sqlite3.Connection):
     cur = conn.cursor()
-    cur.execute(
-        f"SELECT read_tables, output_table FROM {CONFIG_TABLE} WHERE llm_id=?",
-        (COMPONENT_ID,),
-    )
+    cur.execute(CONFIG_SELECT_SQL, (COMPONENT_ID,))
     row = cur.fetchone()
-    log_db_access(DB_FULL_PATH, COMPONENT_ID, CONFIG_TABLE, "READ")
+    enqueue_db_access(DB_FULL_PATH, COMPONENT_ID, CONFIG_TABLE, "READ")
     if row:
-        read_tables = [t.strip() for t in row[0].split(',') if t.strip()]
+        read_tables = parse_tables(row[0] or '')
         output_table = row[1]
     else:
-        read_tables = []
+        read_tables = ()
         output_table = None
     return read_tables, output_table
 
 
+@retry_if_locked
+def mark_processed(conn: sqlite3.Connection, note_id: int) -> None:
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(MARK_PROCESSED_SQL, (note_id,))
+
+
+@retry_if_locked
+def record_pull_request(conn: sqlite3.Connection, insert_output_sql: str, payload: str) -> None:
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute(insert_output_sql, (COMPONENT_ID, f'REQUEST:{payload}'))
+
+
+@retry_if_locked
+def record_table_counts(conn: sqlite3.Connection, tables, insert_output_sql: str):
+    """Write a ``<table> rows=<n>`` output row for each of ``tables``.
+
+    All counts come from one UNION ALL query inside the same transaction as
+    the inserts. Names that are not existing tables count as 0 rather than
+    reaching the SQL. Returns the tables that were actually read.
+    """
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        known = {row[0] for row in conn.execute(KNOWN_TABLES_SQL)}
+        readable = tuple(dict.fromkeys(t for t in tables if t in known))
+        counts = {}
+        if readable:
+            counts = dict(conn.execute(count_tables_sql(readable), readable).fetchall())
+        conn.executemany(
+            insert_output_sql,
+            [(COMPONENT_ID, f'{table} rows={counts.get(table, 0)}') for table in tables],
+        )
+    return readable
+
+
 def main():
     parser = argparse.ArgumentParser(description='Main LLM Processor')
     parser.add_argument('--model', default='distilgpt2', help='HuggingFace model name or path')
@@ -82,53 +164,51 @@ def main():
     announce_startup(args.run_type)
     load_model(args.model)
 
-    conn = sqlite3.connect(DB_FULL_PATH)
+    conn = connect_sqlite(DB_FULL_PATH)
+    cur = conn.cursor()
+    try:
+        # Older databases predate the partial index the poll query relies on
+        with conn:
+            conn.execute(NOTIFY_PENDING_INDEX_SQL)
+    except sqlite3.Error as e:
+        print(f"[{COMPONENT_ID}] Could not index {NOTIFY_TABLE}: {e}")
     read_tables, output_table = load_config(conn)
+    insert_output_sql = OUTPUT_INSERT_SQL.format(table=output_table)
+    wake_path = notify_socket_path(DB_FULL_PATH, COMPONENT_ID)
+    wake_sock = open_wake_socket(wake_path)
+    wake_on_signal(wake_path)
+    # llm_command_daemon picks up CMD: rows from the output table
+    command_wake_path = notify_socket_path(DB_FULL_PATH, 'llm_command_daemon')
 
     print(f"[{COMPONENT_ID}] Entering idle loop")
     try:
         while True:
-            cur = conn.cursor()
-            cur.execute(
-                f"SELECT id, notification_type, payload FROM {NOTIFY_TABLE} WHERE llm_id=? AND processed=0",
-                (COMPONENT_ID,),
-            )
+            cur.execute(PENDING_NOTIFY_SQL, (COMPONENT_ID,))
             note = cur.fetchone()
-            log_db_access(DB_FULL_PATH, COMPONENT_ID, NOTIFY_TABLE, "READ")
-            if note:
+            enqueue_db_access(DB_FULL_PATH, COMPONENT_ID, NOTIFY_TABLE, "READ")
+            if not note:
+                # Producers poke the wake socket after queueing a notification
+                wait_for_wake(wake_sock, POLL_INTERVAL)
+            else:
                 note_id, note_type, payload = note
-                cur.execute(f"UPDATE {NOTIFY_TABLE} SET processed=1 WHERE id=?", (note_id,))
-                conn.commit()
+                mark_processed(conn, note_id)
                 if note_type == 'CONFIG_RELOAD':
                     read_tables, output_table = load_config(conn)
+                    insert_output_sql = OUTPUT_INSERT_SQL.format(table=output_table)
                 elif note_type in {'RUN', 'PUSH'}:
-                    tables = read_tables
-                    if payload:
-                        tables = [t.strip() for t in payload.split(',') if t.strip()]
-                    for table in tables:
-                        try:
-                            cur.execute(f"SELECT COUNT(*) FROM {table}")
-                            count = cur.fetchone()[0]
-                            log_db_access(DB_FULL_PATH, COMPONENT_ID, table, "READ")
-                        except sqlite3.Error:
-                            count = 0
-                        cur.execute(
-                            f"INSERT INTO {output_table} (llm_id, content) VALUES (?, ?)",
-                            (COMPONENT_ID, f'{table} rows={count}'),
-                        )
-                    conn.commit()
+                    tables = parse_tables(payload) if payload else read_tables
+                    # Recorded once the work is committed
+                    for table in record_table_counts(conn, tables, insert_output_sql):
+                        enqueue_db_access(DB_FULL_PATH, COMPONENT_ID, table, "READ")
+                    send_wake(command_wake_path)
                 elif note_type == 'PULL_REQUEST' and payload:
-                    cur.execute(
-                        f"INSERT INTO {output_table} (llm_id, content) VALUES (?, ?)",
-                        (COMPONENT_ID, f'REQUEST:{payload}'),
-                    )
-                    conn.commit()
-
-            time.sleep(POLL_INTERVAL)
+                    record_pull_request(conn, insert_output_sql, payload)
+                    send_wake(command_wake_path)
     except KeyboardInterrupt:
         pass
     finally:
         conn.close()
+        close_wake_socket(wake_sock, wake_path)
 
 
 if __name__ == '__main__':
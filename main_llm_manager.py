@@ -7,28 +7,54 @@ import argparse
 import signal
 import sqlite3
 import json
+from concurrent.futures import ThreadPoolExecutor
 from manager_utils import (
     get_venv_python,
     read_pid_file,
     remove_pid_file,
+    pid_file_lock,
+    write_pid_file,
     stop_component_with_timeout,
     log_lifecycle_event,
-    log_db_access,
+    enqueue_lifecycle_event,
+    enqueue_db_access,
+    flush_log_queue,
+    DB_FULL_PATH,
+    LIFECYCLE_COMPONENT_INDEX_SQL,
+    LIFECYCLE_EVENT_TYPE_INDEX_SQL,
+    LIFECYCLE_TABLE_SQL,
+    get_connection,
+    discard_connection,
+    snapshot_pid_files,
+    spawn_component,
+    script_exists,
+    parse_launch_args,
+    live_pids,
+    PID_CACHE_FILE,
+    ensure_autorun_index,
 )
 
 # --- Configuration ---
-PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+_SCRIPT_PATH = os.path.abspath(__file__)
+_SCRIPT_NAME = os.path.basename(_SCRIPT_PATH)
+PROJECT_DIR = os.path.dirname(_SCRIPT_PATH)
 VENV_PYTHON_PATH = get_venv_python(PROJECT_DIR)
 PID_DIR = os.path.join(PROJECT_DIR, 'pids')
 LOGS_DIR = os.path.join(PROJECT_DIR, 'logs') # For the llm_processor.py logs
 
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 AUTORUN_TABLE_NAME = 'autorun_components'
 LIFECYCLE_TABLE_NAME = 'component_lifecycle_log'
+# Upper bound on components launched concurrently in one sweep
+START_WORKERS = 8
 MANAGER_ID = 'main_llm_manager' # This manager's identifier
 # --- End Configuration ---
 
+# Built once so the connection's statement cache sees identical SQL text
+ACTIVE_COMPONENTS_SQL = f"""
+    SELECT component_id, base_script_name, launch_args_json, run_type_on_boot
+    FROM {AUTORUN_TABLE_NAME}
+    WHERE manager_affinity = ? AND desired_state = 'active'
+"""
 # --- Utility Functions (get_pid_file_path, is_process_running, create_supporting_tables_if_not_exist) ---
 # These should be identical to those in daemon_manager.py / nano_manager.py
 # Ensure create_supporting_tables_if_not_exist() creates the component_lifecycle_log
@@ -42,70 +68,61 @@ def is_process_running(pid):
     else: return True
 
 def create_supporting_tables_if_not_exist():
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FULL_PATH)
+        conn = get_connection(DB_FULL_PATH, "writer")
         cursor = conn.cursor()
-        cursor.execute(f"""
-            CREATE TABLE IF NOT EXISTS {LIFECYCLE_TABLE_NAME} (
-                id INTEGER PRIMARY KEY AUTOINCREMENT, event_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
-                component_id TEXT NOT NULL, process_pid INTEGER, event_type TEXT NOT NULL,
-                run_type TEXT, message TEXT, manager_script TEXT, script_path TEXT);
-        """)
-        cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_cll_component_id ON {LIFECYCLE_TABLE_NAME} (component_id);")
+        cursor.execute(LIFECYCLE_TABLE_SQL)
+        cursor.execute(LIFECYCLE_COMPONENT_INDEX_SQL)
+        cursor.execute(LIFECYCLE_EVENT_TYPE_INDEX_SQL)
         conn.commit()
-    except sqlite3.Error as e: print(f"[{MANAGER_ID}] DB Error creating {LIFECYCLE_TABLE_NAME}: {e}")
-    finally:
-        if conn: conn.close()
+    except sqlite3.Error as e:
+        print(f"[{MANAGER_ID}] DB Error creating {LIFECYCLE_TABLE_NAME}: {e}")
+        discard_connection(DB_FULL_PATH, "writer")
+        return
+    ensure_autorun_index(DB_FULL_PATH, MANAGER_ID)
 # --- End Utility Functions ---
 
 def start_component(component_id, base_script_name, launch_args_list, run_type):
+    """Start a component. The START_ATTEMPT row is queued for the background
+    log writer so the launch never waits on SQLite."""
     # This function is identical to start_component in daemon_manager.py / nano_manager.py
     # It logs START_ATTEMPT, builds command with --run_type, Popen, logs PID and log file locations.
     # For brevity, assuming it's copied here and works.
     pid_file = get_pid_file_path(component_id)
+    with pid_file_lock(pid_file) as locked:
+        if not locked:
+            print(f"[{MANAGER_ID}] Component '{component_id}' is being started by another manager. Skipping.")
+            return True
+        return _start_component(component_id, base_script_name, launch_args_list, run_type, pid_file)
+
+
+def _start_component(component_id, base_script_name, launch_args_list, run_type, pid_file):
     script_path = os.path.join(PROJECT_DIR, base_script_name)
 
-    if os.path.exists(pid_file):
-        pid = None
-        try:
-            with open(pid_file, 'r') as f: pid_str = f.read().strip(); pid = int(pid_str) if pid_str else None
-            if pid and is_process_running(pid):
-                print(f"[{MANAGER_ID}] Component '{component_id}' (PID: {pid}) already running.")
-                return True
-        except: pass 
-        if os.path.exists(pid_file): os.remove(pid_file) # Clean up if stale or corrupt
-
-    if not os.path.exists(script_path):
+    pid = read_pid_file(pid_file)
+    if pid and is_process_running(pid):
+        print(f"[{MANAGER_ID}] Component '{component_id}' (PID: {pid}) already running.")
+        return True
+    remove_pid_file(pid_file) # Clean up if stale or corrupt
+
+    if not script_exists(script_path):
         print(f"[{MANAGER_ID}] ERROR: Script '{base_script_name}' for '{component_id}' not found. Skipping.")
         return False
 
-    conn_lc = None
-    try:
-        conn_lc = sqlite3.connect(DB_FULL_PATH)
-        cursor_lc = conn_lc.cursor()
-        cursor_lc.execute(f"INSERT INTO {LIFECYCLE_TABLE_NAME} (component_id, event_type, run_type, message, manager_script) VALUES (?, 'START_ATTEMPT', ?, ?, ?)",
-                          (component_id, run_type, f"Manager {MANAGER_ID} attempting to start {base_script_name}", os.path.basename(__file__)))
-        conn_lc.commit()
-    except sqlite3.Error as e: print(f"[{MANAGER_ID}] DB Error logging START_ATTEMPT for '{component_id}': {e}")
-    finally:
-        if conn_lc: conn_lc.close()
+    enqueue_lifecycle_event(DB_FULL_PATH, LIFECYCLE_TABLE_NAME, component_id, None, 'START_ATTEMPT', run_type,
+                            f"Manager {MANAGER_ID} attempting to start {base_script_name}", _SCRIPT_NAME)
 
     full_command = [VENV_PYTHON_PATH, script_path] + launch_args_list + ['--run_type', run_type]
-    command_str_for_log = " ".join(full_command)
-    print(f"[{MANAGER_ID}] Starting component '{component_id}' with command: {command_str_for_log}...")
+    print(f"[{MANAGER_ID}] Starting component '{component_id}' with command: {' '.join(full_command)}...")
     
     log_file_path = os.path.join(LOGS_DIR, f"{component_id}.log") # e.g., main_llm_processor.log
     err_file_path = os.path.join(LOGS_DIR, f"{component_id}.err")
     os.makedirs(LOGS_DIR, exist_ok=True)
 
     try:
-        process = subprocess.Popen(
-            full_command, cwd=PROJECT_DIR,
-            stdout=open(log_file_path, "a"), stderr=open(err_file_path, "a")
-        )
-        with open(pid_file, 'w') as f: f.write(str(process.pid))
-        print(f"[{MANAGER_ID}] Component '{component_id}' started with PID: {process.pid}. Logs: '{log_file_path}'")
+        pid = spawn_component(full_command, PROJECT_DIR, log_file_path, err_file_path)
+        write_pid_file(pid_file, pid)
+        print(f"[{MANAGER_ID}] Component '{component_id}' started with PID: {pid}. Logs: '{log_file_path}'")
         return True
     except Exception as e:
         print(f"[{MANAGER_ID}] Error starting component '{component_id}': {e}")
@@ -149,12 +166,15 @@ def stop_component(component_id, signal_to_send=signal.SIGTERM):
 def get_component_status(component_id):
     # Identical to get_component_status in other managers
     # print(f"[{MANAGER_ID}] Placeholder: get_component_status({component_id}) called.")
-    pid_file = get_pid_file_path(component_id)
-    if os.path.exists(pid_file):
-        try:
-            with open(pid_file, 'r') as f: pid_str = f.read().strip(); pid = int(pid_str) if pid_str else None
-            if pid and is_process_running(pid): return "RUNNING", pid
-        except: pass
+    pid = read_pid_file(get_pid_file_path(component_id))
+    if pid and is_process_running(pid): return "RUNNING", pid
+    return "STOPPED", None
+
+def get_component_status_cached(component_id, pid_snapshot, live=None):
+    """Like get_component_status, but using PIDs from snapshot_pid_files and,
+    when given, the live PID set from live_pids()."""
+    pid = pid_snapshot.get(component_id)
+    if pid and (pid in live if live is not None else is_process_running(pid)): return "RUNNING", pid
     return "STOPPED", None
 
 def ensure_autorun_components_active():
@@ -163,46 +183,45 @@ def ensure_autorun_components_active():
     # (typically just 'main_llm_processor')
     # The logic is identical to daemon_manager.py's ensure_autorun_components_active,
     # just with MANAGER_ID = 'main_llm_manager'
-    conn = None
     try:
-        conn = sqlite3.connect(DB_FULL_PATH)
+        conn = get_connection(DB_FULL_PATH, "reader")
         cursor = conn.cursor()
-        cursor.execute(f"""
-            SELECT component_id, base_script_name, launch_args_json, run_type_on_boot
-            FROM {AUTORUN_TABLE_NAME}
-            WHERE manager_affinity = ? AND desired_state = 'active'
-        """, (MANAGER_ID,))
-        log_db_access(DB_FULL_PATH, MANAGER_ID, AUTORUN_TABLE_NAME, "READ")
+        cursor.execute(ACTIVE_COMPONENTS_SQL, (MANAGER_ID,))
+        enqueue_db_access(DB_FULL_PATH, MANAGER_ID, AUTORUN_TABLE_NAME, "READ")
         
         components_to_manage = cursor.fetchall()
         if not components_to_manage:
             print(f"[{MANAGER_ID}] No active components found assigned to this manager in '{AUTORUN_TABLE_NAME}'.")
             return
 
+        pid_snapshot = snapshot_pid_files(PID_DIR, PID_CACHE_FILE)
+        live = live_pids()
+        tasks = []
         for comp_id, base_script, args_json_str, run_type in components_to_manage:
-            status, _ = get_component_status(comp_id)
+            status, _ = get_component_status_cached(comp_id, pid_snapshot, live)
             if status == "RUNNING": continue
             
             print(f"[{MANAGER_ID}] Autorun component '{comp_id}' found inactive. Attempting to start.")
-            launch_args = []
-            if args_json_str and args_json_str.strip() != '{}':
-                try:
-                    args_dict = json.loads(args_json_str)
-                    for key, value in args_dict.items():
-                        launch_args.extend([key, str(value)])
-                except json.JSONDecodeError:
-                    print(f"[{MANAGER_ID}] WARNING: Could not parse launch_args_json for '{comp_id}': {args_json_str}")
+            try:
+                launch_args = list(parse_launch_args(args_json_str))
+            except json.JSONDecodeError:
+                launch_args = []
+                print(f"[{MANAGER_ID}] WARNING: Could not parse launch_args_json for '{comp_id}': {args_json_str}")
             
-            start_component(comp_id, base_script, launch_args, run_type)
-            # No sleep needed if only one component typically
+            tasks.append((comp_id, base_script, launch_args, run_type))
+
+        # Launch every inactive component at once rather than one by one
+        if tasks:
+            with ThreadPoolExecutor(max_workers=min(START_WORKERS, len(tasks))) as ex:
+                list(ex.map(lambda task: start_component(*task), tasks))
 
     except sqlite3.Error as e:
         print(f"[{MANAGER_ID}] Database Error in ensure_autorun_components_active: {e}")
-    finally:
-        if conn: conn.close()
+        discard_connection(DB_FULL_PATH, "reader")
 
 
-if __name__ == "__main__":
+def main():
+    """Entry point used when the boot system launches this manager."""
     if not os.path.exists(VENV_PYTHON_PATH):
         print(f"ERROR: Python interpreter not found at '{VENV_PYTHON_PATH}'. Exiting.")
         sys.exit(1)
@@ -212,9 +231,16 @@ if __name__ == "__main__":
     for dir_path_to_check in [PID_DIR, LOGS_DIR]:
         if not os.path.exists(dir_path_to_check): os.makedirs(dir_path_to_check)
     create_supporting_tables_if_not_exist() # For component_lifecycle_log
+    log_lifecycle_event(DB_FULL_PATH, LIFECYCLE_TABLE_NAME, MANAGER_ID, os.getpid(), 'MANAGER_READY',
+                        'autorun', f"{MANAGER_ID} initialized", MANAGER_ID)
     
     ensure_autorun_components_active()
+    flush_log_queue()
     print(f"[{MANAGER_ID}] Operations cycle complete. This manager will now exit if it only started components.")
     # Unlike daemons, this manager might just run once at boot to start llm_processor.py,
     # unless you want it to continuously monitor and restart llm_processor.py if it crashes.
     # For now, it runs once.
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,135 @@
 Shared utility functions for all manager scripts.
 This module provides common functionality for process management.
 """
+import atexit
+import functools
+import json
 import os
+import queue
+import select
 import signal
+import socket
 import time
 import sqlite3
 import sys
 import subprocess
-from typing import Optional, Tuple
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+DB_FILE_NAME = 'n0m1_agi.db'
+# Resolved once here so every module opens the database by the same path
+DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
+# Parsed PID files keyed by (inode, mtime), shared across manager runs
+PID_CACHE_FILE = os.path.expanduser('~/.cache/n0m1_agi/pidcache.json')
+# A PID directory whose mtime is at least this much older than the last scan
+# can be trusted unchanged: any later write would carry a newer timestamp.
+PID_DIR_SETTLE_NS = 2_000_000_000
+# Probe processes through /proc where it exists instead of signalling them
+HAS_PROC = sys.platform.startswith('linux') and os.path.isdir('/proc')
+
+# Applied to every pooled connection so all components agree on journal mode
+# and locking behaviour.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Matches the busy_timeout PRAGMA; retry_if_locked's total budget
+BUSY_TIMEOUT_S = 5.0
+
+# How long the exit-time flush waits for the log thread before giving up
+LOG_FLUSH_TIMEOUT_S = 5.0
+
+# Per-connection LRU of compiled statements; the hot INSERTs below stay in it
+STATEMENT_CACHE_SIZE = 256
+
+# STRICT tables (SQLite >= 3.37) store only the declared column types and
+# reject mistyped values at insert time; older libraries get a plain table.
+TABLE_OPTIONS = " STRICT" if sqlite3.sqlite_version_info >= (3, 37, 0) else ""
+
+# init_database creates the lifecycle log from this; the managers re-issue it
+# so they can log before the database has been initialised.
+LIFECYCLE_TABLE_SQL = f"""
+    CREATE TABLE IF NOT EXISTS component_lifecycle_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL,
+        component_id TEXT NOT NULL,
+        process_pid INTEGER,
+        event_type TEXT NOT NULL,
+        run_type TEXT,
+        message TEXT,
+        manager_script TEXT,
+        script_path TEXT
+    ){TABLE_OPTIONS};
+"""
+LIFECYCLE_INSERT_SQL = """
+    INSERT INTO {table}
+    (component_id, process_pid, event_type, run_type, message, manager_script, script_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+# Indexes behind the hot poll queries. init_database creates them on a fresh
+# database; the components re-issue them at startup for older databases.
+# Covers the managers' autorun queries (filter, projection and the
+# daemon_manager change token) so they never touch the table itself.
+AUTORUN_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_ac_affinity_state ON autorun_components
+    (manager_affinity, desired_state, component_id, base_script_name,
+     launch_args_json, run_type_on_boot, modified_timestamp);
+"""
+# Partial index: pending-notification lookups scale with the backlog, not
+# with every notification ever sent
+NOTIFY_PENDING_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_llm_notify_pending ON llm_notifications (llm_id, id)
+    WHERE processed = 0;
+"""
+# Newest event per component (status, restart checks): one seek per component
+LIFECYCLE_COMPONENT_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_cll_comp_ts ON component_lifecycle_log
+    (component_id, event_timestamp DESC);
+"""
+# Recent events of given types, e.g. the errors `n0m1_control status` lists
+LIFECYCLE_EVENT_TYPE_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_cll_type_ts ON component_lifecycle_log
+    (event_type, event_timestamp);
+"""
+# Covers `n0m1_control metrics` (newest rows first) without touching the table
+METRICS_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_sml_ts ON system_metrics_log
+    (timestamp DESC, cpu_usage, mem_usage, cpu_temp);
+"""
+# Lets nano instances reading cpu_temperature_log seek the newest row
+TEMPERATURE_INDEX_SQL = """
+    CREATE INDEX IF NOT EXISTS idx_temp_timestamp ON cpu_temperature_log (timestamp);
+"""
+DB_ACCESS_INSERT_SQL = (
+    "INSERT INTO db_access_log (component_id, table_name, access_type) VALUES (?, ?, ?)"
+)
+# table name -> formatted lifecycle INSERT, so the statement cache key is stable
+_lifecycle_sql: Dict[str, str] = {}
+
+# db_path -> nesting depth of open write_batch() blocks
+_batch_depth: Dict[str, int] = {}
+
+# (db_path, sql, row) tuples written by the background log thread
+_log_queue: "queue.Queue[tuple]" = queue.Queue()
+_log_thread: Optional[threading.Thread] = None
+_log_thread_lock = threading.Lock()
+
+_pool_lock = threading.Lock()
+_writer_pool: Dict[str, sqlite3.Connection] = {}
+# db_path -> lock serialising statement+commit sequences on the shared writer
+_writer_locks: Dict[str, threading.RLock] = {}
+_reader_pool = threading.local()
 
 
 def get_venv_python(project_dir: str) -> str:
@@ -32,8 +154,65 @@ def get_pid_file_path(pid_dir: str, component_id: str) -> str:
     return os.path.join(pid_dir, f"{component_id}.pid")
 
 
+def list_python_scripts(directory: str) -> frozenset:
+    """Return the names of the ``.py`` files directly inside ``directory``."""
+    try:
+        return frozenset(name for name in os.listdir(directory) if name.endswith(".py"))
+    except OSError:
+        return frozenset()
+
+
+@functools.lru_cache(maxsize=256)
+def script_exists(path: str) -> bool:
+    """``os.path.exists`` memoized for the life of the process.
+
+    Meant for run-once managers: a script added while the process runs is
+    not noticed until the next invocation.
+    """
+    return os.path.exists(path)
+
+@functools.lru_cache(maxsize=128)
+def parse_launch_args(args_json: Optional[str]) -> Tuple[str, ...]:
+    """Flatten a ``launch_args_json`` object into command-line arguments.
+
+    ``'{"--instance_id": "x"}'`` becomes ``('--instance_id', 'x')``. Results
+    are cached by JSON text, since many components share the same string.
+    Raises ``json.JSONDecodeError`` for malformed JSON.
+    """
+    if not args_json or args_json.strip() == '{}':
+        return ()
+    return tuple(item for key, value in json.loads(args_json).items() for item in (key, str(value)))
+
+def open_append_fd(path: str) -> int:
+    """Open ``path`` for appending and return a raw file descriptor.
+
+    The descriptor is close-on-exec so it only reaches a child through
+    an explicit stdout/stderr redirection. Callers must ``os.close`` it.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, "O_CLOEXEC", 0)
+    return os.open(path, flags, 0o644)
+
+
+def sleep_to_next_tick(last_tick: float, interval: float) -> float:
+    """Sleep until ``interval`` seconds after ``last_tick``; return the new tick.
+
+    Ticks are ``time.monotonic()`` values, so time spent in a polling loop's
+    body does not push later polls back. After an overrun the loop does not
+    try to catch up: the next tick is simply "now".
+    """
+    tick = last_tick + interval
+    delay = tick - time.monotonic()
+    time.sleep(max(0.0, delay))
+    return tick if delay > 0 else time.monotonic()
+
+
 def launch_subprocess(cmd, cwd=None, stdout=None, stderr=None):
-    """Launch a subprocess in its own process group cross-platform."""
+    """Launch a subprocess in its own process group cross-platform.
+
+    On POSIX the new session is requested with ``start_new_session`` rather
+    than ``preexec_fn=os.setsid``: a preexec_fn forces a full fork() of the
+    parent, while without one CPython can launch via vfork()/posix_spawn.
+    """
     kwargs = {
         "cwd": cwd,
         "stdout": stdout,
@@ -42,10 +221,39 @@ def launch_subprocess(cmd, cwd=None, stdout=None, stderr=None):
     if os.name == "nt":
         kwargs["creationflags"] = subprocess.CREATE_NEW_PROCESS_GROUP
     else:
-        kwargs["preexec_fn"] = os.setsid
+        kwargs["start_new_session"] = True
     return subprocess.Popen(cmd, **kwargs)
 
 
+def spawn_component(cmd, cwd: str, log_path: str, err_path: str) -> int:
+    """Start a detached component with output appended to log files.
+
+    Returns the child's PID. Where available this uses ``os.posix_spawn``,
+    whose cost does not grow with the parent's memory size. posix_spawn
+    cannot change directory, so when ``cwd`` is not already the current
+    directory (and on Windows) this falls back to ``launch_subprocess``.
+    The caller does not get a Popen object and never reaps the child, so
+    this suits managers that exit after starting their components.
+    """
+    if hasattr(os, "posix_spawn") and os.path.realpath(os.getcwd()) == os.path.realpath(cwd):
+        flags = os.O_WRONLY | os.O_CREAT | os.O_APPEND
+        file_actions = [
+            (os.POSIX_SPAWN_OPEN, 1, log_path, flags, 0o644),
+            (os.POSIX_SPAWN_OPEN, 2, err_path, flags, 0o644),
+        ]
+        return os.posix_spawn(cmd[0], cmd, os.environ, file_actions=file_actions, setsid=True)
+
+    log_fd = err_fd = None
+    try:
+        log_fd = open_append_fd(log_path)
+        err_fd = open_append_fd(err_path)
+        return launch_subprocess(cmd, cwd=cwd, stdout=log_fd, stderr=err_fd).pid
+    finally:
+        for fd in (log_fd, err_fd):
+            if fd is not None:
+                os.close(fd)
+
+
 def terminate_process(proc):
     """Terminate a process started with :func:`launch_subprocess`."""
     if os.name == "nt":
@@ -59,33 +267,162 @@ def terminate_process(proc):
         except ProcessLookupError:
             pass
 
-def is_process_running(pid: Optional[int]) -> bool:
-    """Check if a process with given PID is running."""
+def live_pids() -> Optional[frozenset]:
+    """Return the PIDs of all live processes from one ``/proc`` scan.
+
+    Returns None where ``/proc`` is unavailable (non-Linux), in which case
+    callers fall back to probing each PID individually.
+    """
+    try:
+        with os.scandir('/proc') as entries:
+            return frozenset(int(e.name) for e in entries if e.name.isdigit())
+    except OSError:
+        return None
+
+def is_process_running(pid: Optional[int], live: Optional[frozenset] = None) -> bool:
+    """Check if a process with given PID is running.
+
+    ``live`` may be a ``live_pids()`` snapshot shared across many checks;
+    without one each call stats ``/proc/<pid>`` on Linux and probes the
+    PID with ``os.kill(pid, 0)`` elsewhere.
+    """
     if pid is None:
         return False
+    if live is not None:
+        return pid in live
+    if HAS_PROC:
+        return os.path.exists(f"/proc/{pid}")
     try:
         os.kill(pid, 0)
         return True
     except OSError:
         return False
 
+def process_start_time(pid: int) -> Optional[int]:
+    """Return the start time of ``pid`` in clock ticks since boot.
+
+    Taken from field 22 of ``/proc/<pid>/stat``; a PID whose start time
+    changes has been reused by another process. None when the process is
+    gone or ``/proc`` is unavailable.
+    """
+    if not HAS_PROC:
+        return None
+    try:
+        with open(f"/proc/{pid}/stat", 'rb') as f:
+            stat = f.read()
+        # comm (field 2) may contain spaces, so split after its closing paren
+        return int(stat[stat.rindex(b')') + 2:].split()[19])
+    except (OSError, ValueError, IndexError):
+        return None
+
 def read_pid_file(pid_file: str) -> Optional[int]:
     """Read PID from file, returning None if file doesn't exist or is invalid."""
-    if not os.path.exists(pid_file):
+    # One open and one read: a missing file is just the FileNotFoundError case
+    try:
+        fd = os.open(pid_file, os.O_RDONLY)
+    except OSError:
         return None
-    
     try:
-        with open(pid_file, 'r') as f:
-            pid_str = f.read().strip()
-            return int(pid_str) if pid_str else None
-    except (ValueError, IOError):
+        pid_str = os.read(fd, 32).strip()
+        return int(pid_str) if pid_str else None
+    except (ValueError, OSError):
         return None
+    finally:
+        os.close(fd)
+
+# cache_file -> {pid file path: [inode, mtime_ns, pid]}, loaded once per process
+_pid_caches: Dict[str, Dict[str, list]] = {}
+
+def _load_pid_cache(cache_file: str) -> Dict[str, list]:
+    cache = _pid_caches.get(cache_file)
+    if cache is None:
+        try:
+            with open(cache_file, 'r') as f:
+                cache = json.load(f)
+            if not isinstance(cache, dict):
+                cache = {}
+        except (OSError, ValueError):
+            cache = {}
+        _pid_caches[cache_file] = cache
+    return cache
+
+def _save_pid_cache(cache_file: str, cache: Dict[str, list]) -> None:
+    _pid_caches[cache_file] = cache
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        tmp = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(cache, f)
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        print(f"Error writing PID cache {cache_file}: {e}")
+
+def snapshot_pid_files(pid_dir: str, cache_file: Optional[str] = None) -> Dict[str, int]:
+    """Read every ``<component_id>.pid`` in ``pid_dir`` with one directory scan.
+
+    Returns a ``{component_id: pid}`` dict; unreadable or empty files are
+    left out, as if the component had no PID file. With ``cache_file``, a
+    PID file whose inode and mtime match the cached entry is not reopened,
+    and if the directory itself is unchanged since a settled scan the files
+    are not even listed. That relies on PID files being replaced rather
+    than rewritten in place, as ``write_pid_file`` does.
+    """
+    cache = _load_pid_cache(cache_file) if cache_file else None
+    fresh: Dict[str, list] = {}
+    pids: Dict[str, int] = {}
+    dir_key = None
+    if cache is not None:
+        try:
+            st = os.stat(pid_dir)
+            dir_key = [st.st_ino, st.st_mtime_ns]
+        except OSError:
+            pass
+        hit = cache.get(pid_dir)
+        if dir_key and hit and hit[:2] == dir_key and hit[2] - dir_key[1] >= PID_DIR_SETTLE_NS:
+            return {os.path.basename(path)[:-4]: entry[2]
+                    for path, entry in cache.items() if path != pid_dir}
+    scanned_ns = time.time_ns()
+    try:
+        with os.scandir(pid_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith('.pid'):
+                    continue
+                try:
+                    key = None
+                    if cache is not None:
+                        st = entry.stat()
+                        key = [st.st_ino, st.st_mtime_ns]
+                        hit = cache.get(entry.path)
+                        if hit and hit[:2] == key:
+                            pids[entry.name[:-4]] = hit[2]
+                            fresh[entry.path] = hit
+                            continue
+                    with open(entry.path, 'r') as f:
+                        pid = int(f.read().strip())
+                except (ValueError, OSError):
+                    continue
+                pids[entry.name[:-4]] = pid
+                if key is not None:
+                    fresh[entry.path] = key + [pid]
+    except OSError:
+        pass
+    if dir_key is not None:
+        fresh[pid_dir] = dir_key + [scanned_ns]
+    if cache is not None and fresh != cache:
+        _save_pid_cache(cache_file, fresh)
+    return pids
 
 def write_pid_file(pid_file: str, pid: int) -> bool:
-    """Write PID to file. Returns True on success."""
+    """Write PID to file. Returns True on success.
+
+    The file is replaced atomically, so readers never see a partial PID and
+    the directory mtime changes for ``snapshot_pid_files``.
+    """
+    tmp = f"{pid_file}.{os.getpid()}.tmp"
     try:
-        with open(pid_file, 'w') as f:
+        with open(tmp, 'w') as f:
             f.write(str(pid))
+        os.replace(tmp, pid_file)
         return True
     except IOError as e:
         print(f"Error writing PID file {pid_file}: {e}")
@@ -93,14 +430,112 @@ def write_pid_file(pid_file: str, pid: int) -> bool:
 
 def remove_pid_file(pid_file: str) -> bool:
     """Remove PID file if it exists. Returns True if removed or didn't exist."""
-    if os.path.exists(pid_file):
+    try:
+        os.remove(pid_file)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Error removing PID file {pid_file}: {e}")
+        return False
+    return True
+
+@contextmanager
+def pid_file_lock(pid_file: str):
+    """Hold an exclusive, non-blocking lock for starting ``pid_file``'s component.
+
+    Yields False if another process holds it, so two managers never launch
+    the same component at once. Without fcntl (Windows) it always yields True.
+    """
+    if fcntl is None:
+        yield True
+        return
+    fd = os.open(f"{pid_file}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            yield False
+            return
+        yield True
+    finally:
+        os.close(fd)  # closing the descriptor releases the lock
+
+def _reap_if_child(pid: int, pidfd: Optional[int] = None) -> None:
+    """Collect ``pid``'s exit status if it is our child, so it leaves no zombie.
+
+    Given a pidfd, reaps through it with waitid(P_PIDFD) so a reused PID can
+    never be collected by mistake.
+    """
+    try:
+        if pidfd is not None and hasattr(os, 'P_PIDFD'):
+            os.waitid(os.P_PIDFD, pidfd, os.WEXITED | os.WNOHANG)
+        else:
+            os.waitpid(pid, os.WNOHANG)
+    except ChildProcessError:
+        pass
+
+def open_pidfd(pid: int) -> Optional[int]:
+    """Return a descriptor pinned to process ``pid`` (Linux 5.3+).
+
+    Unlike the PID, it can never come to refer to another process. Returns
+    None where pidfds are unsupported; raises ProcessLookupError if the
+    process is already gone. The caller closes it.
+    """
+    pidfd_open = getattr(os, 'pidfd_open', None)
+    if pidfd_open is None:
+        return None
+    try:
+        return pidfd_open(pid)
+    except ProcessLookupError:
+        raise
+    except OSError:
+        return None  # kernel without pidfd support
+
+def send_signal(pid: int, sig: int, pidfd: Optional[int] = None) -> None:
+    """Signal ``pid``, through ``pidfd`` when one from :func:`open_pidfd` is given."""
+    if pidfd is not None and hasattr(signal, 'pidfd_send_signal'):
+        signal.pidfd_send_signal(pidfd, sig)
+    else:
+        os.kill(pid, sig)
+
+def wait_for_exit(pid: int, timeout: float, start_time: Optional[int] = None,
+                  pidfd: Optional[int] = None) -> bool:
+    """Wait up to ``timeout`` seconds for ``pid`` to exit. Returns True if it did.
+
+    With a pidfd (Linux 5.3+) the kernel wakes us as soon as the process
+    exits; elsewhere this polls every 0.1 s. Our own children are reaped.
+    A ``pidfd`` passed in is used and left open; otherwise one is opened.
+    When polling, a ``start_time`` from :func:`process_start_time` that no
+    longer matches means the PID was reused, so the process counts as gone.
+    """
+    own_fd = pidfd is None
+    if own_fd:
+        try:
+            pidfd = open_pidfd(pid)
+        except ProcessLookupError:
+            return True
+    if pidfd is not None:
         try:
-            os.remove(pid_file)
+            # poll() rather than select(), which rejects fds >= FD_SETSIZE
+            poller = select.poll()
+            poller.register(pidfd, select.POLLIN)
+            exited = bool(poller.poll(max(0, int(timeout * 1000))))
+            if exited:
+                _reap_if_child(pid, pidfd)
+        finally:
+            if own_fd:
+                os.close(pidfd)
+        return exited
+    deadline = time.monotonic() + timeout
+    while True:
+        _reap_if_child(pid)
+        if not is_process_running(pid):
+            return True
+        if start_time is not None and process_start_time(pid) != start_time:
             return True
-        except OSError as e:
-            print(f"Error removing PID file {pid_file}: {e}")
+        if time.monotonic() >= deadline:
             return False
-    return True
+        time.sleep(0.1)
 
 def stop_component_with_timeout(
     component_id: str,
@@ -121,30 +556,34 @@ def stop_component_with_timeout(
         'STOP_REQUESTED', None, f"{manager_id} requesting stop", manager_id
     )
     
+    pidfd = None
     try:
+        # Pin the process (or, without pidfds, remember its start time) so a
+        # reused PID is never signalled
+        pidfd = open_pidfd(pid)
+        start_time = process_start_time(pid)
+
         # Send initial signal
-        os.kill(pid, signal_to_send)
+        send_signal(pid, signal_to_send, pidfd)
         print(f"[{manager_id}] Sent {signal.Signals(signal_to_send).name} to {component_id} (PID: {pid})")
         
         # Wait for process to terminate
-        start_time = time.time()
-        while time.time() - start_time < timeout_seconds:
-            if not is_process_running(pid):
-                # Process stopped successfully
-                log_lifecycle_event(
-                    db_path, lifecycle_table, component_id, pid,
-                    'STOPPED_SUCCESSFULLY', None, "Process terminated gracefully", manager_id
-                )
-                print(f"[{manager_id}] Component '{component_id}' stopped successfully.")
-                return True
-            time.sleep(0.1)
+        if wait_for_exit(pid, timeout_seconds, start_time, pidfd):
+            # Process stopped successfully
+            log_lifecycle_event(
+                db_path, lifecycle_table, component_id, pid,
+                'STOPPED_SUCCESSFULLY', None, "Process terminated gracefully", manager_id
+            )
+            print(f"[{manager_id}] Component '{component_id}' stopped successfully.")
+            return True
         
         # Timeout reached, try SIGKILL
         print(f"[{manager_id}] Component '{component_id}' didn't stop gracefully. Sending SIGKILL...")
-        os.kill(pid, signal.SIGKILL)
-        time.sleep(1)
+        if pidfd is None and start_time is not None and process_start_time(pid) != start_time:
+            raise ProcessLookupError(pid)
+        send_signal(pid, signal.SIGKILL, pidfd)
         
-        if not is_process_running(pid):
+        if wait_for_exit(pid, 1, start_time, pidfd):
             log_lifecycle_event(
                 db_path, lifecycle_table, component_id, pid,
                 'STOPPED_FORCEFULLY', None, "Process killed with SIGKILL", manager_id
@@ -169,6 +608,193 @@ def stop_component_with_timeout(
     except Exception as e:
         print(f"[{manager_id}] ERROR stopping '{component_id}': {e}")
         return False
+    finally:
+        if pidfd is not None:
+            os.close(pidfd)
+
+def init_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Apply the shared PRAGMA set to a freshly opened connection."""
+    for pragma in SQLITE_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def retry_if_locked(func):
+    """Retry ``func`` while SQLite reports the database locked or busy.
+
+    Backs off exponentially from 10 ms. The ``BUSY_TIMEOUT_S`` budget covers
+    the calls as well as the sleeps, since each call may already have waited
+    out busy_timeout, so no retry starts once it is spent. Meant for write
+    transactions opened with ``BEGIN IMMEDIATE``, which fail up front rather
+    than midway when another writer holds the lock.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        delay = 0.01
+        deadline = time.monotonic() + BUSY_TIMEOUT_S
+        while True:
+            try:
+                return func(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                msg = str(e)
+                remaining = deadline - time.monotonic()
+                if ('locked' not in msg and 'busy' not in msg) or remaining <= 0:
+                    raise
+                time.sleep(min(delay, remaining))
+                delay *= 2
+    return wrapper
+
+def connect_sqlite(db_path: str, readonly: bool = False) -> sqlite3.Connection:
+    """Open a dedicated, unpooled connection with the shared PRAGMAs applied.
+
+    For loops that own their connection and manage its transactions;
+    ``readonly`` makes it query-only.
+    """
+    conn = init_connection(sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_S, cached_statements=STATEMENT_CACHE_SIZE))
+    if readonly:
+        conn.execute("PRAGMA query_only=1")
+    return conn
+
+def get_connection(db_path: str, role: str = "reader") -> sqlite3.Connection:
+    """Return a pooled connection to ``db_path``.
+
+    There is one ``writer`` connection per database shared by all threads of
+    the process, and one query-only ``reader`` connection per thread. Pooled
+    connections stay open; callers must not close them (use
+    ``discard_connection`` after an error instead).
+    """
+    if role == "writer":
+        with _pool_lock:
+            conn = _writer_pool.get(db_path)
+            if conn is None:
+                conn = init_connection(sqlite3.connect(
+                    db_path, check_same_thread=False, cached_statements=STATEMENT_CACHE_SIZE))
+                _writer_pool[db_path] = conn
+            return conn
+    if role != "reader":
+        raise ValueError(f"Unknown connection role: {role}")
+    readers = getattr(_reader_pool, "conns", None)
+    if readers is None:
+        readers = _reader_pool.conns = {}
+    conn = readers.get(db_path)
+    if conn is None:
+        conn = init_connection(sqlite3.connect(
+            db_path, isolation_level=None, cached_statements=STATEMENT_CACHE_SIZE))
+        conn.execute("PRAGMA query_only=1")
+        readers[db_path] = conn
+    return conn
+
+def writer_lock(db_path: str) -> threading.RLock:
+    """Lock to hold around a statement/commit sequence on the pooled writer.
+
+    Without it, a commit from one thread could land in the middle of another
+    thread's transaction. It is re-entrant, so logging helpers can be called
+    inside ``write_batch``, which holds it for the whole block.
+    """
+    lock = _writer_locks.get(db_path)
+    if lock is None:
+        with _pool_lock:
+            lock = _writer_locks.setdefault(db_path, threading.RLock())
+    return lock
+
+def discard_connection(db_path: str, role: str = "reader") -> None:
+    """Close and drop a pooled connection so the next caller reopens it."""
+    if role == "writer":
+        with _pool_lock:
+            conn = _writer_pool.pop(db_path, None)
+    else:
+        conn = getattr(_reader_pool, "conns", {}).pop(db_path, None)
+    if conn is not None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+def close_all_connections() -> None:
+    """Close every pooled writer and this thread's readers.
+
+    Writers run a bounded ``PRAGMA optimize`` first, so planner statistics
+    keep up with tables (like the lifecycle log) that only ever grow.
+    """
+    with _pool_lock:
+        conns = list(_writer_pool.values())
+        _writer_pool.clear()
+    for conn in conns:
+        try:
+            conn.execute("PRAGMA analysis_limit=400")
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
+    conns.extend(getattr(_reader_pool, "conns", {}).values())
+    _reader_pool.conns = {}
+    for conn in conns:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+# Pooled connections live for the whole process; close them on the way out
+atexit.register(close_all_connections)
+
+# Connections a forked child inherited; kept referenced so they are never
+# finalized (and closed) from the child
+_inherited_conns: list = []
+
+def _reset_after_fork() -> None:
+    """Give a forked child empty pools, fresh locks and no log thread.
+
+    SQLite connections must not cross a fork, and a lock held by another
+    parent thread at fork time would never be released in the child.
+    """
+    global _pool_lock, _log_queue, _log_thread, _log_thread_lock, _reader_pool
+    _inherited_conns.extend(_writer_pool.values())
+    _inherited_conns.extend(getattr(_reader_pool, "conns", {}).values())
+    _writer_pool.clear()
+    _writer_locks.clear()
+    _batch_depth.clear()
+    _reader_pool = threading.local()
+    _pool_lock = threading.Lock()
+    _log_queue = queue.Queue()
+    _log_thread = None
+    _log_thread_lock = threading.Lock()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+@contextmanager
+def write_batch(db_path: str):
+    """Group the logging writes made inside the block into one transaction.
+
+    ``log_lifecycle_event`` and ``log_db_access`` skip their own commit while
+    a batch is open; the outermost block commits once on exit, even if the
+    block raised, so rows describing actions already taken are kept. The
+    writer lock is held throughout, so other threads' writes wait for it.
+    """
+    with writer_lock(db_path):
+        conn = get_connection(db_path, "writer")
+        _batch_depth[db_path] = _batch_depth.get(db_path, 0) + 1
+        try:
+            yield conn
+        finally:
+            _batch_depth[db_path] -= 1
+            if not _batch_depth[db_path]:
+                del _batch_depth[db_path]
+                # A logging error inside the block may have discarded the writer
+                if _writer_pool.get(db_path) is conn:
+                    try:
+                        conn.commit()
+                    except sqlite3.Error as e:
+                        print(f"Database error committing write batch: {e}")
+                        discard_connection(db_path, "writer")
+
+def _commit_unless_batched(db_path: str, conn: sqlite3.Connection) -> None:
+    if not _batch_depth.get(db_path):
+        conn.commit()
+
+def _lifecycle_insert_sql(table_name: str) -> str:
+    sql = _lifecycle_sql.get(table_name)
+    if sql is None:
+        sql = _lifecycle_sql[table_name] = LIFECYCLE_INSERT_SQL.format(table=table_name)
+    return sql
 
 def log_lifecycle_event(
     db_path: str,
@@ -182,42 +808,270 @@ def log_lifecycle_event(
     script_path: Optional[str] = None
 ) -> bool:
     """Log an event to the component_lifecycle_log table."""
-    conn = None
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"""
-            INSERT INTO {table_name}
-            (component_id, process_pid, event_type, run_type, message, manager_script, script_path)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (component_id, process_pid, event_type, run_type, message, manager_script, script_path))
-        conn.commit()
+        with writer_lock(db_path):
+            conn = get_connection(db_path, "writer")
+            conn.execute(_lifecycle_insert_sql(table_name), (component_id, process_pid, event_type, run_type, message, manager_script, script_path))
+            _commit_unless_batched(db_path, conn)
         return True
     except sqlite3.Error as e:
         print(f"Database error logging lifecycle event: {e}")
+        discard_connection(db_path, "writer")
+        return False
+
+def log_lifecycle_events(db_path: str, table_name: str, rows: list) -> bool:
+    """Write several lifecycle rows in one transaction.
+
+    Each row holds the ``log_lifecycle_event`` arguments from
+    ``component_id`` to ``script_path``, in order.
+    """
+    if not rows:
+        return True
+    try:
+        with writer_lock(db_path):
+            conn = get_connection(db_path, "writer")
+            conn.executemany(_lifecycle_insert_sql(table_name), rows)
+            _commit_unless_batched(db_path, conn)
+        return True
+    except sqlite3.Error as e:
+        print(f"Database error logging lifecycle events: {e}")
+        discard_connection(db_path, "writer")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 def log_db_access(db_path: str, component_id: str, table_name: str, access_type: str) -> bool:
     """Record a database access event."""
-    conn = None
     try:
-        conn = sqlite3.connect(db_path)
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO db_access_log (component_id, table_name, access_type) VALUES (?, ?, ?)",
-            (component_id, table_name, access_type),
-        )
-        conn.commit()
+        with writer_lock(db_path):
+            conn = get_connection(db_path, "writer")
+            conn.execute(DB_ACCESS_INSERT_SQL, (component_id, table_name, access_type))
+            _commit_unless_batched(db_path, conn)
         return True
     except sqlite3.Error as e:
         print(f"Database error logging access: {e}")
+        discard_connection(db_path, "writer")
         return False
-    finally:
-        if conn:
+
+def ensure_autorun_index(db_path: str, manager_id: str) -> bool:
+    """Create the covering autorun index on databases initialised before it existed.
+
+    Every manager calls this at startup, so the index appears whichever of
+    them runs.
+    """
+    try:
+        with writer_lock(db_path):
+            conn = get_connection(db_path, "writer")
+            conn.execute(AUTORUN_INDEX_SQL)
+            conn.commit()
+        return True
+    except sqlite3.Error as e:
+        print(f"[{manager_id}] DB Error indexing autorun_components: {e}")
+        discard_connection(db_path, "writer")
+        return False
+
+def _drop_log_conn(conns: Dict[str, sqlite3.Connection], db_path: str) -> None:
+    conn = conns.pop(db_path, None)
+    if conn is not None:
+        try:
             conn.close()
+        except sqlite3.Error:
+            pass
+
+def _write_log_rows(conns: Dict[str, sqlite3.Connection], db_path: str,
+                    statements: Dict[str, list]) -> None:
+    """Write one database's queued rows in a single transaction.
+
+    If that fails, each row is retried on its own so one bad row (or a
+    missing table) only costs the rows it affects; the rest are reported.
+    """
+    try:
+        conn = conns.get(db_path)
+        if conn is None:
+            conn = conns[db_path] = connect_sqlite(db_path)
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for sql, rows in statements.items():
+                conn.executemany(sql, rows)
+        return
+    except Exception as e:
+        _drop_log_conn(conns, db_path)
+        batch_error = e
+    dropped = 0
+    for sql, rows in statements.items():
+        for row in rows:
+            try:
+                conn = conns.get(db_path)
+                if conn is None:
+                    conn = conns[db_path] = connect_sqlite(db_path)
+                with conn:
+                    conn.execute(sql, row)
+            except Exception as e:
+                _drop_log_conn(conns, db_path)
+                dropped += 1
+                row_error = e
+    if dropped:
+        print(f"Database error writing queued log rows to {db_path}; dropped {dropped}: {row_error}")
+    else:
+        print(f"Database error writing queued log rows to {db_path}, written one by one: {batch_error}")
+
+def _log_writer_loop() -> None:
+    """Drain the log queue, writing whatever has piled up in one transaction."""
+    conns: Dict[str, sqlite3.Connection] = {}
+    while True:
+        batch = [_log_queue.get()]
+        try:
+            while True:
+                try:
+                    batch.append(_log_queue.get_nowait())
+                except queue.Empty:
+                    break
+            # db_path -> sql -> rows, so each database gets one transaction
+            grouped: Dict[str, Dict[str, list]] = {}
+            for db_path, sql, row in batch:
+                grouped.setdefault(db_path, {}).setdefault(sql, []).append(row)
+            for db_path, statements in grouped.items():
+                _write_log_rows(conns, db_path, statements)
+        except Exception as e:
+            # Never let the thread die: flush_log_queue would wait on it forever
+            print(f"Unexpected error in log writer: {e}")
+        finally:
+            for _ in batch:
+                _log_queue.task_done()
+
+def _enqueue_log(db_path: str, sql: str, row: tuple) -> None:
+    global _log_thread
+    if _log_thread is None:
+        with _log_thread_lock:
+            if _log_thread is None:
+                _log_thread = threading.Thread(target=_log_writer_loop, name="log-writer", daemon=True)
+                _log_thread.start()
+    _log_queue.put((db_path, sql, row))
+
+def enqueue_lifecycle_event(
+    db_path: str,
+    table_name: str,
+    component_id: str,
+    process_pid: Optional[int],
+    event_type: str,
+    run_type: Optional[str],
+    message: str,
+    manager_script: str,
+    script_path: Optional[str] = None
+) -> None:
+    """Like ``log_lifecycle_event`` but returns at once; a background thread
+    writes the row. Call ``flush_log_queue`` when the row must be visible."""
+    _enqueue_log(db_path, _lifecycle_insert_sql(table_name),
+                 (component_id, process_pid, event_type, run_type, message, manager_script, script_path))
+
+def enqueue_db_access(db_path: str, component_id: str, table_name: str, access_type: str) -> None:
+    """Like ``log_db_access`` but written by the background log thread."""
+    _enqueue_log(db_path, DB_ACCESS_INSERT_SQL, (component_id, table_name, access_type))
+
+def flush_log_queue(timeout: Optional[float] = None) -> bool:
+    """Block until every queued log row has been handled.
+
+    With ``timeout``, give up after that many seconds. Returns False if rows
+    were still pending.
+    """
+    if _log_thread is None:
+        return True
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with _log_queue.all_tasks_done:
+        while _log_queue.unfinished_tasks:
+            if not _log_thread.is_alive():
+                return False
+            if deadline is None:
+                _log_queue.all_tasks_done.wait(1.0)
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            _log_queue.all_tasks_done.wait(remaining)
+    return True
+
+def _flush_log_queue_at_exit() -> None:
+    if not flush_log_queue(LOG_FLUSH_TIMEOUT_S):
+        print(f"Gave up on {_log_queue.unfinished_tasks} queued log rows at exit")
+
+# Registered after close_all_connections so it runs first at exit
+atexit.register(_flush_log_queue_at_exit)
+
+def notify_socket_path(db_path: str, llm_id: str) -> str:
+    """Path of the wake-up socket for ``llm_id``, kept next to the database."""
+    return os.path.join(os.path.dirname(db_path), 'sockets', f'{llm_id}.sock')
+
+def open_wake_socket(path: str) -> Optional[socket.socket]:
+    """Bind the datagram socket a consumer waits on for new notifications.
+
+    Returns None where AF_UNIX is unsupported or binding fails; callers then
+    fall back to polling on their usual interval.
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        return None
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            os.unlink(path)  # left behind by a previous run
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(path)
+        sock.setblocking(False)
+        return sock
+    except OSError as e:
+        print(f"Could not open wake socket {path}: {e}")
+        return None
+
+def close_wake_socket(sock: Optional[socket.socket], path: str) -> None:
+    """Close a socket from ``open_wake_socket`` and remove its path."""
+    if sock is None:
+        return
+    sock.close()
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+def send_wake(path: str) -> bool:
+    """Poke the consumer listening on ``path``. Missing consumers are ignored."""
+    if not hasattr(socket, 'AF_UNIX'):
+        return False
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.setblocking(False)
+            sock.sendto(b'\0', path)
+        return True
+    except OSError:
+        # Nobody listening, or wake-ups already queued; either way nothing to do
+        return False
+
+def wake_on_signal(path: str, signum: Optional[int] = getattr(signal, 'SIGUSR1', None)) -> None:
+    """Turn ``signum`` (SIGUSR1 by default) into a poke of the socket at ``path``.
+
+    Lets ``kill -USR1 <pid>`` wake a daemon blocked in :func:`wait_for_wake`:
+    the interrupted select runs the handler, then resumes and sees the
+    datagram. Must be called from the main thread; a no-op without SIGUSR1.
+    """
+    if signum is None:
+        return
+    signal.signal(signum, lambda *_: send_wake(path))
+
+def wait_for_wake(sock: Optional[socket.socket], timeout: float) -> bool:
+    """Block until ``sock`` is poked or ``timeout`` elapses.
+
+    Returns True if a wake-up arrived. Without a socket this just sleeps.
+    """
+    if sock is None:
+        time.sleep(timeout)
+        return False
+    ready, _, _ = select.select([sock], [], [], timeout)
+    if not ready:
+        return False
+    try:
+        while sock.recv(64):
+            pass
+    except BlockingIOError:
+        pass
+    return True
 
 def get_component_full_status(pid_file: str, component_id: str) -> Tuple[str, Optional[int]]:
     """
@@ -236,17 +1090,13 @@ def get_component_full_status(pid_file: str, component_id: str) -> Tuple[str, Op
 
 def ensure_db_connection(db_path: str, table_name: str) -> bool:
     """Test database connection and table existence."""
-    conn = None
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute(f"SELECT 1 FROM {table_name} LIMIT 1")
+        conn = get_connection(db_path, "reader")
+        conn.execute(f"SELECT 1 FROM {table_name} LIMIT 1").fetchall()
         return True
     except sqlite3.Error:
+        discard_connection(db_path, "reader")
         return False
-    finally:
-        if conn:
-            conn.close()
 
 def create_required_directories(*directories: str) -> bool:
     """Create required directories if they don't exist."""
@@ -2,7 +2,6 @@
 """Daemon that logs memory usage percent to the database."""
 import time
 import os
-import sqlite3
 import argparse
 
 try:
@@ -10,10 +9,8 @@ try:
 except ImportError:
     psutil = None
 
-from manager_utils import log_lifecycle_event
+from manager_utils import enqueue_lifecycle_event, connect_sqlite, DB_FULL_PATH
 
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 TABLE_NAME = 'memory_usage_log'
 LIFECYCLE_TABLE_NAME = 'component_lifecycle_log'
 COMPONENT_ID = 'mem_usage_daemon'
@@ -30,7 +27,7 @@ def read_mem_usage():
 
 
 def log_start(run_type):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE_NAME,
         COMPONENT_ID,
@@ -44,7 +41,7 @@ def log_start(run_type):
 
 
 def log_stop(run_type, message):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE_NAME,
         COMPONENT_ID,
@@ -58,7 +55,7 @@ def log_stop(run_type, message):
 
 
 def main_loop(run_type):
-    conn = sqlite3.connect(DB_FULL_PATH)
+    conn = connect_sqlite(DB_FULL_PATH)
     cursor = conn.cursor()
     while True:
         usage = read_mem_usage()
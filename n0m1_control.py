@@ -11,36 +11,210 @@ import subprocess
 import sqlite3
 import json
 import argparse
-from manager_utils import get_venv_python
-from datetime import datetime, timedelta
+import functools
+import select
+from collections import namedtuple
+from manager_utils import (
+    get_connection,
+    discard_connection,
+    writer_lock,
+    get_venv_python,
+    open_append_fd,
+    open_pidfd,
+    process_start_time,
+    read_pid_file,
+    send_signal,
+    wait_for_exit,
+    DB_FULL_PATH,
+)
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional, Tuple
 
+try:
+    import ctypes
+except ImportError:
+    ctypes = None
+
 # --- Configuration ---
 PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
 VENV_PYTHON_PATH = get_venv_python(PROJECT_DIR)
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 BOOT_PID_FILE = os.path.join(PROJECT_DIR, "pids", "boot_system.pid")
 BOOT_SCRIPT = os.path.join(PROJECT_DIR, "boot_system_enhanced.py")
+MANAGER_LOG_DIR = os.path.join(PROJECT_DIR, "logs_managers")
+BOOT_LOG_FILE = os.path.join(MANAGER_LOG_DIR, "boot_system_daemon.log")
+# Seconds to wait for the boot system to exit after SIGTERM
+BOOT_STOP_TIMEOUT = 60
+# `logs` reads files backwards in blocks of this size
+TAIL_CHUNK = 64 * 1024
+# inotify event mask for "file was written"
+IN_MODIFY = 0x2
+# Re-check interval when following a log without inotify
+FOLLOW_POLL_INTERVAL = 0.5
+# CLI component action -> desired_state it writes
+COMPONENT_ACTION_STATES = {'enable': 'active', 'disable': 'inactive'}
+
+# Filled with one ? per component id
+COMPONENT_LOOKUP_SQL = (
+    "SELECT component_id, manager_affinity FROM autorun_components WHERE component_id IN ({placeholders})"
+)
+SET_DESIRED_STATE_SQL = "UPDATE autorun_components SET desired_state = ? WHERE component_id IN ({placeholders})"
+# Newest metrics row plus the averages over the newest ``limit`` rows, as a
+# single row; no row at all when the table is empty
+METRICS_SQL = """
+    WITH recent AS (
+        SELECT timestamp, cpu_usage, mem_usage, cpu_temp
+        FROM system_metrics_log ORDER BY timestamp DESC LIMIT ?
+    )
+    SELECT last.timestamp, last.cpu_usage, last.mem_usage, last.cpu_temp,
+           avg.cpu_usage, avg.mem_usage, avg.cpu_temp
+    FROM (SELECT * FROM recent ORDER BY timestamp DESC LIMIT 1) AS last,
+         (SELECT AVG(cpu_usage) AS cpu_usage, AVG(mem_usage) AS mem_usage,
+                 AVG(cpu_temp) AS cpu_temp FROM recent) AS avg
+"""
+
+# Everything `status` shows, fetched in one statement. The leading column
+# tags each row: 'M' manager event, 'C' component, 'E' recent error. The
+# remaining columns are component_id, event_type, event_timestamp,
+# process_pid, then desired_state/message and manager_affinity.
+STATUS_SQL = """
+    -- SQLite takes bare columns from the MAX() row: one newest event per manager
+    SELECT 'M', component_id, event_type, MAX(event_timestamp), process_pid, NULL, NULL
+    FROM component_lifecycle_log
+    WHERE component_id LIKE 'boot_%'
+      AND event_timestamp > :cutoff
+    GROUP BY component_id
+    UNION ALL
+    SELECT 'C', ac.component_id, cl.event_type, cl.event_timestamp, cl.process_pid,
+           ac.desired_state, ac.manager_affinity
+    FROM autorun_components ac
+    LEFT JOIN component_lifecycle_log cl ON cl.id = (
+        -- Newest recent event: a seek on idx_cll_comp_ts, not a window over the log
+        SELECT id FROM component_lifecycle_log
+        WHERE component_id = ac.component_id
+          AND event_timestamp > :cutoff
+        ORDER BY event_timestamp DESC
+        LIMIT 1
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'E', component_id, event_type, event_timestamp, NULL, message, NULL
+        FROM component_lifecycle_log
+        WHERE event_type IN ('ERROR', 'CRITICAL_ERROR', 'STOP_FAILED', 'MANAGER_CRASHED')
+          AND event_timestamp > :cutoff
+        ORDER BY event_timestamp DESC
+        LIMIT 10
+    )
+    -- Managers by name; components by manager, then ID
+    ORDER BY 1, 7, 2
+"""
 # --- End Configuration ---
 
+# Rows of get_system_status(), built positionally from the status query
+ManagerStatus = namedtuple('ManagerStatus', 'last_event last_event_time pid')
+ComponentStatus = namedtuple('ComponentStatus', 'desired_state manager last_event last_event_time pid')
+ErrorEntry = namedtuple('ErrorEntry', 'component type message time')
+
+
+@functools.lru_cache(maxsize=None)
+def _ensure_log_dir() -> str:
+    """Create the manager log directory once per process and return it."""
+    os.makedirs(MANAGER_LOG_DIR, exist_ok=True)
+    return MANAGER_LOG_DIR
+
+
+def tail_lines(path: str, n: int) -> List[str]:
+    """Return the last ``n`` lines of ``path``, reading only the end of the file."""
+    if n <= 0:
+        return []
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b''
+        # n + 1 newlines guarantee n complete lines even with a trailing newline
+        while pos > 0 and data.count(b'\n') <= n:
+            step = min(TAIL_CHUNK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return [line.decode(errors='replace') for line in data.splitlines()[-n:]]
+
+
+def list_log_files(directory: str) -> List[str]:
+    """Return the sorted ``.log`` file names in ``directory`` (empty if missing).
+
+    Uses the entry types ``scandir`` already has, so no file is stat'ed.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return sorted(
+                e.name for e in entries
+                if e.name.endswith('.log') and e.is_file(follow_symlinks=False)
+            )
+    except FileNotFoundError:
+        return []
+
+
+def _inotify_modify_fd(path: str) -> Optional[int]:
+    """Return an inotify descriptor that becomes readable when ``path`` is
+    written, or None where inotify is unavailable."""
+    if ctypes is None or not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, os.fsencode(path), IN_MODIFY) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except (OSError, AttributeError):
+        return None
+
+
+def follow_file(path: str):
+    """Print data appended to ``path`` until interrupted, like ``tail -f``.
+
+    Waits on inotify where available; otherwise re-checks the file every
+    FOLLOW_POLL_INTERVAL seconds. A truncated file is read from the start.
+    """
+    watch_fd = _inotify_modify_fd(path)
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            while True:
+                chunk = f.read()
+                if chunk:
+                    sys.stdout.write(chunk.decode(errors='replace'))
+                    sys.stdout.flush()
+                    continue
+                if os.fstat(f.fileno()).st_size < f.tell():
+                    f.seek(0)
+                    continue
+                if watch_fd is None:
+                    time.sleep(FOLLOW_POLL_INTERVAL)
+                else:
+                    select.select([watch_fd], [], [])
+                    os.read(watch_fd, 4096)
+    finally:
+        if watch_fd is not None:
+            os.close(watch_fd)
+
+
 class SystemController:
     def __init__(self):
         self.db_path = DB_FULL_PATH
         
     def is_boot_system_running(self) -> Tuple[bool, Optional[int]]:
         """Check if boot system is running."""
-        if not os.path.exists(BOOT_PID_FILE):
+        pid = read_pid_file(BOOT_PID_FILE)
+        if pid is None:
             return False, None
             
         try:
-            with open(BOOT_PID_FILE, 'r') as f:
-                pid = int(f.read().strip())
-                
             # Check if process is running
             os.kill(pid, 0)
             return True, pid
-        except (ValueError, IOError, OSError):
+        except OSError:
             return False, None
             
     def start_system(self) -> bool:
@@ -60,19 +234,19 @@ class SystemController:
             
         # Start boot system
         try:
-            log_file = os.path.join(PROJECT_DIR, "logs_managers", "boot_system_daemon.log")
-            os.makedirs(os.path.dirname(log_file), exist_ok=True)
-            
-            with open(log_file, 'a') as f:
-                f.write(f"\n\n=== Boot system started at {datetime.now()} ===\n")
-                
-            process = subprocess.Popen(
-                [VENV_PYTHON_PATH, BOOT_SCRIPT],
-                cwd=PROJECT_DIR,
-                stdout=open(log_file, 'a'),
-                stderr=subprocess.STDOUT,
-                start_new_session=True  # Detach from terminal
-            )
+            _ensure_log_dir()
+            log_fd = open_append_fd(BOOT_LOG_FILE)
+            try:
+                os.write(log_fd, f"\n\n=== Boot system started at {datetime.now()} ===\n".encode())
+                process = subprocess.Popen(
+                    [VENV_PYTHON_PATH, BOOT_SCRIPT],
+                    cwd=PROJECT_DIR,
+                    stdout=log_fd,
+                    stderr=subprocess.STDOUT,
+                    start_new_session=True  # Detach from terminal
+                )
+            finally:
+                os.close(log_fd)
             
             # Wait a moment and check if it started
             time.sleep(3)
@@ -80,7 +254,7 @@ class SystemController:
             
             if running:
                 print(f"System started successfully (Boot PID: {pid})")
-                print(f"Logs: {log_file}")
+                print(f"Logs: {BOOT_LOG_FILE}")
                 return True
             else:
                 print("ERROR: System failed to start. Check logs.")
@@ -99,22 +273,22 @@ class SystemController:
             
         print(f"Stopping n0m1_agi system (Boot PID: {pid})...")
         
+        pidfd = None
         try:
+            # A pidfd pins the boot process: signals cannot reach a process
+            # that reused its PID, and the wait wakes as soon as it exits
+            pidfd = open_pidfd(pid)
             if force:
-                os.kill(pid, signal.SIGKILL)
+                send_signal(pid, signal.SIGKILL, pidfd)
                 print("System forcefully stopped.")
             else:
-                os.kill(pid, signal.SIGTERM)
+                start_time = process_start_time(pid)
+                send_signal(pid, signal.SIGTERM, pidfd)
                 print("Shutdown signal sent. Waiting for graceful shutdown...")
                 
-                # Wait for shutdown
-                timeout = 60
-                start_time = time.time()
-                while time.time() - start_time < timeout:
-                    if not self.is_boot_system_running()[0]:
-                        print("System stopped successfully.")
-                        return True
-                    time.sleep(1)
+                if wait_for_exit(pid, BOOT_STOP_TIMEOUT, start_time, pidfd):
+                    print("System stopped successfully.")
+                    return True
                     
                 print("System didn't stop gracefully. Use --force to force stop.")
                 return False
@@ -122,6 +296,9 @@ class SystemController:
         except Exception as e:
             print(f"ERROR stopping system: {e}")
             return False
+        finally:
+            if pidfd is not None:
+                os.close(pidfd)
             
     def restart_system(self) -> bool:
         """Restart the n0m1_agi system."""
@@ -132,7 +309,7 @@ class SystemController:
                 print("Failed to stop system.")
                 return False
                 
-        time.sleep(2)
+        # stop_system only returns True once the boot process has exited
         return self.start_system()
         
     def get_system_status(self) -> Dict:
@@ -151,82 +328,31 @@ class SystemController:
         
         # Check database connection
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get manager status from recent lifecycle events
-            cursor.execute("""
-                SELECT DISTINCT component_id, process_pid, event_type, event_timestamp
-                FROM component_lifecycle_log
-                WHERE component_id LIKE 'boot_%'
-                  AND event_timestamp > datetime('now', '-1 hour')
-                ORDER BY event_timestamp DESC
-            """)
-            
-            for comp_id, pid, event_type, timestamp in cursor.fetchall():
-                manager_name = comp_id.replace('boot_', '')
-                if manager_name not in status['managers']:
-                    status['managers'][manager_name] = {
-                        'last_event': event_type,
-                        'last_event_time': timestamp,
-                        'pid': pid
-                    }
-                    
-            # Get component status
-            cursor.execute("""
-                SELECT 
-                    ac.component_id,
-                    ac.desired_state,
-                    ac.manager_affinity,
-                    cl.event_type,
-                    cl.event_timestamp,
-                    cl.process_pid
-                FROM autorun_components ac
-                LEFT JOIN (
-                    SELECT component_id, event_type, event_timestamp, process_pid,
-                           ROW_NUMBER() OVER (PARTITION BY component_id ORDER BY event_timestamp DESC) as rn
-                    FROM component_lifecycle_log
-                    WHERE event_timestamp > datetime('now', '-1 hour')
-                ) cl ON ac.component_id = cl.component_id AND cl.rn = 1
-                ORDER BY ac.manager_affinity, ac.component_id
-            """)
-            
-            for comp_id, desired_state, manager, event_type, timestamp, pid in cursor.fetchall():
-                status['components'][comp_id] = {
-                    'desired_state': desired_state,
-                    'manager': manager,
-                    'last_event': event_type or 'NO_RECENT_EVENTS',
-                    'last_event_time': timestamp,
-                    'pid': pid
-                }
-                
-            # Check for recent errors
-            cursor.execute("""
-                SELECT component_id, event_type, message, event_timestamp
-                FROM component_lifecycle_log
-                WHERE event_type IN ('ERROR', 'CRITICAL_ERROR', 'STOP_FAILED', 'MANAGER_CRASHED')
-                  AND event_timestamp > datetime('now', '-1 hour')
-                ORDER BY event_timestamp DESC
-                LIMIT 10
-            """)
+            # Bound rather than datetime('now', ...) so the cached statement is reused;
+            # stored timestamps are CURRENT_TIMESTAMP, i.e. UTC
+            cutoff = (datetime.now(timezone.utc) - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+            rows = get_connection(self.db_path, "reader").execute(
+                STATUS_SQL, {'cutoff': cutoff}
+            ).fetchall()
             
-            for comp_id, event_type, message, timestamp in cursor.fetchall():
-                status['errors'].append({
-                    'component': comp_id,
-                    'type': event_type,
-                    'message': message,
-                    'time': timestamp
-                })
-                
-            conn.close()
+            for kind, comp_id, event_type, timestamp, pid, detail, manager in rows:
+                if kind == 'M':
+                    manager_name = comp_id.replace('boot_', '')
+                    status['managers'][manager_name] = ManagerStatus(event_type, timestamp, pid)
+                elif kind == 'C':
+                    status['components'][comp_id] = ComponentStatus(
+                        detail, manager, event_type or 'NO_RECENT_EVENTS', timestamp, pid
+                    )
+                else:
+                    status['errors'].append(ErrorEntry(comp_id, event_type, detail, timestamp))
+            # The compound ORDER BY groups errors by component, not by time
+            status['errors'].sort(key=lambda error: error.time, reverse=True)
             
         except sqlite3.Error as e:
-            status['errors'].append({
-                'component': 'database',
-                'type': 'DB_ERROR',
-                'message': str(e),
-                'time': datetime.now().isoformat()
-            })
+            discard_connection(self.db_path, "reader")
+            status['errors'].append(
+                ErrorEntry('database', 'DB_ERROR', str(e), datetime.now().isoformat())
+            )
             
         return status
         
@@ -247,47 +373,47 @@ class SystemController:
         # Manager status
         if status['managers']:
             print("\nManagers:")
-            for manager, info in sorted(status['managers'].items()):
-                symbol = "✓" if 'STARTED' in info.get('last_event', '') else "?"
-                print(f"  {symbol} {manager}: {info.get('last_event', 'UNKNOWN')}")
+            for manager, info in status['managers'].items():
+                symbol = "✓" if 'STARTED' in info.last_event else "?"
+                print(f"  {symbol} {manager}: {info.last_event}")
                 if detailed:
-                    print(f"     PID: {info.get('pid')}, Last update: {info.get('last_event_time')}")
+                    print(f"     PID: {info.pid}, Last update: {info.last_event_time}")
                     
         # Component status
         if status['components']:
             print("\nComponents:")
             current_manager = None
-            for comp_id, info in sorted(status['components'].items(), key=lambda x: (x[1]['manager'], x[0])):
-                if info['manager'] != current_manager:
-                    current_manager = info['manager']
+            for comp_id, info in status['components'].items():
+                if info.manager != current_manager:
+                    current_manager = info.manager
                     print(f"\n  [{current_manager}]")
                     
                 # Determine status symbol
-                if info['desired_state'] == 'inactive':
+                if info.desired_state == 'inactive':
                     symbol = "○"  # Inactive
-                elif info['last_event'] in ['STARTED_SUCCESSFULLY', 'START_ATTEMPT']:
+                elif info.last_event in ['STARTED_SUCCESSFULLY', 'START_ATTEMPT']:
                     symbol = "✓"  # Running
-                elif info['last_event'] in ['STOPPED_SUCCESSFULLY', 'NO_RECENT_EVENTS']:
+                elif info.last_event in ['STOPPED_SUCCESSFULLY', 'NO_RECENT_EVENTS']:
                     symbol = "✗"  # Stopped
                 else:
                     symbol = "⚠"  # Warning/Error
                     
-                print(f"    {symbol} {comp_id}: {info['last_event']}")
+                print(f"    {symbol} {comp_id}: {info.last_event}")
                 if detailed:
-                    print(f"       Desired: {info['desired_state']}, PID: {info.get('pid')}")
+                    print(f"       Desired: {info.desired_state}, PID: {info.pid}")
                     
         # Recent errors
         if status['errors']:
             print(f"\n⚠ Recent Errors ({len(status['errors'])})")
             for error in status['errors'][:5]:  # Show max 5
-                print(f"  - {error['component']}: {error['type']} - {error.get('message', 'No message')}")
+                print(f"  - {error.component}: {error.type} - {error.message or 'No message'}")
                 
         print("\n" + "="*80)
         
     def show_logs(self, component: Optional[str] = None, lines: int = 50, follow: bool = False):
         """Show logs for components."""
         log_dir = os.path.join(PROJECT_DIR, 'logs')
-        manager_log_dir = os.path.join(PROJECT_DIR, 'logs_managers')
+        manager_log_dir = MANAGER_LOG_DIR
         
         if component:
             # Show specific component logs
@@ -309,113 +435,87 @@ class SystemController:
                 
             for log_file in log_files:
                 print(f"\n=== {log_file} ===")
+                for line in tail_lines(log_file, lines):
+                    print(line)
                 if follow:
-                    subprocess.run(['tail', '-f', log_file])
-                else:
-                    subprocess.run(['tail', '-n', str(lines), log_file])
+                    follow_file(log_file)
         else:
             # List all available logs
             print("\nAvailable log files:")
             
             print("\nComponent logs:")
-            if os.path.exists(log_dir):
-                for log_file in sorted(os.listdir(log_dir)):
-                    if log_file.endswith('.log'):
-                        print(f"  - {log_file}")
+            for log_file in list_log_files(log_dir):
+                print(f"  - {log_file}")
                         
             print("\nManager logs:")
-            if os.path.exists(manager_log_dir):
-                for log_file in sorted(os.listdir(manager_log_dir)):
-                    if log_file.endswith('.log'):
-                        print(f"  - {log_file}")
+            for log_file in list_log_files(manager_log_dir):
+                print(f"  - {log_file}")
                         
-    def manage_component(self, action: str, component_id: str):
-        """Manage individual components."""
-        # Get component configuration
+    def manage_component(self, action: str, component_ids: List[str]):
+        """Enable or disable components, all in one transaction.
+
+        Returns False if any of ``component_ids`` is unknown; the known
+        ones are still updated.
+        """
+        component_ids = list(dict.fromkeys(component_ids))
+        placeholders = ','.join('?' * len(component_ids))
+        desired_state = COMPONENT_ACTION_STATES[action]
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT manager_affinity, desired_state
-                FROM autorun_components
-                WHERE component_id = ?
-            """, (component_id,))
-            
-            result = cursor.fetchone()
-            if not result:
-                print(f"Component '{component_id}' not found.")
-                return False
-                
-            manager, current_state = result
-            
-            if action == 'enable':
-                cursor.execute("""
-                    UPDATE autorun_components
-                    SET desired_state = 'active'
-                    WHERE component_id = ?
-                """, (component_id,))
-                conn.commit()
-                print(f"Component '{component_id}' enabled.")
-                
-            elif action == 'disable':
-                cursor.execute("""
-                    UPDATE autorun_components
-                    SET desired_state = 'inactive'
-                    WHERE component_id = ?
-                """, (component_id,))
-                conn.commit()
-                print(f"Component '{component_id}' disabled.")
-                
-            conn.close()
+            conn = get_connection(self.db_path, "writer")
+            with writer_lock(self.db_path), conn:
+                conn.execute("BEGIN IMMEDIATE")
+                managers = dict(conn.execute(
+                    COMPONENT_LOOKUP_SQL.format(placeholders=placeholders), component_ids
+                ).fetchall())
+                found = [comp_id for comp_id in component_ids if comp_id in managers]
+                if found:
+                    conn.execute(
+                        SET_DESIRED_STATE_SQL.format(placeholders=','.join('?' * len(found))),
+                        [desired_state, *found],
+                    )
+            for comp_id in component_ids:
+                if comp_id in managers:
+                    print(f"Component '{comp_id}' {action}d.")
+                else:
+                    print(f"Component '{comp_id}' not found.")
             
             # If system is running, apply changes
-            if self.is_boot_system_running()[0]:
-                print(f"Triggering {manager} to apply changes...")
+            if managers and self.is_boot_system_running()[0]:
+                for manager in sorted(set(managers.values())):
+                    print(f"Triggering {manager} to apply changes...")
                 # Could send signal to specific manager or restart it
                 
-            return True
+            return len(managers) == len(component_ids)
             
         except sqlite3.Error as e:
             print(f"Database error: {e}")
+            discard_connection(self.db_path, "writer")
             return False
 
     def show_metrics(self, limit: int = 10):
         """Display recent system metrics."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT timestamp, cpu_usage, mem_usage, cpu_temp "
-                "FROM system_metrics_log ORDER BY timestamp DESC LIMIT ?",
-                (limit,),
-            )
-            rows = cursor.fetchall()
-            conn.close()
+            row = get_connection(self.db_path, "reader").execute(METRICS_SQL, (limit,)).fetchone()
 
-            if not rows:
+            if not row:
                 print("No metrics data available.")
                 return
 
-            cpu_vals = [r[1] for r in rows if r[1] is not None]
-            mem_vals = [r[2] for r in rows if r[2] is not None]
-            temp_vals = [r[3] for r in rows if r[3] is not None]
-
-            last = rows[0]
+            # AVG() is NULL when a column has no values in the window
+            timestamp, cpu, mem, temp, avg_cpu, avg_mem, avg_temp = row
             print("\nRecent System Metrics:\n")
-            print(f" Last update : {last[0]}")
-            if cpu_vals:
-                avg_cpu = sum(cpu_vals) / len(cpu_vals)
-                print(f" CPU usage   : last {last[1]}% | avg {avg_cpu:.1f}%")
-            if mem_vals:
-                avg_mem = sum(mem_vals) / len(mem_vals)
-                print(f" Memory usage: last {last[2]}% | avg {avg_mem:.1f}%")
-            if temp_vals:
-                avg_temp = sum(temp_vals) / len(temp_vals)
-                print(f" CPU temp    : last {last[3]}°C | avg {avg_temp:.1f}°C")
+            print(f" Last update : {timestamp}")
+            if avg_cpu is not None:
+                print(f" CPU usage   : last {cpu}% | avg {avg_cpu:.1f}%")
+            if avg_mem is not None:
+                print(f" Memory usage: last {mem}% | avg {avg_mem:.1f}%")
+            if avg_temp is not None:
+                print(f" CPU temp    : last {temp}°C | avg {avg_temp:.1f}°C")
             else:
                 print(" CPU temp    : N/A")
         except sqlite3.Error as e:
             print(f"Database error: {e}")
+            discard_connection(self.db_path, "reader")
 
 def main():
     parser = argparse.ArgumentParser(
@@ -433,6 +533,7 @@ Examples:
   %(prog)s logs -f boot_system      # Follow logs in real-time
   %(prog)s enable temp_main_daemon  # Enable a component
   %(prog)s disable nano_analyzer_01 # Disable a component
+  %(prog)s disable nano_a nano_b    # Disable several components at once
   %(prog)s metrics --limit 5        # Show recent system metrics
         """
     )
@@ -440,7 +541,8 @@ Examples:
     parser.add_argument('command',
                        choices=['start', 'stop', 'restart', 'status', 'logs', 'enable', 'disable', 'metrics'],
                        help='Command to execute')
-    parser.add_argument('component', nargs='?', help='Component ID (for logs/enable/disable)')
+    parser.add_argument('components', nargs='*', metavar='component',
+                        help='Component ID (one for logs, one or more for enable/disable)')
     parser.add_argument('-f', '--follow', action='store_true', help='Follow log output')
     parser.add_argument('-n', '--lines', type=int, default=50, help='Number of log lines to show')
     parser.add_argument('--limit', type=int, default=10,
@@ -465,7 +567,7 @@ Examples:
         
     elif args.command == 'logs':
         controller.show_logs(
-            component=args.component,
+            component=args.components[0] if args.components else None,
             lines=args.lines,
             follow=args.follow
         )
@@ -474,10 +576,10 @@ Examples:
         controller.show_metrics(limit=args.limit)
 
     elif args.command in ['enable', 'disable']:
-        if not args.component:
+        if not args.components:
             print(f"ERROR: Component ID required for {args.command}")
             sys.exit(1)
-        controller.manage_component(args.command, args.component)
+        controller.manage_component(args.command, args.components)
 
 if __name__ == "__main__":
     main()
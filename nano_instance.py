@@ -18,16 +18,24 @@ except ImportError:
     AutoTokenizer = None
     PeftModel = None
 
-from manager_utils import log_lifecycle_event, log_db_access
+from manager_utils import (
+    enqueue_lifecycle_event, flush_log_queue, sleep_to_next_tick, connect_sqlite, DB_ACCESS_INSERT_SQL, DB_FULL_PATH,
+)
 
 # --- Configuration ---
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 METRICS_TABLE = 'system_metrics_log'
 SUMMARY_TABLE = 'nano_outputs'
 PROMPTS_TABLE = 'nano_prompts'
 LIFECYCLE_TABLE_NAME = 'component_lifecycle_log'
 COMPONENT_ID_PREFIX = 'nano_instance'
+# Recognised metric columns, in order of preference
+METRIC_COLUMNS = ("temperature_celsius", "cpu_usage", "mem_usage", "cpu_temp")
+# Changes only when another connection commits to the database
+DATA_VERSION_SQL = "PRAGMA data_version"
+LOAD_PROMPT_SQL = f"SELECT prompt, needs_reload FROM {PROMPTS_TABLE} WHERE nano_id=?"
+MARK_PROMPT_RELOADED_SQL = (
+    f"UPDATE {PROMPTS_TABLE} SET needs_reload=0, modified_timestamp=CURRENT_TIMESTAMP WHERE nano_id=?"
+)
 # --- End Configuration ---
 
 
@@ -52,7 +60,7 @@ def load_model(model_name: str, lora_path: str = None):
 
 
 def announce_startup(component_id: str, run_type: str):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE_NAME,
         component_id,
@@ -65,24 +73,22 @@ def announce_startup(component_id: str, run_type: str):
     )
 
 
-def fetch_recent_metrics(conn: sqlite3.Connection, table: str, limit: int = 1):
-    cur = conn.cursor()
-    cur.execute(f"PRAGMA table_info({table})")
-    cols = [r[1] for r in cur.fetchall()]
-    metric_col = None
-    for c in ("temperature_celsius", "cpu_usage", "mem_usage", "cpu_temp"):
-        if c in cols:
-            metric_col = c
-            break
+def metrics_query(conn: sqlite3.Connection, table: str):
+    """Return ``(query, metric_col)`` for reading the latest rows of ``table``.
+
+    Resolved once at startup, so the loop neither re-reads the table's
+    schema nor rebuilds the statement.
+    """
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    metric_col = next((c for c in METRIC_COLUMNS if c in cols), None)
     if not metric_col:
         raise ValueError(f"Unknown metric column in {table}")
-    query = (
-        f"SELECT timestamp, {metric_col} FROM {table} ORDER BY timestamp DESC LIMIT ?"
-    )
+    return f"SELECT timestamp, {metric_col} FROM {table} ORDER BY timestamp DESC LIMIT ?", metric_col
+
+
+def fetch_recent_metrics(cur: sqlite3.Cursor, query: str, limit: int = 1):
     cur.execute(query, (limit,))
-    rows = cur.fetchall()
-    conn.commit()
-    return rows, metric_col
+    return cur.fetchall()
 
 
 def summarize_metrics(entry, metric_col):
@@ -102,14 +108,30 @@ def summarize_metrics(entry, metric_col):
     return None
 
 
+def log_access(conn: sqlite3.Connection, nano_id: str, table: str, access_type: str):
+    """Record a db_access_log row on the instance's own connection.
+
+    Commits from other connections advance this connection's data_version,
+    which the main loop watches; the instance's own logging must not.
+    """
+    try:
+        conn.execute(DB_ACCESS_INSERT_SQL, (f"{COMPONENT_ID_PREFIX}_{nano_id}", table, access_type))
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Database error logging access: {e}")
+
+
+def read_prompt_file(path: str) -> str:
+    """Read a system prompt file in one binary read and a single UTF-8 decode."""
+    with open(path, "rb") as f:
+        return f.read().decode("utf-8")
+
+
 def load_prompt(conn: sqlite3.Connection, nano_id: str):
     cur = conn.cursor()
-    cur.execute(
-        f"SELECT prompt, needs_reload FROM {PROMPTS_TABLE} WHERE nano_id=?",
-        (nano_id,),
-    )
+    cur.execute(LOAD_PROMPT_SQL, (nano_id,))
     row = cur.fetchone()
-    log_db_access(DB_FULL_PATH, f"{COMPONENT_ID_PREFIX}_{nano_id}", PROMPTS_TABLE, "READ")
+    log_access(conn, nano_id, PROMPTS_TABLE, "READ")
     if not row:
         return None, False
     prompt, needs_reload = row
@@ -118,12 +140,9 @@ def load_prompt(conn: sqlite3.Connection, nano_id: str):
 
 def mark_prompt_reloaded(conn: sqlite3.Connection, nano_id: str):
     cur = conn.cursor()
-    cur.execute(
-        f"UPDATE {PROMPTS_TABLE} SET needs_reload=0, modified_timestamp=CURRENT_TIMESTAMP WHERE nano_id=?",
-        (nano_id,),
-    )
+    cur.execute(MARK_PROMPT_RELOADED_SQL, (nano_id,))
     conn.commit()
-    log_db_access(DB_FULL_PATH, f"{COMPONENT_ID_PREFIX}_{nano_id}", PROMPTS_TABLE, "WRITE")
+    log_access(conn, nano_id, PROMPTS_TABLE, "WRITE")
 
 
 def main():
@@ -145,45 +164,54 @@ def main():
     announce_startup(component_id, args.run_type)
 
     model, tokenizer = load_model(args.model, args.lora_path)
+    # Written while the model loaded; settle it so it does not wake the first poll
+    flush_log_queue()
 
-    conn = sqlite3.connect(args.db_path)
+    # WAL and the shared PRAGMAs: metric pulls never block the metric writers
+    conn = connect_sqlite(args.db_path)
 
     prompt, needs_reload = load_prompt(conn, args.instance_id)
     if prompt is None and args.system_prompt:
         try:
-            with open(args.system_prompt, "r") as f:
-                prompt = f.read()
+            prompt = read_prompt_file(args.system_prompt)
         except Exception as e:
             print(f"[nano] Failed to read system prompt: {e}")
     if needs_reload:
         mark_prompt_reloaded(conn, args.instance_id)
 
     context = deque(maxlen=args.context_window)
+    metrics_sql, metric_col = metrics_query(conn, args.metrics_table)
+    summary_sql = f"INSERT INTO {args.summary_table} (nano_id, content) VALUES (?, ?)"
+    cur = conn.cursor()
 
     print(f"[nano:{args.instance_id}] Running idle loop")
+    last_version = None
+    tick = time.monotonic()
     try:
         while True:
-            db_prompt, reload_flag = load_prompt(conn, args.instance_id)
-            if db_prompt is not None:
-                if db_prompt != prompt:
-                    prompt = db_prompt
-                if reload_flag:
-                    mark_prompt_reloaded(conn, args.instance_id)
-
-            rows, metric_col = fetch_recent_metrics(conn, args.metrics_table, limit=1)
-            log_db_access(DB_FULL_PATH, f"{COMPONENT_ID_PREFIX}_{args.instance_id}", args.metrics_table, "READ")
-            if rows:
-                context.append(rows[0])
-                latest = rows[0]
-                print(f"[nano:{args.instance_id}] Latest metrics: {latest}")
-                summary = summarize_metrics(latest, metric_col)
-                if summary:
-                    conn.execute(
-                        f"INSERT INTO {args.summary_table} (nano_id, content) VALUES (?, ?)",
-                        (args.instance_id, summary),
-                    )
-                    conn.commit()
-            time.sleep(args.pull_interval)
+            # Nothing committed by anyone else since the last pass means no new
+            # metrics and no prompt edits, so both reads are skipped
+            version = cur.execute(DATA_VERSION_SQL).fetchone()[0]
+            if version != last_version:
+                last_version = version
+                db_prompt, reload_flag = load_prompt(conn, args.instance_id)
+                if db_prompt is not None:
+                    if db_prompt != prompt:
+                        prompt = db_prompt
+                    if reload_flag:
+                        mark_prompt_reloaded(conn, args.instance_id)
+
+                rows = fetch_recent_metrics(cur, metrics_sql, limit=1)
+                log_access(conn, args.instance_id, args.metrics_table, "READ")
+                if rows:
+                    context.append(rows[0])
+                    latest = rows[0]
+                    print(f"[nano:{args.instance_id}] Latest metrics: {latest}")
+                    summary = summarize_metrics(latest, metric_col)
+                    if summary:
+                        cur.execute(summary_sql, (args.instance_id, summary))
+                        conn.commit()
+            tick = sleep_to_next_tick(tick, args.pull_interval)
     except KeyboardInterrupt:
         pass
     finally:
@@ -5,21 +5,26 @@ import os
 import sqlite3
 import argparse
 import platform
+import signal
 
 try:
     import psutil
 except ImportError:
     psutil = None
 
-from manager_utils import log_lifecycle_event
+from manager_utils import (
+    enqueue_lifecycle_event, connect_sqlite, sleep_to_next_tick, DB_FULL_PATH, HAS_PROC, METRICS_INDEX_SQL,
+)
 
 # --- Configuration ---
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 TABLE_NAME = 'system_metrics_log'
 LIFECYCLE_TABLE_NAME = 'component_lifecycle_log'
 COMPONENT_ID = 'system_metrics_daemon'
 POLLING_INTERVAL_SECONDS = 10
+# Samples are buffered and written in one transaction to avoid an fsync per row.
+BATCH_SIZE = 10
+FLUSH_INTERVAL_SECONDS = 60
+INSERT_SQL = f"INSERT INTO {TABLE_NAME} (cpu_temp, cpu_usage, mem_usage, timestamp) VALUES (?, ?, ?, ?)"
 # --- End Configuration ---
 
 # Import macOS temperature helper if available
@@ -76,8 +81,57 @@ def read_mem_usage():
     return None
 
 
+# (busy, total) jiffies from the previous /proc/stat read
+_last_cpu_times = None
+
+
+def read_proc_cpu_usage():
+    """CPU usage since the previous call from one read of /proc/stat.
+
+    Returns None on the first call, when there is no earlier sample yet.
+    """
+    global _last_cpu_times
+    try:
+        with open('/proc/stat', 'rb') as f:
+            fields = [int(x) for x in f.readline().split()[1:9]]
+    except (OSError, ValueError):
+        return None
+    # user nice system idle iowait irq softirq steal
+    total = sum(fields)
+    busy = total - fields[3] - fields[4]
+    last, _last_cpu_times = _last_cpu_times, (busy, total)
+    if last is None or total <= last[1]:
+        return None
+    return round(100.0 * (busy - last[0]) / (total - last[1]), 1)
+
+
+def read_proc_mem_usage():
+    """Memory usage percent from one read of /proc/meminfo, as psutil computes it."""
+    try:
+        with open('/proc/meminfo', 'rb') as f:
+            info = dict(line.split(b':', 1) for line in f.read().splitlines() if b':' in line)
+        total = int(info[b'MemTotal'].split()[0])
+        available = int(info[b'MemAvailable'].split()[0])
+    except (OSError, ValueError, KeyError, IndexError):
+        return None
+    return round(100.0 * (total - available) / total, 1) if total else None
+
+
+def sample():
+    """Return ``(cpu_temp, cpu_usage, mem_usage)`` for one poll.
+
+    On Linux CPU and memory come straight from /proc, one read each,
+    instead of through psutil's per-call objects.
+    """
+    if HAS_PROC:
+        cpu, mem = read_proc_cpu_usage(), read_proc_mem_usage()
+    else:
+        cpu, mem = read_cpu_usage(), read_mem_usage()
+    return read_cpu_temp(), cpu, mem
+
+
 def log_start(run_type):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE_NAME,
         COMPONENT_ID,
@@ -91,7 +145,7 @@ def log_start(run_type):
 
 
 def log_stop(run_type, message):
-    log_lifecycle_event(
+    enqueue_lifecycle_event(
         DB_FULL_PATH,
         LIFECYCLE_TABLE_NAME,
         COMPONENT_ID,
@@ -104,20 +158,57 @@ def log_stop(run_type, message):
     )
 
 
+def flush_samples(conn, buf):
+    """Write all buffered samples in a single transaction."""
+    if not buf:
+        return
+    with conn:
+        conn.executemany(INSERT_SQL, buf)
+    buf.clear()
+
+
 def main_loop(run_type):
-    conn = sqlite3.connect(DB_FULL_PATH)
+    conn = connect_sqlite(DB_FULL_PATH)
     cursor = conn.cursor()
-    while True:
-        temp = read_cpu_temp()
-        cpu = read_cpu_usage()
-        mem = read_mem_usage()
-        cursor.execute(
-            f"INSERT INTO {TABLE_NAME} (cpu_temp, cpu_usage, mem_usage) VALUES (?, ?, ?)",
-            (temp, cpu, mem),
-        )
+    try:
+        # Databases initialised before the covering index existed get it here
+        cursor.execute(METRICS_INDEX_SQL)
         conn.commit()
-        print(f"[{COMPONENT_ID}] CPU {cpu}% MEM {mem}% TEMP {temp}")
-        time.sleep(POLLING_INTERVAL_SECONDS)
+    except sqlite3.Error as e:
+        print(f"[{COMPONENT_ID}] Could not index {TABLE_NAME}: {e}")
+    buf = []
+    # CPU usage is a delta between reads, so take the baseline one poll
+    # before the first row rather than storing a NULL for it.
+    if HAS_PROC:
+        read_proc_cpu_usage()
+    else:
+        read_cpu_usage()
+    last_flush = tick = time.monotonic()
+    try:
+        while True:
+            tick = sleep_to_next_tick(tick, POLLING_INTERVAL_SECONDS)
+            # Match the CURRENT_TIMESTAMP format so deferred rows sort correctly.
+            ts = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+            temp, cpu, mem = sample()
+            buf.append((temp, cpu, mem, ts))
+            if len(buf) >= BATCH_SIZE or time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS:
+                try:
+                    flush_samples(conn, buf)
+                    last_flush = time.monotonic()
+                except sqlite3.Error as e:
+                    # The rolled-back samples stay buffered for the next tick
+                    print(f"[{COMPONENT_ID}] Could not write {len(buf)} samples, will retry: {e}")
+            print(f"[{COMPONENT_ID}] CPU {cpu}% MEM {mem}% TEMP {temp}")
+    finally:
+        try:
+            flush_samples(conn, buf)
+        except sqlite3.Error as e:
+            print(f"[{COMPONENT_ID}] Dropped {len(buf)} buffered samples: {e}")
+        conn.close()
+
+
+def _handle_sigterm(signum, frame):
+    raise SystemExit(0)
 
 
 def main():
@@ -125,11 +216,16 @@ def main():
     parser.add_argument('--run_type', type=str, default='MANUAL_RUN')
     args = parser.parse_args()
 
+    # Turn SIGTERM into SystemExit so main_loop flushes buffered samples.
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+
     log_start(args.run_type)
     try:
         main_loop(args.run_type)
     except KeyboardInterrupt:
         log_stop(args.run_type, 'Stopped via KeyboardInterrupt')
+    except SystemExit:
+        log_stop(args.run_type, 'Stopped via SIGTERM')
     except Exception as e:
         log_stop(args.run_type, f'Unexpected error: {e}')
     finally:
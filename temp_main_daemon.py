@@ -5,18 +5,27 @@ import subprocess
 import re
 import struct
 import os
+import sys
 import datetime
 import argparse
 import shutil
+import signal
 
 try:
     import psutil
 except ImportError:  # psutil may not be installed
     psutil = None
 
+try:
+    import ctypes
+except ImportError:
+    ctypes = None
+
+from manager_utils import (
+    enqueue_lifecycle_event, connect_sqlite, sleep_to_next_tick, DB_FULL_PATH, TEMPERATURE_INDEX_SQL,
+)
+
 # --- Configuration ---
-DB_FILE_NAME = 'n0m1_agi.db'
-DB_FULL_PATH = os.path.expanduser(f'~/n0m1_agi/{DB_FILE_NAME}')
 RAW_DATA_TABLE_NAME = 'cpu_temperature_log'
 LIFECYCLE_TABLE_NAME = 'component_lifecycle_log'
 # Use the same component_id that init_database.py inserts into the autorun
@@ -25,7 +34,16 @@ COMPONENT_ID = 'temp_main_daemon'
 
 SMC_COMMAND = 'smc'
 SMC_KEY = 'Th0D'
+# AppleSMC user client: struct method index and the two commands a key read needs
+IOKIT_PATH = '/System/Library/Frameworks/IOKit.framework/IOKit'
+KERNEL_INDEX_SMC = 2
+SMC_CMD_READ_BYTES = 5
+SMC_CMD_READ_KEYINFO = 9
 POLLING_INTERVAL_SECONDS = 10
+# Samples are buffered and written in one transaction to avoid an fsync per row.
+BATCH_SIZE = 10
+FLUSH_INTERVAL_SECONDS = 60
+INSERT_SQL = f"INSERT INTO {RAW_DATA_TABLE_NAME} (temperature_celsius, timestamp) VALUES (?, ?)"
 # --- End Configuration ---
 
 HEX_RE = re.compile(r'\(bytes ([0-9A-Fa-f]{2}) ([0-9A-Fa-f]{2}) ([0-9A-Fa-f]{2}) ([0-9A-Fa-f]{2})\)')
@@ -33,7 +51,7 @@ HEX_RE = re.compile(r'\(bytes ([0-9A-Fa-f]{2}) ([0-9A-Fa-f]{2}) ([0-9A-Fa-f]{2})
 def create_temp_data_table_if_not_exists():
     conn = None
     try:
-        conn = sqlite3.connect(DB_FULL_PATH)
+        conn = connect_sqlite(DB_FULL_PATH)
         cursor = conn.cursor()
         cursor.execute(f"""
             CREATE TABLE IF NOT EXISTS {RAW_DATA_TABLE_NAME} (
@@ -42,6 +60,7 @@ def create_temp_data_table_if_not_exists():
                 temperature_celsius REAL NOT NULL
             );
         """)
+        cursor.execute(TEMPERATURE_INDEX_SQL)
         conn.commit()
     except sqlite3.Error as e:
         print(f"[{COMPONENT_ID}] DB Error creating {RAW_DATA_TABLE_NAME}: {e}")
@@ -51,28 +70,126 @@ def create_temp_data_table_if_not_exists():
             conn.close()
 
 def announce_startup(run_type_arg):  # Fixed function name
-    conn = None
-    try:
-        conn = sqlite3.connect(DB_FULL_PATH)
-        cursor = conn.cursor()
-        process_pid = os.getpid()
-        script_full_path = os.path.abspath(__file__)
-        message = "Component initialized and starting main loop."
+    # Queued for the background log writer, so startup never waits on a commit
+    process_pid = os.getpid()
+    enqueue_lifecycle_event(
+        DB_FULL_PATH,
+        LIFECYCLE_TABLE_NAME,
+        COMPONENT_ID,
+        process_pid,
+        'STARTED_SUCCESSFULLY',
+        run_type_arg,
+        "Component initialized and starting main loop.",
+        None,
+        os.path.abspath(__file__),
+    )
+    print(f"[{COMPONENT_ID}] Announced startup (PID: {process_pid}, RunType: {run_type_arg}) to {LIFECYCLE_TABLE_NAME}.")
 
-        cursor.execute(f"""
-            INSERT INTO {LIFECYCLE_TABLE_NAME} 
-            (component_id, process_pid, event_type, run_type, message, script_path) 
-            VALUES (?, ?, 'STARTED_SUCCESSFULLY', ?, ?, ?)
-        """, (COMPONENT_ID, process_pid, run_type_arg, message, script_full_path))
-        conn.commit()
-        print(f"[{COMPONENT_ID}] Successfully announced startup (PID: {process_pid}, RunType: {run_type_arg}) to {LIFECYCLE_TABLE_NAME}.")
-    except sqlite3.Error as e:
-        print(f"[{COMPONENT_ID}] DB Error announcing startup to {LIFECYCLE_TABLE_NAME}: {e}")
-    except Exception as e:
-        print(f"[{COMPONENT_ID}] Unexpected error announcing startup: {e}")
-    finally:
-        if conn:
-            conn.close()
+if ctypes is not None:
+    class SMCKeyInfo(ctypes.Structure):
+        _fields_ = [
+            ('dataSize', ctypes.c_uint32),
+            ('dataType', ctypes.c_uint32),
+            ('dataAttributes', ctypes.c_uint8),
+        ]
+
+    class SMCKeyData(ctypes.Structure):
+        """SMCKeyData_t as exchanged with the AppleSMC kernel extension (80 bytes)."""
+        _fields_ = [
+            ('key', ctypes.c_uint32),
+            ('vers', ctypes.c_uint8 * 6),
+            ('pLimitData', ctypes.c_uint8 * 16),
+            ('keyInfo', SMCKeyInfo),
+            ('result', ctypes.c_uint8),
+            ('status', ctypes.c_uint8),
+            ('data8', ctypes.c_uint8),
+            ('data32', ctypes.c_uint32),
+            ('bytes', ctypes.c_uint8 * 32),
+        ]
+
+# (IOKit library, SMC connection) once opened; False if it cannot be opened
+_smc = None
+
+def _open_smc():
+    """Open the AppleSMC service once per process; None where IOKit is unavailable."""
+    global _smc
+    if _smc is None:
+        _smc = False
+        if ctypes is None or sys.platform != 'darwin':
+            return None
+        try:
+            iokit = ctypes.CDLL(IOKIT_PATH)
+            libsystem = ctypes.CDLL('/usr/lib/libSystem.dylib')
+            iokit.IOServiceMatching.restype = ctypes.c_void_p
+            iokit.IOServiceMatching.argtypes = [ctypes.c_char_p]
+            iokit.IOServiceGetMatchingService.restype = ctypes.c_uint32
+            iokit.IOServiceGetMatchingService.argtypes = [ctypes.c_uint32, ctypes.c_void_p]
+            iokit.IOServiceOpen.restype = ctypes.c_int
+            iokit.IOServiceOpen.argtypes = [ctypes.c_uint32, ctypes.c_uint32, ctypes.c_uint32,
+                                            ctypes.POINTER(ctypes.c_uint32)]
+            iokit.IOObjectRelease.argtypes = [ctypes.c_uint32]
+            iokit.IOConnectCallStructMethod.restype = ctypes.c_int
+            iokit.IOConnectCallStructMethod.argtypes = [ctypes.c_uint32, ctypes.c_uint32,
+                                                        ctypes.c_void_p, ctypes.c_size_t,
+                                                        ctypes.c_void_p, ctypes.POINTER(ctypes.c_size_t)]
+
+            service = iokit.IOServiceGetMatchingService(0, iokit.IOServiceMatching(b'AppleSMC'))
+            if not service:
+                return None
+            conn = ctypes.c_uint32()
+            task = ctypes.c_uint32.in_dll(libsystem, 'mach_task_self_')
+            kr = iokit.IOServiceOpen(service, task, 0, ctypes.byref(conn))
+            iokit.IOObjectRelease(service)
+            if kr == 0:
+                _smc = (iokit, conn.value)
+        except (OSError, AttributeError, ValueError) as e:
+            print(f"[{COMPONENT_ID}] IOKit SMC unavailable: {e}")
+    return _smc or None
+
+def _smc_call(iokit, conn, request):
+    response = SMCKeyData()
+    size = ctypes.c_size_t(ctypes.sizeof(response))
+    kr = iokit.IOConnectCallStructMethod(conn, KERNEL_INDEX_SMC,
+                                         ctypes.byref(request), ctypes.sizeof(request),
+                                         ctypes.byref(response), ctypes.byref(size))
+    if kr != 0 or response.result != 0:
+        return None
+    return response
+
+def read_smc_key(key):
+    """Return the raw bytes of SMC ``key`` through IOKit, or None."""
+    smc = _open_smc()
+    if smc is None:
+        return None
+    iokit, conn = smc
+    request = SMCKeyData(key=int.from_bytes(key.encode('ascii'), 'big'), data8=SMC_CMD_READ_KEYINFO)
+    info = _smc_call(iokit, conn, request)
+    if info is None:
+        return None
+    request.keyInfo.dataSize = info.keyInfo.dataSize
+    request.data8 = SMC_CMD_READ_BYTES
+    data = _smc_call(iokit, conn, request)
+    if data is None:
+        return None
+    return bytes(data.bytes)[:info.keyInfo.dataSize]
+
+def get_smc_cpu_temp():
+    """CPU temperature from the SMC: IOKit in-process, else the ``smc`` command."""
+    raw = read_smc_key(SMC_KEY)
+    if raw is not None and len(raw) >= 4:
+        return struct.unpack('<f', raw[:4])[0]
+
+    if shutil.which(SMC_COMMAND):
+        try:
+            out = subprocess.check_output([SMC_COMMAND, '-k', SMC_KEY, '-r'], text=True, timeout=5)
+            m = HEX_RE.search(out)
+            if m:
+                b0, b1, b2, b3 = [int(x, 16) for x in m.groups()]
+                raw = bytes([b0, b1, b2, b3])
+                return struct.unpack('<f', raw)[0]
+        except Exception as e:
+            print(f"[{COMPONENT_ID}] Fallback SMC read failed: {e}")
+    return None
 
 def get_cpu_temp():
     """Return the current CPU temperature in Celsius or None if unavailable."""
@@ -91,23 +208,22 @@ def get_cpu_temp():
         except Exception as e:
             print(f"[{COMPONENT_ID}] psutil error retrieving temperature: {e}")
 
-    # Fallback to macOS 'smc' command if available
-    if shutil.which(SMC_COMMAND):
-        try:
-            out = subprocess.check_output([SMC_COMMAND, '-k', SMC_KEY, '-r'], text=True, timeout=5)
-            m = HEX_RE.search(out)
-            if m:
-                b0, b1, b2, b3 = [int(x, 16) for x in m.groups()]
-                raw = bytes([b0, b1, b2, b3])
-                return struct.unpack('<f', raw)[0]
-        except Exception as e:
-            print(f"[{COMPONENT_ID}] Fallback SMC read failed: {e}")
+    # Fallback to the macOS SMC
+    return get_smc_cpu_temp()
 
-    return None
+def flush_samples(conn, buf):
+    """Write all buffered samples in a single transaction."""
+    if not buf:
+        return
+    with conn:
+        conn.executemany(INSERT_SQL, buf)
+    buf.clear()
 
 def main_loop(run_type_arg):
     print(f"[{COMPONENT_ID}] Starting main loop. Polling every {POLLING_INTERVAL_SECONDS}s. Run Type: {run_type_arg}")
     conn = None
+    buf = []
+    last_flush = tick = time.monotonic()
     try:
         while True:
             temp = None
@@ -115,15 +231,13 @@ def main_loop(run_type_arg):
                 temp = get_cpu_temp()
 
                 if temp is not None:
-                    if conn is None:
-                       conn = sqlite3.connect(DB_FULL_PATH)
-
-                    cur = conn.cursor()
-                    cur.execute(
-                        f"INSERT INTO {RAW_DATA_TABLE_NAME} (temperature_celsius) VALUES (?)",
-                        (temp,)
-                    )
-                    conn.commit()
+                    # Match the CURRENT_TIMESTAMP format so deferred rows sort correctly.
+                    buf.append((temp, time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())))
+                    if len(buf) >= BATCH_SIZE or time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS:
+                        if conn is None:
+                           conn = connect_sqlite(DB_FULL_PATH)
+                        flush_samples(conn, buf)
+                        last_flush = time.monotonic()
                     print(f"[{COMPONENT_ID} - {datetime.datetime.now().strftime('%H:%M:%S')}] Logged CPU temp = {temp:.1f}°C")
                 else:
                     print(f"[{COMPONENT_ID} - {datetime.datetime.now().strftime('%H:%M:%S')}] Temperature data unavailable.")
@@ -136,18 +250,31 @@ def main_loop(run_type_arg):
                     except: pass
                     conn = None 
             
-            time.sleep(POLLING_INTERVAL_SECONDS)
+            tick = sleep_to_next_tick(tick, POLLING_INTERVAL_SECONDS)
     finally:
+        if buf:
+            try:
+                if conn is None:
+                    conn = connect_sqlite(DB_FULL_PATH)
+                flush_samples(conn, buf)
+            except sqlite3.Error as e:
+                print(f"[{COMPONENT_ID}] Dropped {len(buf)} buffered samples: {e}")
         if conn:
             conn.close()
             print(f"[{COMPONENT_ID}] Database connection closed.")
 
+def _handle_sigterm(signum, frame):
+    raise SystemExit(0)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description=f"{COMPONENT_ID} - CPU Temperature Daemon for n0m1_agi.")
     parser.add_argument('--run_type', type=str, default="MANUAL_RUN", 
                         help="Type of run (e.g., PRIMARY_RUN, TEST_ATTEMPT, MANUAL_RUN)")
     args = parser.parse_args()
 
+    # Turn SIGTERM into SystemExit so main_loop flushes buffered samples.
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+
     print(f"--- Starting {COMPONENT_ID} Daemon ---")
     try:
         create_temp_data_table_if_not_exists()
@@ -62,6 +62,7 @@ def test_llm_processor_load_config_logs(tmp_path, monkeypatch):
 
     with sqlite3.connect(db) as conn:
         llm_processor.load_config(conn)
+    manager_utils.flush_log_queue()
 
     conn = sqlite3.connect(db)
     cur = conn.cursor()
@@ -81,13 +82,14 @@ def test_llm_config_daemon_logs_read(tmp_path, monkeypatch):
     monkeypatch.setattr(llm_config_daemon, "DB_FULL_PATH", str(db))
     monkeypatch.setattr(llm_config_daemon, "POLL_INTERVAL", 0)
 
-    def fake_sleep(_):
+    def fake_wait(_sock, _timeout):
         raise StopIteration
 
-    monkeypatch.setattr(llm_config_daemon.time, "sleep", fake_sleep)
+    monkeypatch.setattr(llm_config_daemon, "wait_for_wake", fake_wait)
 
     with pytest.raises(StopIteration):
         llm_config_daemon.main_loop("TEST")
+    manager_utils.flush_log_queue()
 
     conn = sqlite3.connect(db)
     cur = conn.cursor()
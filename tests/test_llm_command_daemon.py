@@ -5,6 +5,7 @@ import pytest
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+import manager_utils
 import llm_command_daemon
 
 
@@ -54,13 +55,14 @@ def test_command_starts_component(tmp_path, monkeypatch):
     monkeypatch.setattr(llm_command_daemon, 'DB_FULL_PATH', str(db))
     monkeypatch.setattr(llm_command_daemon, 'POLL_INTERVAL', 0)
 
-    def fake_sleep(_):
+    def fake_wait(_sock, _timeout):
         raise StopIteration
 
-    monkeypatch.setattr(llm_command_daemon.time, 'sleep', fake_sleep)
+    monkeypatch.setattr(llm_command_daemon, 'wait_for_wake', fake_wait)
 
     with pytest.raises(StopIteration):
         llm_command_daemon.main_loop('TEST')
+    manager_utils.flush_log_queue()
 
     conn = sqlite3.connect(db)
     cur = conn.cursor()
@@ -94,10 +96,10 @@ def test_command_updates_existing_component(tmp_path, monkeypatch):
     monkeypatch.setattr(llm_command_daemon, "DB_FULL_PATH", str(db))
     monkeypatch.setattr(llm_command_daemon, "POLL_INTERVAL", 0)
 
-    def fake_sleep(_):
+    def fake_wait(_sock, _timeout):
         raise StopIteration
 
-    monkeypatch.setattr(llm_command_daemon.time, "sleep", fake_sleep)
+    monkeypatch.setattr(llm_command_daemon, "wait_for_wake", fake_wait)
 
     with pytest.raises(StopIteration):
         llm_command_daemon.main_loop("TEST")
@@ -116,3 +118,38 @@ def test_command_updates_existing_component(tmp_path, monkeypatch):
 
     assert row is not None and row[0] == "active"
     assert count == 1
+
+
+def test_commands_in_one_pass_are_applied_and_deleted(tmp_path, monkeypatch):
+    db = setup_db(tmp_path)
+    conn = sqlite3.connect(db)
+    conn.executemany(
+        "INSERT INTO llm_outputs (llm_id, content) VALUES (?, ?)",
+        [
+            ("main_llm_processor", "CMD:START comp_a"),
+            ("main_llm_processor", "plain output"),
+            ("main_llm_processor", "CMD:START comp_b"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(llm_command_daemon, "DB_FULL_PATH", str(db))
+
+    def fake_wait(_sock, _timeout):
+        raise StopIteration
+
+    monkeypatch.setattr(llm_command_daemon, "wait_for_wake", fake_wait)
+
+    with pytest.raises(StopIteration):
+        llm_command_daemon.main_loop("TEST")
+
+    conn = sqlite3.connect(db)
+    started = conn.execute(
+        "SELECT component_id FROM autorun_components WHERE desired_state='active' ORDER BY component_id"
+    ).fetchall()
+    remaining = conn.execute("SELECT content FROM llm_outputs").fetchall()
+    conn.close()
+
+    assert started == [("comp_a",), ("comp_b",)]
+    assert remaining == [("plain output",)]
@@ -38,7 +38,10 @@ def setup_db(tmp_path):
     return db
 
 
-def test_llm_config_daemon_updates_notification(tmp_path, monkeypatch):
+@pytest.mark.parametrize("has_returning", [True, False])
+def test_llm_config_daemon_updates_notification(tmp_path, monkeypatch, has_returning):
+    if has_returning and sqlite3.sqlite_version_info < (3, 35, 0):
+        pytest.skip("RETURNING needs SQLite 3.35+")
     db = setup_db(tmp_path)
     conn = sqlite3.connect(db)
     conn.execute(
@@ -49,11 +52,12 @@ def test_llm_config_daemon_updates_notification(tmp_path, monkeypatch):
 
     monkeypatch.setattr(llm_config_daemon, "DB_FULL_PATH", str(db))
     monkeypatch.setattr(llm_config_daemon, "POLL_INTERVAL", 0)
+    monkeypatch.setattr(llm_config_daemon, "HAS_RETURNING", has_returning)
 
-    def fake_sleep(_):
+    def fake_wait(_sock, _timeout):
         raise StopIteration
 
-    monkeypatch.setattr(llm_config_daemon.time, "sleep", fake_sleep)
+    monkeypatch.setattr(llm_config_daemon, "wait_for_wake", fake_wait)
 
     with pytest.raises(StopIteration):
         llm_config_daemon.main_loop("TEST")
@@ -85,10 +89,10 @@ def test_llm_processor_reads_config_and_runs(tmp_path, monkeypatch):
     monkeypatch.setattr(llm_processor, "DB_FULL_PATH", str(db))
     monkeypatch.setattr(llm_processor, "POLL_INTERVAL", 0)
 
-    def fake_sleep(_):
+    def fake_wait(_sock, _timeout):
         raise StopIteration
 
-    monkeypatch.setattr(llm_processor.time, "sleep", fake_sleep)
+    monkeypatch.setattr(llm_processor, "wait_for_wake", fake_wait)
     monkeypatch.setattr(sys, "argv", ["llm_processor.py"])  # avoid argparse parsing pytest args
 
     with pytest.raises(StopIteration):
@@ -121,10 +125,10 @@ def test_llm_processor_push_payload_tables(tmp_path, monkeypatch):
     monkeypatch.setattr(llm_processor, 'DB_FULL_PATH', str(db))
     monkeypatch.setattr(llm_processor, 'POLL_INTERVAL', 0)
 
-    def fake_sleep(_):
+    def fake_wait(_sock, _timeout):
         raise StopIteration
 
-    monkeypatch.setattr(llm_processor.time, 'sleep', fake_sleep)
+    monkeypatch.setattr(llm_processor, 'wait_for_wake', fake_wait)
     monkeypatch.setattr(sys, 'argv', ['llm_processor.py'])
 
     with pytest.raises(StopIteration):
@@ -156,10 +160,10 @@ def test_llm_processor_handles_pull_request(tmp_path, monkeypatch):
     monkeypatch.setattr(llm_processor, 'DB_FULL_PATH', str(db))
     monkeypatch.setattr(llm_processor, 'POLL_INTERVAL', 0)
 
-    def fake_sleep(_):
+    def fake_wait(_sock, _timeout):
         raise StopIteration
 
-    monkeypatch.setattr(llm_processor.time, 'sleep', fake_sleep)
+    monkeypatch.setattr(llm_processor, 'wait_for_wake', fake_wait)
     monkeypatch.setattr(sys, 'argv', ['llm_processor.py'])
 
     with pytest.raises(StopIteration):
@@ -172,3 +176,38 @@ def test_llm_processor_handles_pull_request(tmp_path, monkeypatch):
     conn.close()
 
     assert any(r == 'REQUEST:metrics' for r in rows)
+
+
+def test_llm_processor_push_counts_unknown_tables_as_zero(tmp_path, monkeypatch):
+    db = setup_db(tmp_path)
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE a (id INTEGER PRIMARY KEY AUTOINCREMENT, val TEXT)")
+    conn.execute("INSERT INTO a (val) VALUES ('x'), ('y')")
+    conn.execute("CREATE TABLE out (id INTEGER PRIMARY KEY AUTOINCREMENT, llm_id TEXT, content TEXT)")
+    conn.execute(
+        "INSERT INTO llm_io_config (llm_id, read_tables, output_table, needs_reload) VALUES ('main_llm_processor', 'a', 'out', 0)"
+    )
+    conn.execute(
+        "INSERT INTO llm_notifications (llm_id, notification_type, payload) VALUES ('main_llm_processor', 'PUSH', 'a,missing,a; DROP TABLE a')"
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(llm_processor, 'DB_FULL_PATH', str(db))
+
+    def fake_wait(_sock, _timeout):
+        raise StopIteration
+
+    monkeypatch.setattr(llm_processor, 'wait_for_wake', fake_wait)
+    monkeypatch.setattr(sys, 'argv', ['llm_processor.py'])
+
+    with pytest.raises(StopIteration):
+        llm_processor.main()
+
+    conn = sqlite3.connect(db)
+    rows = [r[0] for r in conn.execute('SELECT content FROM out ORDER BY id')]
+    a_count = conn.execute('SELECT COUNT(*) FROM a').fetchone()[0]
+    conn.close()
+
+    assert rows == ['a rows=2', 'missing rows=0', 'a; DROP TABLE a rows=0']
+    assert a_count == 2
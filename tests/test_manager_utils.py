@@ -6,6 +6,8 @@ import time
 import platform
 import types
 import signal
+import sqlite3
+import threading
 
 import pytest
 
@@ -21,6 +23,7 @@ from manager_utils import (
     get_venv_python,
     launch_subprocess,
     terminate_process,
+    open_append_fd,
 )
 
 
@@ -38,6 +41,17 @@ def test_read_pid_file_invalid(tmp_path):
     assert read_pid_file(str(pid_file.with_suffix('.missing')) ) is None
 
 
+def test_open_append_fd_appends(tmp_path):
+    log_file = tmp_path / "out.log"
+    log_file.write_text("first\n")
+    fd = open_append_fd(str(log_file))
+    try:
+        os.write(fd, b"second\n")
+    finally:
+        os.close(fd)
+    assert log_file.read_text() == "first\nsecond\n"
+
+
 def test_is_process_running_for_running_and_stopped_process():
     proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(2)"])
     try:
@@ -71,7 +85,8 @@ def test_launch_subprocess_posix(monkeypatch):
     monkeypatch.setattr(platform, "system", lambda: "Linux")
 
     launch_subprocess(["echo"])
-    assert captured.get("preexec_fn") == os.setsid
+    assert captured.get("start_new_session") is True
+    assert "preexec_fn" not in captured
     assert "creationflags" not in captured
 
 
@@ -92,7 +107,18 @@ def test_launch_subprocess_windows(monkeypatch):
 
     launch_subprocess(["echo"])
     assert captured.get("creationflags") == subprocess.CREATE_NEW_PROCESS_GROUP
-    assert "preexec_fn" not in captured
+    assert "start_new_session" not in captured
+
+
+def test_launch_subprocess_starts_new_session():
+    if os.name == "nt":
+        pytest.skip("POSIX sessions only")
+    proc = launch_subprocess([sys.executable, "-c", "import time; time.sleep(2)"])
+    try:
+        assert os.getsid(proc.pid) == proc.pid
+    finally:
+        proc.kill()
+        proc.wait()
 
 
 def test_terminate_process_posix(monkeypatch):
@@ -132,3 +158,468 @@ def test_terminate_process_windows(monkeypatch):
     terminate_process(p)
     assert signals == [signal.CTRL_BREAK_EVENT]
 
+
+
+def test_get_connection_pools_and_applies_pragmas(tmp_path):
+    db = str(tmp_path / "pool.db")
+    writer = manager_utils.get_connection(db, "writer")
+    assert manager_utils.get_connection(db, "writer") is writer
+    assert writer.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert writer.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+    reader = manager_utils.get_connection(db, "reader")
+    assert reader is not writer
+    assert reader.execute("PRAGMA query_only").fetchone()[0] == 1
+
+    manager_utils.discard_connection(db, "writer")
+    assert manager_utils.get_connection(db, "writer") is not writer
+    manager_utils.close_all_connections()
+
+
+def test_connect_sqlite_maps_database_file(tmp_path):
+    conn = manager_utils.connect_sqlite(str(tmp_path / "mmap.db"), readonly=True)
+    try:
+        # Zero means this SQLite build or filesystem refused memory-mapped reads
+        assert conn.execute("PRAGMA mmap_size").fetchone()[0] == 268435456
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == manager_utils.BUSY_TIMEOUT_S * 1000
+    finally:
+        conn.close()
+
+
+def test_write_batch_commits_once(tmp_path):
+    db = str(tmp_path / "batch.db")
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE db_access_log (id INTEGER PRIMARY KEY, component_id TEXT, table_name TEXT, access_type TEXT)"
+    )
+    conn.commit()
+
+    with manager_utils.write_batch(db):
+        assert manager_utils.log_db_access(db, "c", "t", "READ")
+        assert manager_utils.log_db_access(db, "c", "t", "WRITE")
+        # Nothing is visible to other connections until the batch ends
+        assert conn.execute("SELECT COUNT(*) FROM db_access_log").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM db_access_log").fetchone()[0] == 2
+    conn.close()
+    manager_utils.close_all_connections()
+
+
+def test_write_batch_holds_writer_for_other_threads(tmp_path):
+    db = str(tmp_path / "locked.db")
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE db_access_log (id INTEGER PRIMARY KEY, component_id TEXT, table_name TEXT, access_type TEXT)"
+    )
+    conn.commit()
+
+    other = threading.Thread(target=manager_utils.log_db_access, args=(db, "other", "t", "READ"))
+    with manager_utils.write_batch(db):
+        assert manager_utils.log_db_access(db, "c", "t", "READ")
+        other.start()
+        other.join(0.2)
+        # The other thread's write must not commit this batch early
+        assert other.is_alive()
+        assert conn.execute("SELECT COUNT(*) FROM db_access_log").fetchone()[0] == 0
+    other.join(5)
+    assert conn.execute("SELECT COUNT(*) FROM db_access_log").fetchone()[0] == 2
+    conn.close()
+    manager_utils.close_all_connections()
+
+
+def test_log_lifecycle_events_writes_all_rows(tmp_path):
+    db = str(tmp_path / "lifecycle.db")
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE component_lifecycle_log (id INTEGER PRIMARY KEY, component_id TEXT, process_pid INTEGER, "
+        "event_type TEXT, run_type TEXT, message TEXT, manager_script TEXT, script_path TEXT)"
+    )
+    conn.commit()
+
+    rows = [
+        ("a", None, "START_ATTEMPT", "PRIMARY_RUN", "msg", "nano_manager.py", None),
+        ("b", None, "START_ATTEMPT", "PRIMARY_RUN", "msg", "nano_manager.py", None),
+    ]
+    assert manager_utils.log_lifecycle_events(db, "component_lifecycle_log", rows)
+    assert manager_utils.log_lifecycle_events(db, "component_lifecycle_log", [])
+    got = conn.execute("SELECT component_id FROM component_lifecycle_log ORDER BY id").fetchall()
+    assert got == [("a",), ("b",)]
+    conn.close()
+    manager_utils.close_all_connections()
+
+
+def test_enqueued_log_rows_written_after_flush(tmp_path):
+    db = str(tmp_path / "queued.db")
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE component_lifecycle_log (id INTEGER PRIMARY KEY, component_id TEXT, process_pid INTEGER, "
+        "event_type TEXT, run_type TEXT, message TEXT, manager_script TEXT, script_path TEXT)"
+    )
+    conn.execute("CREATE TABLE db_access_log (id INTEGER PRIMARY KEY, component_id TEXT, table_name TEXT, access_type TEXT)")
+    conn.commit()
+
+    for comp in ("a", "b", "c"):
+        manager_utils.enqueue_lifecycle_event(
+            db, "component_lifecycle_log", comp, None, "START_ATTEMPT", "PRIMARY_RUN", "msg", "nano_manager.py"
+        )
+    manager_utils.enqueue_db_access(db, "nano_manager", "autorun_components", "READ")
+    manager_utils.flush_log_queue()
+
+    got = conn.execute("SELECT component_id FROM component_lifecycle_log ORDER BY id").fetchall()
+    assert got == [("a",), ("b",), ("c",)]
+    assert conn.execute("SELECT COUNT(*) FROM db_access_log").fetchone()[0] == 1
+    conn.close()
+
+
+def test_log_writer_survives_bad_rows(tmp_path):
+    db = str(tmp_path / "queued.db")
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE db_access_log (id INTEGER PRIMARY KEY, component_id TEXT, table_name TEXT, access_type TEXT)")
+    conn.commit()
+
+    # Wrong arity, then a directory that does not exist, then a good row
+    manager_utils._enqueue_log(db, manager_utils.DB_ACCESS_INSERT_SQL, ("only-one",))
+    manager_utils.enqueue_db_access(str(tmp_path / "missing" / "x.db"), "c", "t", "READ")
+    manager_utils.enqueue_db_access(db, "c", "t", "READ")
+    assert manager_utils.flush_log_queue(timeout=10)
+    assert manager_utils._log_thread.is_alive()
+
+    manager_utils.enqueue_db_access(db, "c", "t", "WRITE")
+    assert manager_utils.flush_log_queue(timeout=10)
+    rows = conn.execute("SELECT access_type FROM db_access_log ORDER BY id").fetchall()
+    assert rows == [("READ",), ("WRITE",)]
+    conn.close()
+
+
+def test_flush_log_queue_gives_up_after_timeout(monkeypatch):
+    stuck = manager_utils.queue.Queue()
+    stuck.put(("db", "sql", ()))  # never marked done
+    monkeypatch.setattr(manager_utils, "_log_queue", stuck)
+    monkeypatch.setattr(manager_utils, "_log_thread", manager_utils.threading.current_thread())
+    assert not manager_utils.flush_log_queue(timeout=0.05)
+
+
+def test_ensure_autorun_index(tmp_path):
+    db = str(tmp_path / "autorun.db")
+    assert not manager_utils.ensure_autorun_index(db, "test_manager")  # no table yet
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE autorun_components (component_id TEXT PRIMARY KEY, base_script_name TEXT,"
+        " launch_args_json TEXT, desired_state TEXT, manager_affinity TEXT, run_type_on_boot TEXT,"
+        " modified_timestamp TEXT)"
+    )
+    conn.commit()
+    assert manager_utils.ensure_autorun_index(db, "test_manager")
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+    assert "idx_ac_affinity_state" in names
+    conn.close()
+    manager_utils.close_all_connections()
+
+
+def test_snapshot_pid_files(tmp_path):
+    (tmp_path / "a.pid").write_text("123")
+    (tmp_path / "b.pid").write_text("")
+    (tmp_path / "c.txt").write_text("7")
+    assert manager_utils.snapshot_pid_files(str(tmp_path)) == {"a": 123}
+    assert manager_utils.snapshot_pid_files(str(tmp_path / "missing")) == {}
+
+
+def test_snapshot_pid_files_uses_mtime_cache(tmp_path, monkeypatch):
+    pid_dir = tmp_path / "pids"
+    pid_dir.mkdir()
+    (pid_dir / "a.pid").write_text("123")
+    cache_file = str(tmp_path / "cache" / "pidcache.json")
+
+    assert manager_utils.snapshot_pid_files(str(pid_dir), cache_file) == {"a": 123}
+    assert os.path.exists(cache_file)
+
+    opened = []
+    real_open = open
+
+    def tracking_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", tracking_open)
+    assert manager_utils.snapshot_pid_files(str(pid_dir), cache_file) == {"a": 123}
+    assert str(pid_dir / "a.pid") not in opened
+    monkeypatch.undo()
+
+    # A rewritten PID file gets a new mtime and is read again
+    (pid_dir / "a.pid").write_text("456")
+    os.utime(pid_dir / "a.pid", ns=(1, 1))
+    assert manager_utils.snapshot_pid_files(str(pid_dir), cache_file) == {"a": 456}
+
+
+def test_snapshot_pid_files_skips_settled_directory(tmp_path, monkeypatch):
+    pid_dir = tmp_path / "pids"
+    pid_dir.mkdir()
+    assert write_pid_file(str(pid_dir / "a.pid"), 123)
+    os.utime(pid_dir, ns=(1, 1))  # last changed long before the scan
+    cache_file = str(tmp_path / "pidcache.json")
+    assert manager_utils.snapshot_pid_files(str(pid_dir), cache_file) == {"a": 123}
+
+    def no_scandir(_path):
+        raise AssertionError("settled directory was rescanned")
+
+    monkeypatch.setattr(manager_utils.os, "scandir", no_scandir)
+    assert manager_utils.snapshot_pid_files(str(pid_dir), cache_file) == {"a": 123}
+    monkeypatch.undo()
+
+    # write_pid_file replaces the file, which bumps the directory mtime
+    assert write_pid_file(str(pid_dir / "b.pid"), 456)
+    assert manager_utils.snapshot_pid_files(str(pid_dir), cache_file) == {"a": 123, "b": 456}
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix only")
+@pytest.mark.parametrize("same_cwd", [True, False])
+def test_spawn_component_appends_output(tmp_path, monkeypatch, same_cwd):
+    monkeypatch.chdir(tmp_path if same_cwd else os.path.dirname(__file__))
+    log_path = tmp_path / "c.log"
+    err_path = tmp_path / "c.err"
+    log_path.write_text("old\n")
+    code = "import os, sys; print(os.getsid(0) == os.getpid()); sys.stderr.write('err')"
+    pid = manager_utils.spawn_component(
+        [sys.executable, "-c", code], str(tmp_path), str(log_path), str(err_path)
+    )
+    os.waitpid(pid, 0)
+    assert log_path.read_text() == "old\nTrue\n"
+    assert err_path.read_text() == "err"
+
+
+def test_parse_launch_args():
+    assert manager_utils.parse_launch_args('{"--instance_id": "x", "--n": 2}') == ("--instance_id", "x", "--n", "2")
+    assert manager_utils.parse_launch_args("{}") == ()
+    assert manager_utils.parse_launch_args(None) == ()
+    with pytest.raises(ValueError):
+        manager_utils.parse_launch_args("{bad")
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs procfs")
+def test_is_process_running_with_live_snapshot():
+    live = manager_utils.live_pids()
+    assert os.getpid() in live
+    assert is_process_running(os.getpid(), live)
+    assert not is_process_running(os.getpid(), frozenset())
+
+
+@pytest.mark.skipif(not hasattr(__import__("socket"), "AF_UNIX"), reason="needs AF_UNIX")
+def test_wake_socket_round_trip(tmp_path):
+    path = manager_utils.notify_socket_path(str(tmp_path / "n.db"), "llm")
+    assert not manager_utils.send_wake(path)  # nobody listening yet
+    sock = manager_utils.open_wake_socket(path)
+    try:
+        assert not manager_utils.wait_for_wake(sock, 0)
+        assert manager_utils.send_wake(path)
+        assert manager_utils.send_wake(path)
+        assert manager_utils.wait_for_wake(sock, 1)
+        assert not manager_utils.wait_for_wake(sock, 0)  # both wake-ups drained
+    finally:
+        sock.close()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="needs SIGUSR1")
+def test_sigusr1_wakes_waiting_daemon(tmp_path):
+    path = manager_utils.notify_socket_path(str(tmp_path / "n.db"), "llm")
+    sock = manager_utils.open_wake_socket(path)
+    previous = signal.getsignal(signal.SIGUSR1)
+    try:
+        manager_utils.wake_on_signal(path)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        assert manager_utils.wait_for_wake(sock, 5)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+        sock.close()
+
+
+def test_retry_if_locked_retries_only_lock_errors():
+    calls = []
+
+    @manager_utils.retry_if_locked
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise sqlite3.OperationalError("database is locked")
+        return "ok"
+
+    assert flaky() == "ok"
+    assert len(calls) == 3
+
+    @manager_utils.retry_if_locked
+    def broken():
+        calls.append(1)
+        raise sqlite3.OperationalError("no such table: x")
+
+    calls.clear()
+    with pytest.raises(sqlite3.OperationalError):
+        broken()
+    assert len(calls) == 1
+
+
+def test_retry_if_locked_counts_time_spent_in_calls(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(manager_utils.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(manager_utils.time, "sleep", lambda s: clock.__setitem__(0, clock[0] + s))
+    calls = []
+
+    @manager_utils.retry_if_locked
+    def slow_locked():
+        calls.append(1)
+        clock[0] += manager_utils.BUSY_TIMEOUT_S  # blocked for the whole busy_timeout
+        raise sqlite3.OperationalError("database is locked")
+
+    with pytest.raises(sqlite3.OperationalError):
+        slow_locked()
+    assert len(calls) == 1
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix only")
+def test_pid_file_lock_excludes_second_holder(tmp_path):
+    pid_file = str(tmp_path / "comp.pid")
+    with manager_utils.pid_file_lock(pid_file) as first:
+        assert first
+        code = (
+            "import sys; sys.path.insert(0, sys.argv[1]); import manager_utils\n"
+            "with manager_utils.pid_file_lock(sys.argv[2]) as locked: print(locked)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code, os.path.dirname(os.path.dirname(__file__)), pid_file],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        assert out.strip() == "False"
+    with manager_utils.pid_file_lock(pid_file) as again:
+        assert again
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix only")
+@pytest.mark.parametrize("use_pidfd", [True, False])
+def test_wait_for_exit_reaps_child(monkeypatch, use_pidfd):
+    if not use_pidfd:
+        monkeypatch.delattr(os, "pidfd_open", raising=False)
+    elif not hasattr(os, "pidfd_open"):
+        pytest.skip("no pidfd_open")
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        assert not manager_utils.wait_for_exit(proc.pid, 0.05)
+        proc.terminate()
+        assert manager_utils.wait_for_exit(proc.pid, 5)
+        assert not is_process_running(proc.pid)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+@pytest.mark.skipif(not hasattr(os, "P_PIDFD"), reason="no waitid(P_PIDFD)")
+def test_wait_for_exit_reaps_through_pidfd(monkeypatch):
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        real_waitpid = os.waitpid
+        monkeypatch.setattr(os, "waitpid", lambda *a: pytest.fail("reaped by PID"))
+        proc.terminate()
+        assert manager_utils.wait_for_exit(proc.pid, 5)
+        monkeypatch.setattr(os, "waitpid", real_waitpid)
+        with pytest.raises(ChildProcessError):
+            os.waitpid(proc.pid, os.WNOHANG)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+@pytest.mark.skipif(not manager_utils.HAS_PROC, reason="needs /proc")
+def test_wait_for_exit_treats_reused_pid_as_exited(monkeypatch):
+    monkeypatch.delattr(os, "pidfd_open", raising=False)
+    start = manager_utils.process_start_time(os.getpid())
+    assert start is not None
+    assert manager_utils.process_start_time(os.getpid()) == start
+    # Same PID but a different start time: the original process is gone
+    assert manager_utils.wait_for_exit(os.getpid(), 5, start + 1)
+    assert not manager_utils.wait_for_exit(os.getpid(), 0.05, start)
+
+
+@pytest.mark.skipif(not hasattr(os, "pidfd_open"), reason="no pidfd_open")
+def test_signal_and_wait_through_pidfd():
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        pidfd = manager_utils.open_pidfd(proc.pid)
+        assert pidfd is not None
+        try:
+            manager_utils.send_signal(proc.pid, signal.SIGTERM, pidfd)
+            assert manager_utils.wait_for_exit(proc.pid, 5, pidfd=pidfd)
+            os.fstat(pidfd)  # a caller's pidfd is left open
+        finally:
+            os.close(pidfd)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+@pytest.mark.skipif(not hasattr(os, "pidfd_open"), reason="no pidfd_open")
+def test_wait_for_exit_with_high_pidfd():
+    resource = pytest.importorskip("resource")
+    if resource.getrlimit(resource.RLIMIT_NOFILE)[0] <= 1500:
+        pytest.skip("fd limit too low")
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    try:
+        pidfd = manager_utils.open_pidfd(proc.pid)
+        high_fd = os.dup2(pidfd, 1500)
+        os.close(pidfd)
+        try:
+            # select() raises ValueError for fds >= FD_SETSIZE
+            assert not manager_utils.wait_for_exit(proc.pid, 0.05, pidfd=high_fd)
+            proc.terminate()
+            assert manager_utils.wait_for_exit(proc.pid, 5, pidfd=high_fd)
+        finally:
+            os.close(high_fd)
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_child_gets_its_own_pooled_connections(tmp_path):
+    db = str(tmp_path / "fork.db")
+    parent_writer = manager_utils.get_connection(db, "writer")
+    parent_reader = manager_utils.get_connection(db, "reader")
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        ok = (
+            manager_utils.get_connection(db, "writer") is not parent_writer
+            and manager_utils.get_connection(db, "reader") is not parent_reader
+        )
+        os.write(write_fd, b"1" if ok else b"0")
+        os._exit(0)
+    os.close(write_fd)
+    try:
+        assert os.read(read_fd, 1) == b"1"
+    finally:
+        os.close(read_fd)
+        os.waitpid(pid, 0)
+    assert manager_utils.get_connection(db, "writer") is parent_writer
+    manager_utils.discard_connection(db, "writer")
+    manager_utils.discard_connection(db, "reader")
+
+
+def test_sleep_to_next_tick_keeps_a_fixed_rate(monkeypatch):
+    clock = [100.0]
+    slept = []
+
+    def fake_sleep(seconds):
+        slept.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(manager_utils.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(manager_utils.time, "sleep", fake_sleep)
+
+    clock[0] += 3  # a 3 s loop body only shortens the wait
+    assert manager_utils.sleep_to_next_tick(100.0, 10) == 110.0
+    assert slept == [7.0]
+
+    clock[0] += 25  # an overrun restarts the schedule instead of catching up
+    assert manager_utils.sleep_to_next_tick(110.0, 10) == 135.0
+    assert slept == [7.0, 0.0]
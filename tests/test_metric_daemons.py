@@ -1,6 +1,7 @@
 import os
 import sqlite3
 import sys
+import time
 import types
 import pytest
 
@@ -8,6 +9,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 import cpu_usage_daemon
 import mem_usage_daemon
+import system_metrics_daemon
+import temp_main_daemon
 
 
 def setup_db(tmp_path, table_sql):
@@ -48,6 +51,100 @@ def test_cpu_usage_daemon_writes_rows(tmp_path, monkeypatch):
     assert count >= 1
 
 
+def test_cpu_usage_daemon_batches_inserts(tmp_path, monkeypatch):
+    sql = """CREATE TABLE cpu_usage_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, cpu_usage REAL)"""
+    db_path = setup_db(tmp_path, sql)
+    monkeypatch.setattr(cpu_usage_daemon, "DB_FULL_PATH", db_path)
+    monkeypatch.setattr(cpu_usage_daemon, "BATCH_SIZE", 3)
+    monkeypatch.setattr(cpu_usage_daemon, "read_cpu_usage", lambda: 5.0)
+
+    counts = []
+
+    def fake_sleep(_):
+        conn = sqlite3.connect(db_path)
+        counts.append(conn.execute("SELECT COUNT(*) FROM cpu_usage_log").fetchone()[0])
+        conn.close()
+        if len(counts) == 4:
+            raise StopIteration
+
+    monkeypatch.setattr(cpu_usage_daemon.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        cpu_usage_daemon.main_loop("TEST")
+
+    conn = sqlite3.connect(db_path)
+    total = conn.execute("SELECT COUNT(*) FROM cpu_usage_log").fetchone()[0]
+    conn.close()
+
+    assert counts == [0, 0, 3, 3]
+    # The remaining buffered sample is flushed when the loop exits.
+    assert total == 4
+
+def test_cpu_usage_daemon_keeps_samples_when_locked(tmp_path, monkeypatch):
+    sql = """CREATE TABLE cpu_usage_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, cpu_usage REAL)"""
+    db_path = setup_db(tmp_path, sql)
+    monkeypatch.setattr(cpu_usage_daemon, "DB_FULL_PATH", db_path)
+    monkeypatch.setattr(cpu_usage_daemon, "BATCH_SIZE", 1)
+    monkeypatch.setattr(cpu_usage_daemon, "read_cpu_usage", lambda: 5.0)
+
+    real_flush = cpu_usage_daemon.flush_samples
+    attempts = []
+
+    def flaky_flush(conn, buf, core_buf=None):
+        attempts.append(len(buf))
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        real_flush(conn, buf, core_buf)
+
+    def fake_sleep(_):
+        if len(attempts) == 2:
+            raise StopIteration
+
+    monkeypatch.setattr(cpu_usage_daemon, "flush_samples", flaky_flush)
+    monkeypatch.setattr(cpu_usage_daemon.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        cpu_usage_daemon.main_loop("TEST")
+
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM cpu_usage_log").fetchone()[0]
+    conn.close()
+
+    # The failed sample was kept and written with the next one
+    assert attempts[:2] == [1, 2]
+    assert count == 2
+
+
+
+def test_cpu_usage_daemon_percpu_rows(tmp_path, monkeypatch):
+    sql = """CREATE TABLE cpu_usage_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, cpu_usage REAL)"""
+    db_path = setup_db(tmp_path, sql)
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """CREATE TABLE cpu_core_usage_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, core INTEGER NOT NULL, cpu_usage REAL)"""
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(cpu_usage_daemon, "DB_FULL_PATH", db_path)
+    monkeypatch.setattr(cpu_usage_daemon, "read_cpu_core_usage", lambda: [10.0, 30.0])
+
+    def fake_sleep(_):
+        raise StopIteration
+
+    monkeypatch.setattr(cpu_usage_daemon.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        cpu_usage_daemon.main_loop("TEST", percpu=True)
+
+    conn = sqlite3.connect(db_path)
+    usage = conn.execute("SELECT cpu_usage FROM cpu_usage_log").fetchall()
+    cores = conn.execute("SELECT core, cpu_usage FROM cpu_core_usage_log ORDER BY core").fetchall()
+    conn.close()
+
+    assert usage == [(20.0,)]
+    assert cores == [(0, 10.0), (1, 30.0)]
+
+
 def test_mem_usage_daemon_writes_rows(tmp_path, monkeypatch):
     sql = """CREATE TABLE memory_usage_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, mem_usage REAL)"""
     db_path = setup_db(tmp_path, sql)
@@ -75,3 +172,157 @@ def test_mem_usage_daemon_writes_rows(tmp_path, monkeypatch):
     conn.close()
 
     assert count >= 1
+
+
+def test_system_metrics_daemon_batches_inserts(tmp_path, monkeypatch):
+    sql = """CREATE TABLE system_metrics_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL, cpu_temp REAL, cpu_usage REAL, mem_usage REAL)"""
+    db_path = setup_db(tmp_path, sql)
+    monkeypatch.setattr(system_metrics_daemon, "DB_FULL_PATH", db_path)
+    monkeypatch.setattr(system_metrics_daemon, "BATCH_SIZE", 2)
+    monkeypatch.setattr(system_metrics_daemon, "sample", lambda: (40.0, 5.0, 50.0))
+
+    counts = []
+
+    def fake_sleep(_):
+        conn = sqlite3.connect(db_path)
+        counts.append(conn.execute("SELECT COUNT(*) FROM system_metrics_log").fetchone()[0])
+        conn.close()
+        if len(counts) == 4:
+            raise StopIteration
+
+    monkeypatch.setattr(system_metrics_daemon.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        system_metrics_daemon.main_loop("TEST")
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT cpu_temp, cpu_usage, mem_usage, timestamp FROM system_metrics_log").fetchall()
+    conn.close()
+
+    # The loop sleeps one poll before each sample
+    assert counts == [0, 0, 2, 2]
+    # The remaining buffered sample is flushed when the loop exits.
+    assert len(rows) == 3
+    assert all(row[:3] == (40.0, 5.0, 50.0) and row[3] for row in rows)
+
+
+
+@pytest.mark.skipif(not system_metrics_daemon.HAS_PROC, reason="needs /proc")
+def test_system_metrics_daemon_first_row_has_cpu(tmp_path, monkeypatch):
+    sql = """CREATE TABLE system_metrics_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL, cpu_temp REAL, cpu_usage REAL, mem_usage REAL)"""
+    db_path = setup_db(tmp_path, sql)
+    monkeypatch.setattr(system_metrics_daemon, "DB_FULL_PATH", db_path)
+    monkeypatch.setattr(system_metrics_daemon, "BATCH_SIZE", 1)
+    monkeypatch.setattr(system_metrics_daemon, "_last_cpu_times", None)
+
+    real_sleep = time.sleep
+    sleeps = []
+
+    def fake_sleep(_):
+        sleeps.append(1)
+        if len(sleeps) == 2:
+            raise StopIteration
+        # Let the /proc/stat counters advance past the primed baseline
+        real_sleep(0.1)
+
+    monkeypatch.setattr(system_metrics_daemon.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        system_metrics_daemon.main_loop("TEST")
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT cpu_usage FROM system_metrics_log").fetchall()
+    conn.close()
+
+    assert len(rows) == 1
+    assert rows[0][0] is not None
+
+
+def test_system_metrics_daemon_keeps_samples_when_locked(tmp_path, monkeypatch):
+    sql = """CREATE TABLE system_metrics_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT DEFAULT CURRENT_TIMESTAMP NOT NULL, cpu_temp REAL, cpu_usage REAL, mem_usage REAL)"""
+    db_path = setup_db(tmp_path, sql)
+    monkeypatch.setattr(system_metrics_daemon, "DB_FULL_PATH", db_path)
+    monkeypatch.setattr(system_metrics_daemon, "BATCH_SIZE", 1)
+    monkeypatch.setattr(system_metrics_daemon, "sample", lambda: (40.0, 5.0, 50.0))
+
+    real_flush = system_metrics_daemon.flush_samples
+    attempts = []
+
+    def flaky_flush(conn, buf):
+        attempts.append(len(buf))
+        if len(attempts) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        real_flush(conn, buf)
+
+    def fake_sleep(_):
+        if len(attempts) == 2:
+            raise StopIteration
+
+    monkeypatch.setattr(system_metrics_daemon, "flush_samples", flaky_flush)
+    monkeypatch.setattr(system_metrics_daemon.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        system_metrics_daemon.main_loop("TEST")
+
+    conn = sqlite3.connect(db_path)
+    count = conn.execute("SELECT COUNT(*) FROM system_metrics_log").fetchone()[0]
+    conn.close()
+
+    # The failed sample was kept and written with the next one
+    assert attempts[:2] == [1, 2]
+    assert count == 2
+
+
+def test_temp_main_daemon_batches_inserts(tmp_path, monkeypatch):
+    sql = """CREATE TABLE cpu_temperature_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL, temperature_celsius REAL NOT NULL)"""
+    db_path = setup_db(tmp_path, sql)
+    monkeypatch.setattr(temp_main_daemon, "DB_FULL_PATH", db_path)
+    monkeypatch.setattr(temp_main_daemon, "BATCH_SIZE", 2)
+    monkeypatch.setattr(temp_main_daemon, "get_cpu_temp", lambda: 55.0)
+
+    counts = []
+
+    def fake_sleep(_):
+        conn = sqlite3.connect(db_path)
+        counts.append(conn.execute("SELECT COUNT(*) FROM cpu_temperature_log").fetchone()[0])
+        conn.close()
+        if len(counts) == 3:
+            raise StopIteration
+
+    monkeypatch.setattr(temp_main_daemon.time, "sleep", fake_sleep)
+
+    with pytest.raises(StopIteration):
+        temp_main_daemon.main_loop("TEST")
+
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute("SELECT temperature_celsius, timestamp FROM cpu_temperature_log").fetchall()
+    conn.close()
+
+    assert counts == [0, 2, 2]
+    # The remaining buffered sample is flushed when the loop exits.
+    assert len(rows) == 3
+    assert all(temp == 55.0 and ts for temp, ts in rows)
+
+@pytest.mark.skipif(not system_metrics_daemon.HAS_PROC, reason="needs /proc")
+def test_system_metrics_proc_readers(monkeypatch):
+    monkeypatch.setattr(system_metrics_daemon, "_last_cpu_times", None)
+    assert system_metrics_daemon.read_proc_cpu_usage() is None  # no earlier sample
+    cpu = system_metrics_daemon.read_proc_cpu_usage()
+    assert cpu is None or 0.0 <= cpu <= 100.0
+    mem = system_metrics_daemon.read_proc_mem_usage()
+    assert mem is not None and 0.0 < mem <= 100.0
+
+
+def test_smc_temp_falls_back_to_command(monkeypatch):
+    assert temp_main_daemon.ctypes.sizeof(temp_main_daemon.SMCKeyData) == 80
+    monkeypatch.setattr(temp_main_daemon, "read_smc_key", lambda key: None)
+    monkeypatch.setattr(temp_main_daemon.shutil, "which", lambda cmd: "/usr/bin/smc")
+    raw = temp_main_daemon.struct.pack("<f", 42.5)
+    out = "  Th0D  [flt ]  42.5 (bytes " + " ".join(f"{b:02x}" for b in raw) + ")\n"
+    monkeypatch.setattr(temp_main_daemon.subprocess, "check_output", lambda *a, **k: out)
+    assert temp_main_daemon.get_smc_cpu_temp() == 42.5
+
+    # A successful IOKit read never spawns the command
+    monkeypatch.setattr(temp_main_daemon, "read_smc_key", lambda key: raw)
+    monkeypatch.setattr(temp_main_daemon.subprocess, "check_output", lambda *a, **k: pytest.fail("spawned smc"))
+    assert temp_main_daemon.get_smc_cpu_temp() == 42.5
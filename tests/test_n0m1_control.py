@@ -0,0 +1,146 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import n0m1_control
+
+
+@pytest.mark.skipif(os.name == "nt", reason="posix only")
+def test_stop_system_returns_once_boot_process_exits(tmp_path, monkeypatch):
+    proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+    pid_file = tmp_path / "boot_system.pid"
+    pid_file.write_text(str(proc.pid))
+    monkeypatch.setattr(n0m1_control, "BOOT_PID_FILE", str(pid_file))
+    try:
+        start = time.monotonic()
+        assert n0m1_control.SystemController().stop_system()
+        # No fixed one-second polling step before the exit is noticed
+        assert time.monotonic() - start < 1
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+
+def test_get_system_status_reads_managers_components_and_errors(tmp_path, monkeypatch):
+    db = tmp_path / "status.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE autorun_components (component_id TEXT PRIMARY KEY, desired_state TEXT,"
+        " manager_affinity TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE component_lifecycle_log (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " event_timestamp TEXT, component_id TEXT, process_pid INTEGER, event_type TEXT,"
+        " run_type TEXT, message TEXT, manager_script TEXT, script_path TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO autorun_components VALUES (?, ?, ?)",
+        [("llm", "active", "main_llm_manager"), ("idle", "inactive", "daemon_manager")],
+    )
+    conn.executemany(
+        "INSERT INTO component_lifecycle_log (event_timestamp, component_id, process_pid, event_type, message)"
+        " VALUES (datetime('now', ?), ?, ?, ?, ?)",
+        [
+            ("-2 hours", "llm", 20, "ERROR", "stale"),
+            ("-20 minutes", "boot_daemon_manager", 10, "START_ATTEMPT", None),
+            ("-10 minutes", "boot_daemon_manager", 11, "STARTED_SUCCESSFULLY", None),
+            ("-5 minutes", "llm", 20, "STARTED_SUCCESSFULLY", None),
+            ("-4 minutes", "llm", 20, "ERROR", "first"),
+            ("-3 minutes", "llm", 20, "STOP_FAILED", "second"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(n0m1_control, "BOOT_PID_FILE", str(tmp_path / "missing.pid"))
+
+    controller = n0m1_control.SystemController()
+    controller.db_path = str(db)
+    status = controller.get_system_status()
+
+    assert list(status["managers"]) == ["daemon_manager"]
+    assert status["managers"]["daemon_manager"].last_event == "STARTED_SUCCESSFULLY"
+    assert status["managers"]["daemon_manager"].pid == 11
+    assert list(status["components"]) == ["idle", "llm"]
+    assert status["components"]["llm"].last_event == "STOP_FAILED"
+    assert status["components"]["llm"].manager == "main_llm_manager"
+    assert status["components"]["idle"].last_event == "NO_RECENT_EVENTS"
+    assert status["components"]["idle"].desired_state == "inactive"
+    assert [(e.type, e.message) for e in status["errors"]] == [("STOP_FAILED", "second"), ("ERROR", "first")]
+
+
+@pytest.mark.parametrize("chunk", [4, 64 * 1024])
+def test_tail_lines_reads_last_lines(tmp_path, monkeypatch, chunk):
+    monkeypatch.setattr(n0m1_control, "TAIL_CHUNK", chunk)
+    log = tmp_path / "c.log"
+    log.write_text("".join(f"line {i}\n" for i in range(100)))
+    assert n0m1_control.tail_lines(str(log), 3) == ["line 97", "line 98", "line 99"]
+    assert len(n0m1_control.tail_lines(str(log), 500)) == 100
+    assert n0m1_control.tail_lines(str(log), 0) == []
+    log.write_text("no trailing newline")
+    assert n0m1_control.tail_lines(str(log), 2) == ["no trailing newline"]
+
+
+def test_show_metrics_prints_last_row_and_averages(tmp_path, capsys):
+    db = tmp_path / "metrics.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE system_metrics_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT,"
+        " cpu_temp REAL, cpu_usage REAL, mem_usage REAL)"
+    )
+    conn.executemany(
+        "INSERT INTO system_metrics_log (timestamp, cpu_temp, cpu_usage, mem_usage) VALUES (?, ?, ?, ?)",
+        [("2024-01-01 00:00:00", None, 90, 10), ("2024-01-01 00:00:01", None, 30, 20),
+         ("2024-01-01 00:00:02", None, 10, 40)],
+    )
+    conn.commit()
+    conn.close()
+
+    controller = n0m1_control.SystemController()
+    controller.db_path = str(db)
+    controller.show_metrics(limit=2)
+    out = capsys.readouterr().out
+    assert "Last update : 2024-01-01 00:00:02" in out
+    assert "CPU usage   : last 10.0% | avg 20.0%" in out
+    assert "Memory usage: last 40.0% | avg 30.0%" in out
+    assert "CPU temp    : N/A" in out
+
+
+def test_list_log_files_returns_sorted_log_files(tmp_path):
+    for name in ("b.log", "a.log", "notes.txt"):
+        (tmp_path / name).write_text("")
+    (tmp_path / "dir.log").mkdir()
+    assert n0m1_control.list_log_files(str(tmp_path)) == ["a.log", "b.log"]
+    assert n0m1_control.list_log_files(str(tmp_path / "missing")) == []
+
+
+def test_manage_component_updates_many_in_one_call(tmp_path, monkeypatch, capsys):
+    db = tmp_path / "components.db"
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE autorun_components (component_id TEXT PRIMARY KEY, desired_state TEXT,"
+        " manager_affinity TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO autorun_components VALUES (?, 'active', 'nano_manager')",
+        [("a",), ("b",), ("c",)],
+    )
+    conn.commit()
+    conn.close()
+    monkeypatch.setattr(n0m1_control, "BOOT_PID_FILE", str(tmp_path / "missing.pid"))
+
+    controller = n0m1_control.SystemController()
+    controller.db_path = str(db)
+    assert not controller.manage_component("disable", ["a", "c", "nope"])
+    assert "Component 'nope' not found." in capsys.readouterr().out
+
+    conn = sqlite3.connect(db)
+    states = dict(conn.execute("SELECT component_id, desired_state FROM autorun_components"))
+    conn.close()
+    assert states == {"a": "inactive", "b": "active", "c": "inactive"}
@@ -110,3 +110,58 @@ def test_nano_instance_loads_prompt_and_clears_flag(tmp_path, monkeypatch):
     conn.close()
 
     assert flag == 0
+
+
+def test_read_prompt_file_decodes_utf8(tmp_path):
+    path = tmp_path / "prompt.txt"
+    path.write_bytes("Watch the sensors \u2014 report anomalies.\n".encode("utf-8"))
+    assert nano_instance.read_prompt_file(str(path)) == "Watch the sensors \u2014 report anomalies.\n"
+
+
+def test_nano_instance_skips_reads_until_another_commit(tmp_path, monkeypatch):
+    db_path = setup_test_db(tmp_path)
+    # The instance's own access logging must not count as an outside change
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE db_access_log (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT DEFAULT CURRENT_TIMESTAMP,"
+        " component_id TEXT, table_name TEXT, access_type TEXT)"
+    )
+    conn.commit()
+    conn.close()
+
+    monkeypatch.setattr(nano_instance, "DB_FULL_PATH", db_path)
+    monkeypatch.setattr(nano_instance, "METRICS_TABLE", "cpu_usage_log")
+    monkeypatch.setattr(nano_instance, "SUMMARY_TABLE", "cpu_usage_summary")
+
+    fetches = []
+    real_fetch = nano_instance.fetch_recent_metrics
+
+    def counting_fetch(*args, **kwargs):
+        fetches.append(1)
+        return real_fetch(*args, **kwargs)
+
+    sleeps = []
+
+    def fake_sleep(_):
+        sleeps.append(1)
+        if len(sleeps) == 2:
+            # A commit from another connection wakes the next pass
+            other = sqlite3.connect(db_path)
+            other.execute("INSERT INTO cpu_usage_log (cpu_usage) VALUES (10)")
+            other.commit()
+            other.close()
+        if len(sleeps) == 4:
+            raise StopIteration
+
+    monkeypatch.setattr(nano_instance, "fetch_recent_metrics", counting_fetch)
+    monkeypatch.setattr(nano_instance.time, "sleep", fake_sleep)
+    monkeypatch.setattr(sys, "argv", ["nano_instance.py"])
+
+    with pytest.raises(StopIteration):
+        nano_instance.main()
+
+    assert len(fetches) == 2
+    conn = sqlite3.connect(db_path)
+    reads = conn.execute("SELECT COUNT(*) FROM db_access_log WHERE table_name='cpu_usage_log'").fetchone()[0]
+    conn.close()
+    assert reads == 2